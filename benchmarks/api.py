@@ -0,0 +1,144 @@
+"""Throughput and latency benchmark of the user API.
+
+Requests go through `create_app()` and the Flask test client against a
+freshly seeded SQLite database, so runs are repeatable on one machine.
+
+Usage:
+    python -m benchmarks.api --output api.json
+    python -m benchmarks.api --baseline api.json
+"""
+
+import argparse
+import itertools
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+from benchmarks import common
+from src.app import create_app, db, hasher
+from src.application.user.model import User
+
+
+def seed_users(count: int, password: str) -> None:
+    """Insert users with a single executemany.
+
+    Hashes are not unique, so every row shares one hash of the password.
+    """
+    password_hash = hasher.hash(password)
+    db.session.execute(
+        User.__table__.insert(),
+        [
+            {
+                "username": f"seed{index}",
+                "email": f"seed{index}@example.com",
+                "password": password_hash,
+                "is_admin": False,
+            }
+            for index in range(count)
+        ],
+    )
+    db.session.commit()
+
+
+def main() -> int:
+    """Run API benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=4, help="bcrypt cost")
+    common.add_output_arguments(parser)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="blog-bench-")
+    app = create_app(
+        {
+            "SQLALCHEMY_DATABASE_URI": (
+                f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+            ),
+            "BCRYPT_LOG_ROUNDS": args.rounds,
+            # Every login comes from the one client address.
+            "RATELIMIT_ENABLED": False,
+        }
+    )
+    password = "abcd1234"
+    with app.app_context():
+        db.create_all()
+        seed_users(args.users, password)
+
+    client = app.test_client()
+    headers = {"Content-Type": "application/json"}
+    signup_ids = itertools.count()
+
+    def signup(_):
+        index = next(signup_ids)
+        response = client.post(
+            "/user/",
+            data=json.dumps(
+                {
+                    "username": f"bench{index}",
+                    "email": f"bench{index}@example.com",
+                    "password": password,
+                }
+            ),
+            headers=headers,
+        )
+        assert response.status_code == 201, response.data
+
+    def login(index):
+        response = client.post(
+            "/user/login",
+            data=json.dumps(
+                {
+                    "email": f"seed{index % args.users}@example.com",
+                    "password": password,
+                }
+            ),
+            headers=headers,
+        )
+        assert response.status_code == 201, response.data
+
+    token = client.post(
+        "/user/login",
+        data=json.dumps({"email": "seed0@example.com", "password": password}),
+        headers=headers,
+    ).json["data"]["access_token"]
+    auth_headers = {"Authorization": f"JWT {token}"}
+
+    def current_user(_):
+        response = client.get("/user/", headers=auth_headers)
+        assert response.status_code == 200, response.data
+
+    def anonymous(_):
+        response = client.get("/user/")
+        assert response.status_code == 200, response.data
+
+    results = {
+        "POST /user/": common.run_timed(signup, args.requests, args.warmup),
+        "POST /user/login": common.run_timed(login, args.requests, args.warmup),
+        "GET /user/ (authenticated)": common.run_timed(
+            current_user, args.requests, args.warmup
+        ),
+        "GET /user/ (anonymous)": common.run_timed(
+            anonymous, args.requests, args.warmup
+        ),
+    }
+    with app.app_context():
+        db.engine.dispose()
+    shutil.rmtree(workdir)
+
+    report = common.build_report(
+        "api",
+        results,
+        requests=args.requests,
+        users=args.users,
+        bcrypt_rounds=args.rounds,
+        database="sqlite",
+    )
+    return common.finish(report, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
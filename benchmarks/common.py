@@ -0,0 +1,167 @@
+"""Helpers shared by benchmark scripts: timing summaries, JSON results and
+regression checks against a stored baseline.
+"""
+
+import argparse
+import datetime
+import json
+import platform
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+# Summary fields where a higher value is worse.
+LATENCY_FIELDS = ("p50_ms", "p95_ms", "p99_ms")
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Return the nearest-rank percentile of already sorted values."""
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, max(0, round(fraction * len(values)) - 1))
+    return values[index]
+
+
+def summarize(timings_ms: List[float], elapsed_s: float) -> dict:
+    """Summarize per-call latencies.
+
+    Args:
+        timings_ms (List[float]): Latency of every call in milliseconds.
+        elapsed_s (float): Wall clock time of the whole run.
+
+    Returns:
+        dict: Count, latency percentiles, mean and requests per second.
+    """
+    values = sorted(timings_ms)
+    count = len(values)
+    return {
+        "count": count,
+        "p50_ms": round(percentile(values, 0.50), 4),
+        "p95_ms": round(percentile(values, 0.95), 4),
+        "p99_ms": round(percentile(values, 0.99), 4),
+        "mean_ms": round(sum(values) / count, 4) if count else 0.0,
+        "rps": round(count / elapsed_s, 2) if elapsed_s else 0.0,
+    }
+
+
+def run_timed(func: Callable, count: int, warmup: int = 0) -> dict:
+    """Call the function repeatedly and summarize its latency.
+
+    Args:
+        func (Callable): Function called with the iteration index.
+        count (int): Number of measured calls.
+        warmup (int): Number of calls made before measuring.
+
+    Returns:
+        dict: Summary returned by `summarize`.
+    """
+    for index in range(warmup):
+        func(index)
+
+    timings = []
+    clock = time.perf_counter
+    started = clock()
+    for index in range(count):
+        start = clock()
+        func(index)
+        timings.append((clock() - start) * 1000)
+    return summarize(timings, clock() - started)
+
+
+def build_report(name: str, results: Dict[str, dict], **metadata) -> dict:
+    """Wrap results with enough context to compare runs later."""
+    return {
+        "benchmark": name,
+        "created": datetime.datetime.utcnow().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "metadata": metadata,
+        "results": results,
+    }
+
+
+def find_regressions(
+    current: dict, baseline: dict, threshold: float
+) -> List[str]:
+    """List cases that got slower than the baseline by more than threshold.
+
+    Args:
+        current (dict): Report of this run.
+        baseline (dict): Report of a previous run.
+        threshold (float): Allowed relative slowdown, 0.1 means 10%.
+
+    Returns:
+        List[str]: Human readable description of every regression.
+    """
+    regressions = []
+    for case, result in current["results"].items():
+        previous = baseline["results"].get(case)
+        if not previous:
+            continue
+        for field in LATENCY_FIELDS:
+            if previous[field] and result[field] > previous[field] * (
+                1 + threshold
+            ):
+                regressions.append(
+                    f"{case} {field}: {previous[field]} -> {result[field]}"
+                )
+        if previous["rps"] and result["rps"] < previous["rps"] * (
+            1 - threshold
+        ):
+            regressions.append(
+                f"{case} rps: {previous['rps']} -> {result['rps']}"
+            )
+    return regressions
+
+
+def add_output_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add result storage and comparison options to a benchmark parser."""
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON results to compare against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.10,
+        help="relative slowdown reported as regression (default 0.10)",
+    )
+
+
+def write_table(results: Dict[str, dict]) -> None:
+    """Write results as an aligned text table to stdout."""
+    width = max(len(case) for case in results)
+    sys.stdout.write(
+        f"{'case':<{width}} {'count':>7} {'p50_ms':>10} {'p95_ms':>10} "
+        f"{'p99_ms':>10} {'rps':>10}\n"
+    )
+    for case, result in results.items():
+        sys.stdout.write(
+            f"{case:<{width}} {result['count']:>7} {result['p50_ms']:>10.4f} "
+            f"{result['p95_ms']:>10.4f} {result['p99_ms']:>10.4f} "
+            f"{result['rps']:>10.1f}\n"
+        )
+
+
+def finish(report: dict, args: argparse.Namespace) -> int:
+    """Print, store and compare a report.
+
+    Args:
+        report (dict): Report returned by `build_report`.
+        args (argparse.Namespace): Parsed `add_output_arguments` options.
+
+    Returns:
+        int: Process exit code, 1 when regressions were found.
+    """
+    write_table(report["results"])
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump(report, output, indent=2, sort_keys=True)
+
+    regressions: Optional[List[str]] = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline:
+            regressions = find_regressions(
+                report, json.load(baseline), args.threshold
+            )
+        for regression in regressions:
+            sys.stdout.write(f"REGRESSION {regression}\n")
+    return 1 if regressions else 0
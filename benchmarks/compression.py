@@ -0,0 +1,130 @@
+"""Compression CPU time against bytes saved on typical response bodies.
+
+Every installed content coding is run at its configured level and at the
+ends of its level range on a single
+user response, a login response and large user and post listings, as the
+`src.compression` hook would compress them. Compression is CPU bound, so
+latency is the CPU time spent per body. Compressed sizes are printed and
+stored next to the timings.
+
+Usage:
+    python -m benchmarks.compression --output compression.json
+"""
+
+import argparse
+import datetime
+import sys
+
+from flask import Flask
+
+from benchmarks import common
+from src.app import compressor, create_app
+from src.application.post.model import Post
+from src.application.user.model import User
+from src.compression import available_encoders
+from src.util import generate_response
+
+# Levels measured besides the configured one.
+EXTRA_LEVELS = {"gzip": (1, 9), "br": (1, 11), "zstd": (1, 19)}
+
+
+def bodies(app: Flask) -> dict:
+    """Return serialized response bodies keyed by name."""
+    created = datetime.datetime(2024, 1, 2, 3, 4, 5)
+    users = [
+        User(
+            id=index,
+            username=f"user{index}",
+            email=f"user{index}@example.com",
+            created_on=created + datetime.timedelta(seconds=index),
+        )
+        for index in range(200)
+    ]
+    posts = [
+        Post(
+            id=index,
+            author_id=index % 7,
+            title=f"Post number {index} about Flask",
+            body="Keyset pagination keeps every page an index range scan. " * 8,
+            created_on=created + datetime.timedelta(minutes=index),
+        )
+        for index in range(100)
+    ]
+    envelopes = {
+        "user details": generate_response(data=users[1].serialize, status=200),
+        "login": generate_response(
+            data={"access_token": users[1].encode_auth_token()},
+            message="User logged in",
+            status=200,
+        ),
+        "user list 200": generate_response(
+            data={
+                "users": [user.serialize for user in users],
+                "next_cursor": "WyJkdDoyMDI0LTAxLTAyVDAzOjA3OjI1IiwxOTld",
+            },
+            status=200,
+        ),
+        "post list 100": generate_response(
+            data={
+                "posts": [post.serialize for post in posts],
+                "next_cursor": "Wzk5XQ",
+            },
+            status=200,
+        ),
+    }
+    return {
+        name: app.json.compact_dumps(envelope[0])
+        for name, envelope in envelopes.items()
+    }
+
+
+def main() -> int:
+    """Run compression benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000)
+    common.add_output_arguments(parser)
+    args = parser.parse_args()
+
+    app = create_app({"SQLALCHEMY_DATABASE_URI": "sqlite://"})
+    results = {}
+    with app.app_context():
+        configured = compressor.levels()
+        runs = [
+            (coding, encoder_class, level)
+            for coding, encoder_class in available_encoders().items()
+            for level in sorted({configured[coding], *EXTRA_LEVELS[coding]})
+        ]
+        for name, body in bodies(app).items():
+            for coding, encoder_class, level in runs:
+
+                def compress(_, body=body, cls=encoder_class, level=level):
+                    encoder = cls(level)
+                    return encoder.compress(body) + encoder.finish()
+
+                case = f"{name} {coding}-{level}"
+                results[case] = common.run_timed(
+                    compress, args.iterations, warmup=50
+                )
+                compressed = len(compress(0))
+                results[case].update(
+                    bytes_in=len(body),
+                    bytes_out=compressed,
+                    saved_pct=round(100 * (1 - compressed / len(body)), 1),
+                )
+
+    for case, result in results.items():
+        sys.stdout.write(
+            f"{case}: {result['bytes_in']} -> {result['bytes_out']} bytes "
+            f"({result['saved_pct']}% saved)\n"
+        )
+    report = common.build_report(
+        "compression",
+        results,
+        iterations=args.iterations,
+        min_size=app.config["COMPRESSION_MIN_SIZE"],
+    )
+    return common.finish(report, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
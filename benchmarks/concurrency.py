@@ -0,0 +1,143 @@
+"""Concurrent requests per process in WSGI and ASGI mode.
+
+WSGI requests run on a thread pool through the Flask test client, ASGI
+requests are coroutines on one event loop. Both use the same seeded SQLite
+file, so the difference is how each mode overlaps database and bcrypt work.
+
+Usage:
+    python -m benchmarks.concurrency --concurrency 32 --output concurrency.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks import common
+from benchmarks.api import seed_users
+from src.app import db
+from src.asgi import create_asgi_app
+
+PASSWORD = "abcd1234"
+
+
+def login_body(index: int, users: int) -> bytes:
+    """Return login payload of a seeded user."""
+    return json.dumps(
+        {"email": f"seed{index % users}@example.com", "password": PASSWORD}
+    ).encode()
+
+
+async def asgi_login(asgi_app, body: bytes) -> float:
+    """Send one login request to the ASGI app and return its latency."""
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/user/login",
+        "headers": [(b"content-type", b"application/json")],
+    }
+    started = time.perf_counter()
+    await asgi_app(scope, receive, send)
+    assert sent[0]["status"] == 201, sent
+    return (time.perf_counter() - started) * 1000
+
+
+async def run_asgi(asgi_app, count: int, concurrency: int, users: int):
+    """Run `count` logins with at most `concurrency` in flight."""
+    limit = asyncio.Semaphore(concurrency)
+
+    async def bounded(index):
+        async with limit:
+            return await asgi_login(asgi_app, login_body(index, users))
+
+    started = time.perf_counter()
+    timings = await asyncio.gather(*(bounded(i) for i in range(count)))
+    return common.summarize(list(timings), time.perf_counter() - started)
+
+
+def run_wsgi(flask_app, count: int, concurrency: int, users: int) -> dict:
+    """Run `count` logins on a pool of `concurrency` threads."""
+
+    def login(index):
+        started = time.perf_counter()
+        response = flask_app.test_client().post(
+            "/user/login",
+            data=login_body(index, users),
+            headers={"Content-Type": "application/json"},
+        )
+        assert response.status_code == 201, response.data
+        return (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        timings = list(executor.map(login, range(count)))
+    return common.summarize(timings, time.perf_counter() - started)
+
+
+def main() -> int:
+    """Run concurrency benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=4, help="bcrypt cost")
+    common.add_output_arguments(parser)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="blog-bench-")
+    asgi_app = create_asgi_app(
+        {
+            "SQLALCHEMY_DATABASE_URI": (
+                f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+            ),
+            "BCRYPT_LOG_ROUNDS": args.rounds,
+            # Every login comes from the one client address.
+            "RATELIMIT_ENABLED": False,
+            "METRICS_ENABLED": False,
+        }
+    )
+    flask_app = asgi_app.flask_app
+    with flask_app.app_context():
+        db.create_all()
+        seed_users(args.users, PASSWORD)
+
+    results = {
+        f"WSGI threads x{args.concurrency}": run_wsgi(
+            flask_app, args.requests, args.concurrency, args.users
+        ),
+        f"ASGI coroutines x{args.concurrency}": asyncio.run(
+            run_asgi(asgi_app, args.requests, args.concurrency, args.users)
+        ),
+    }
+    asyncio.run(asgi_app.engine.dispose())
+    with flask_app.app_context():
+        db.engine.dispose()
+    shutil.rmtree(workdir)
+
+    report = common.build_report(
+        "concurrency",
+        results,
+        requests=args.requests,
+        concurrency=args.concurrency,
+        users=args.users,
+        bcrypt_rounds=args.rounds,
+        database="sqlite",
+    )
+    return common.finish(report, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
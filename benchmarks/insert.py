@@ -0,0 +1,111 @@
+"""Insert throughput of `users` with and without unique hash indexes.
+
+One SQLite file is migrated to the revision before `b3e5d7f9a1c2`, where
+`users.password` and `users.access_token` still have unique indexes, and
+another one to head. The same rows, with random bcrypt shaped hashes, are
+inserted into both in batches of one executemany and commit each. Every
+index is one more B-tree the database writes per row, and random hashes
+touch a different page of it on every insert, so throughput and the final
+file size show the write amplification the migration removes.
+
+Usage:
+    python -m benchmarks.insert --rows 200000 --output insert.json
+"""
+
+import argparse
+import os
+import secrets
+import shutil
+import string
+import sys
+import tempfile
+
+from flask_migrate import upgrade
+
+from benchmarks import common
+from src.app import create_app, db, init_migrations
+from src.application.user.model import User
+
+# Revision and migration target of every case.
+REVISIONS = {
+    "unique hash indexes": "7a41c9d2e8f3",
+    "no hash indexes": "head",
+}
+BCRYPT_ALPHABET = string.ascii_letters + string.digits + "./"
+
+
+def fake_hash() -> str:
+    """Return a random string shaped like a bcrypt hash, without hashing."""
+    return "$2b$12$" + "".join(
+        secrets.choice(BCRYPT_ALPHABET) for _ in range(53)
+    )
+
+
+def build_rows(count: int) -> list:
+    """Return user rows with distinct random password hashes."""
+    return [
+        {
+            "username": f"insert{index}",
+            "email": f"insert{index}@example.com",
+            "password": fake_hash(),
+            "is_admin": False,
+        }
+        for index in range(count)
+    ]
+
+
+def measure(database_uri: str, revision: str, rows: list, size: int) -> dict:
+    """Migrate a database to the revision and insert the rows in batches."""
+    app = create_app({"SQLALCHEMY_DATABASE_URI": database_uri})
+    init_migrations(app)
+    with app.app_context():
+        upgrade(revision=revision)
+
+        def insert_batch(index):
+            db.session.execute(
+                User.__table__.insert(), rows[index * size : (index + 1) * size]
+            )
+            db.session.commit()
+
+        result = common.run_timed(insert_batch, len(rows) // size)
+        db.engine.dispose()
+    result["rows_per_s"] = round(result["rps"] * size, 2)
+    return result
+
+
+def main() -> int:
+    """Run insert benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    common.add_output_arguments(parser)
+    args = parser.parse_args()
+
+    rows = build_rows(args.rows)
+    workdir = tempfile.mkdtemp(prefix="blog-bench-")
+    results = {}
+    for case, revision in REVISIONS.items():
+        path = os.path.join(workdir, f"{revision}.db")
+        results[case] = measure(
+            f"sqlite:///{path}", revision, rows, args.batch_size
+        )
+        results[case]["file_bytes"] = os.path.getsize(path)
+    shutil.rmtree(workdir)
+
+    for case, result in results.items():
+        sys.stdout.write(
+            f"{case}: {result['rows_per_s']} rows/s, "
+            f"{result['file_bytes']} bytes on disk\n"
+        )
+    report = common.build_report(
+        "insert",
+        results,
+        rows=args.rows,
+        batch_size=args.batch_size,
+        database="sqlite",
+    )
+    return common.finish(report, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""Microbenchmarks of helpers on the request hot path.
+
+Usage:
+    python -m benchmarks.micro --output micro.json
+    python -m benchmarks.micro --baseline micro.json
+"""
+
+import argparse
+import datetime
+import sys
+
+from flask.json.provider import DefaultJSONProvider
+
+from benchmarks import common
+from src.app import create_app
+from src.application.user.model import (
+    LoginSchema,
+    User,
+    UserSignupSchema,
+    login_schema,
+    signup_schema,
+)
+from src.pagination import encode_cursor
+from src.util import generate_response, load_payload
+
+SIGNUP_PAYLOAD = {
+    "username": "testusername",
+    "email": "test@test.com",
+    "password": "abcd1234",
+}
+LOGIN_PAYLOAD = {"email": "test@test.com", "password": "abcd1234"}
+
+
+def cases() -> dict:
+    """Return benchmark cases keyed by name."""
+    # encode_auth_token reads the secret key from the application config.
+    app = create_app({"SQLALCHEMY_DATABASE_URI": "sqlite://"})
+    app.app_context().push()
+    default_json = DefaultJSONProvider(app)
+    user = User(**SIGNUP_PAYLOAD)
+    user.id = 1
+    user.created_on = datetime.datetime(2024, 1, 2, 3, 4, 5)
+    envelope = generate_response(data=user.serialize, status=200)[0]
+    # A full /user/list page, the last page has no next cursor.
+    users = []
+    for index in range(200):
+        listed = User(
+            username=f"user{index}",
+            email=f"user{index}@example.com",
+            password="x",
+        )
+        listed.id = index + 1
+        listed.created_on = user.created_on
+        users.append(listed.serialize)
+    listing = generate_response(
+        data={
+            "users": users,
+            "next_cursor": encode_cursor((user.created_on, 200)),
+            "approximate_total": 1000,
+        },
+        status=200,
+    )[0]
+    last_page = dict(listing, data=dict(listing["data"], next_cursor=None))
+    errors = {"username": ["Missing data for required field."]}
+
+    return {
+        "generate_response (data)": lambda _: generate_response(
+            data=SIGNUP_PAYLOAD, message="User Created", status=201
+        ),
+        "generate_response (errors)": lambda _: generate_response(
+            message=errors
+        ),
+        "encode_auth_token": lambda _: user.encode_auth_token(),
+        "User.serialize": lambda _: user.serialize,
+        "JSON response (flask default)": lambda _: default_json.response(
+            envelope
+        ),
+        "JSON response (app provider)": lambda _: app.json.response(envelope),
+        "JSON listing of 200 users (flask default)": lambda _: (
+            default_json.response(listing)
+        ),
+        "JSON listing of 200 users (app provider)": lambda _: (
+            app.json.response(listing)
+        ),
+        "JSON listing of 200 users, last page (app provider)": lambda _: (
+            app.json.response(last_page)
+        ),
+        "signup validation (new schema, validate, get)": lambda _: (
+            UserSignupSchema().validate(SIGNUP_PAYLOAD),
+            User(**SIGNUP_PAYLOAD),
+        ),
+        "signup validation (shared schema, load)": lambda _: User(
+            **load_payload(signup_schema, SIGNUP_PAYLOAD)[0]
+        ),
+        "login validation (new schema, validate, get)": lambda _: (
+            LoginSchema().validate(LOGIN_PAYLOAD),
+            LOGIN_PAYLOAD.get("email"),
+            LOGIN_PAYLOAD.get("password"),
+        ),
+        "login validation (shared schema, load)": lambda _: load_payload(
+            login_schema, LOGIN_PAYLOAD
+        )[0]["email"],
+    }
+
+
+def main() -> int:
+    """Run microbenchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--warmup", type=int, default=1000)
+    common.add_output_arguments(parser)
+    args = parser.parse_args()
+
+    results = {
+        name: common.run_timed(func, args.iterations, args.warmup)
+        for name, func in cases().items()
+    }
+    report = common.build_report("micro", results, iterations=args.iterations)
+    return common.finish(report, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""Admin user listing latency at increasing page depth.
+
+Compares the keyset query used by `GET /user/list` with the equivalent
+OFFSET query on a seeded SQLite database, keyset pages should cost the same
+at any depth.
+
+Usage:
+    python -m benchmarks.pagination --users 1000000 --output pagination.json
+"""
+
+import argparse
+import datetime
+import os
+import shutil
+import sys
+import tempfile
+
+from sqlalchemy import select
+from sqlalchemy.orm import load_only
+
+from benchmarks import common
+from src.app import create_app, db
+from src.application.user.model import User
+from src.pagination import seek
+
+BATCH_SIZE = 50000
+
+
+def seed(count: int) -> None:
+    """Insert users in batches, hashes are placeholders."""
+    started = datetime.datetime(2020, 1, 1)
+    for offset in range(0, count, BATCH_SIZE):
+        db.session.execute(
+            User.__table__.insert(),
+            [
+                {
+                    "username": f"user{index}",
+                    "email": f"user{index}@example.com",
+                    "password": f"hash{index}",
+                    "created_on": started + datetime.timedelta(seconds=index),
+                    "is_admin": False,
+                }
+                for index in range(offset, min(offset + BATCH_SIZE, count))
+            ],
+        )
+    db.session.commit()
+
+
+def main() -> int:
+    """Run pagination benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=200000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=200)
+    common.add_output_arguments(parser)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="blog-bench-")
+    app = create_app(
+        {
+            "SQLALCHEMY_DATABASE_URI": (
+                f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+            ),
+        }
+    )
+    columns = (User.created_on, User.id)
+    base = select(User).options(
+        load_only(User.id, User.username, User.email, User.created_on)
+    )
+    results = {}
+    with app.app_context():
+        db.create_all()
+        seed(args.users)
+
+        for fraction in (0, 0.5, 0.99):
+            depth = int(args.users * fraction)
+            row = db.session.execute(
+                select(*columns)
+                .order_by(User.created_on.desc(), User.id.desc())
+                .offset(depth)
+                .limit(1)
+            ).one()
+            keyset = seek(base, columns, tuple(row), descending=True)
+            offset = seek(base, columns, descending=True).offset(depth)
+
+            def page(query):
+                def run(_):
+                    users = db.session.scalars(query.limit(args.limit)).all()
+                    assert users
+                    db.session.expunge_all()
+
+                return run
+
+            results[f"keyset depth {depth}"] = common.run_timed(
+                page(keyset), args.requests, warmup=5
+            )
+            results[f"offset depth {depth}"] = common.run_timed(
+                page(offset), args.requests, warmup=5
+            )
+        db.engine.dispose()
+    shutil.rmtree(workdir)
+
+    report = common.build_report(
+        "pagination",
+        results,
+        users=args.users,
+        limit=args.limit,
+        requests=args.requests,
+        database="sqlite",
+    )
+    return common.finish(report, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,149 @@
+"""Post search latency on a large generated corpus.
+
+Posts are seeded into a SQLite file with the FTS5 index maintained by the
+insert trigger, then `search_posts` is timed for rare, common and multi
+word queries. A LIKE scan of the same corpus is timed for comparison with
+fewer iterations.
+
+Usage:
+    python -m benchmarks.search --posts 1000000 --output search.json
+"""
+
+import argparse
+import datetime
+import itertools
+import os
+import random
+import shutil
+import sys
+import tempfile
+
+from sqlalchemy import or_, select, text
+
+from benchmarks import common
+from src.app import create_app, db
+from src.application.post.model import Post
+from src.application.post.service import search_posts
+from src.application.user.model import User
+
+BATCH_SIZE = 20000
+VOCABULARY_SIZE = 20000
+WORDS_PER_POST = 60
+
+
+def vocabulary(size: int) -> list:
+    """Return distinct pseudo words, `word0` is the most frequent."""
+    return [f"word{index}" for index in range(size)]
+
+
+def seed(count: int, rng: random.Random) -> None:
+    """Insert posts with Zipf distributed words in batches."""
+    words = vocabulary(VOCABULARY_SIZE)
+    cum_weights = list(
+        itertools.accumulate(1 / (rank + 1) for rank in range(VOCABULARY_SIZE))
+    )
+    started = datetime.datetime(2020, 1, 1)
+    db.session.add(User(username="author", email="a@example.com", password="x"))
+    db.session.flush()
+    for offset in range(0, count, BATCH_SIZE):
+        rows = []
+        for index in range(offset, min(offset + BATCH_SIZE, count)):
+            sample = rng.choices(
+                words, cum_weights=cum_weights, k=WORDS_PER_POST
+            )
+            rows.append(
+                {
+                    "author_id": 1,
+                    "title": " ".join(sample[:6]),
+                    "body": " ".join(sample[6:]),
+                    "created_on": started + datetime.timedelta(seconds=index),
+                }
+            )
+        db.session.execute(Post.__table__.insert(), rows)
+        db.session.commit()
+
+
+def main() -> int:
+    """Run search benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--posts", type=int, default=1000000)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--scan-requests", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    common.add_output_arguments(parser)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="blog-bench-")
+    app = create_app(
+        {
+            "SQLALCHEMY_DATABASE_URI": (
+                f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+            ),
+        }
+    )
+    queries = {
+        "rare word": "word19999",
+        "common word": "word1",
+        "two words": "word5 word50",
+    }
+    results = {}
+    with app.app_context():
+        db.create_all()
+        seed(args.posts, random.Random(args.seed))
+
+        for case, query in queries.items():
+
+            def search(_, query=query):
+                response, status = search_posts({"q": query, "limit": 20})
+                assert status == 200, response
+                db.session.expunge_all()
+
+            results[f"fts {case}"] = common.run_timed(
+                search, args.requests, warmup=5
+            )
+
+        def ranked(_):
+            # Relevance order scores every match, kept as a reference.
+            db.session.execute(
+                text(
+                    "SELECT rowid FROM posts_fts WHERE posts_fts MATCH "
+                    "'\"word1\"' ORDER BY rank LIMIT 20"
+                )
+            ).all()
+
+        results["fts common word by rank"] = common.run_timed(
+            ranked, args.scan_requests
+        )
+
+        def scan(_):
+            db.session.scalars(
+                select(Post)
+                .where(
+                    or_(
+                        Post.title.like("%word19999%"),
+                        Post.body.like("%word19999%"),
+                    )
+                )
+                .order_by(Post.id.desc())
+                .limit(20)
+            ).all()
+            db.session.expunge_all()
+
+        results["like scan rare word"] = common.run_timed(
+            scan, args.scan_requests
+        )
+        db.engine.dispose()
+    shutil.rmtree(workdir)
+
+    report = common.build_report(
+        "search",
+        results,
+        posts=args.posts,
+        requests=args.requests,
+        database="sqlite",
+    )
+    return common.finish(report, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
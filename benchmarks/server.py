@@ -0,0 +1,159 @@
+"""Throughput of gunicorn per worker class with `gunicorn.conf.py`.
+
+A gunicorn server is started for every worker class against the same
+seeded SQLite file, then client threads with keep-alive connections send
+authenticated `GET /user/` requests. Worker classes whose package is not
+installed (gevent) are skipped.
+
+Usage:
+    python -m benchmarks.server --concurrency 32 --output server.json
+"""
+
+import argparse
+import http.client
+import importlib.util
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks import common
+from benchmarks.api import seed_users
+from src.app import create_app, db
+from src.application.user.model import User
+
+PASSWORD = "abcd1234"
+WORKER_CLASSES = ("sync", "gthread", "gevent")
+
+
+def free_port() -> int:
+    """Return a TCP port nobody listens on."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_server(port: int, timeout: float = 30) -> None:
+    """Poll the health route until the server answers."""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port)
+            connection.request("GET", "/")
+            connection.getresponse().read()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.1)
+
+
+def run_clients(port: int, token: str, count: int, concurrency: int) -> dict:
+    """Send `count` requests from `concurrency` keep-alive connections."""
+    headers = {"Authorization": f"JWT {token}"}
+
+    def client(share: int) -> list:
+        connection = http.client.HTTPConnection("127.0.0.1", port)
+        timings = []
+        for _ in range(share):
+            started = time.perf_counter()
+            try:
+                connection.request("GET", "/user/", headers=headers)
+                response = connection.getresponse()
+            except (http.client.RemoteDisconnected, ConnectionResetError):
+                # Worker recycled by `max_requests`, reconnect like a client.
+                connection.close()
+                connection.request("GET", "/user/", headers=headers)
+                response = connection.getresponse()
+            response.read()
+            assert response.status == 200, response.status
+            timings.append((time.perf_counter() - started) * 1000)
+        connection.close()
+        return timings
+
+    shares = [
+        count // concurrency + (index < count % concurrency)
+        for index in range(concurrency)
+    ]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        timings = [
+            timing
+            for result in executor.map(client, shares)
+            for timing in result
+        ]
+    return common.summarize(timings, time.perf_counter() - started)
+
+
+def main() -> int:
+    """Run gunicorn benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--workers", type=int, help="default from config")
+    parser.add_argument("--users", type=int, default=100)
+    common.add_output_arguments(parser)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="blog-bench-")
+    database_uri = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    app = create_app(
+        {"SQLALCHEMY_DATABASE_URI": database_uri, "BCRYPT_LOG_ROUNDS": 4}
+    )
+    with app.app_context():
+        db.create_all()
+        seed_users(args.users, PASSWORD)
+        token = db.session.get(User, 1).encode_auth_token()
+        db.engine.dispose()
+
+    results = {}
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    for worker_class in WORKER_CLASSES:
+        if worker_class == "gevent" and not importlib.util.find_spec("gevent"):
+            sys.stdout.write("gevent is not installed, skipped\n")
+            continue
+        port = free_port()
+        env = dict(
+            os.environ,
+            SQLALCHEMY_DATABASE_URI=database_uri,
+            SECRET_KEY=app.config["SECRET_KEY"],
+            GUNICORN_BIND=f"127.0.0.1:{port}",
+            GUNICORN_WORKER_CLASS=worker_class,
+            METRICS_ENABLED="false",
+        )
+        if args.workers:
+            env["WEB_CONCURRENCY"] = str(args.workers)
+        with subprocess.Popen(
+            [sys.executable, "-m", "gunicorn"],
+            cwd=root,
+            env=env,
+            stderr=subprocess.DEVNULL,
+        ) as server:
+            try:
+                wait_for_server(port)
+                run_clients(port, token, args.concurrency * 4, args.concurrency)
+                results[f"{worker_class} x{args.concurrency}"] = run_clients(
+                    port, token, args.requests, args.concurrency
+                )
+            finally:
+                server.terminate()
+    shutil.rmtree(workdir)
+
+    report = common.build_report(
+        "server",
+        results,
+        requests=args.requests,
+        concurrency=args.concurrency,
+        workers=args.workers,
+        cpus=os.cpu_count(),
+        database="sqlite",
+    )
+    return common.finish(report, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
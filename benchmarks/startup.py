@@ -0,0 +1,75 @@
+"""Cold start benchmark: import, application factory and first request.
+
+Every sample runs in a fresh interpreter, which is what a gunicorn worker
+boot or a `flask` CLI command pays.
+
+Usage:
+    python -m benchmarks.startup --output startup.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks import common
+
+PROBE = """
+import json, time
+started = time.perf_counter()
+import src.app
+imported = time.perf_counter()
+app = src.app.create_app({"SQLALCHEMY_DATABASE_URI": "sqlite://"})
+created = time.perf_counter()
+assert app.test_client().get("/user/").status_code == 200
+served = time.perf_counter()
+print(json.dumps({
+    "import": imported - started,
+    "create_app": created - imported,
+    "first request": served - created,
+    "import to first response": served - started,
+}))
+"""
+
+
+def sample() -> dict:
+    """Run the probe in a new interpreter and return phase timings in ms."""
+    started = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        check=True,
+        capture_output=True,
+        text=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    ).stdout
+    elapsed = time.perf_counter() - started
+    phases = {name: value * 1000 for name, value in json.loads(output).items()}
+    phases["process total"] = elapsed * 1000
+    return phases
+
+
+def main() -> int:
+    """Run startup benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20)
+    common.add_output_arguments(parser)
+    args = parser.parse_args()
+
+    sample()  # warm the filesystem and bytecode caches
+    timings = {}
+    for _ in range(args.runs):
+        for phase, value in sample().items():
+            timings.setdefault(phase, []).append(value)
+
+    results = {
+        phase: common.summarize(values, sum(values) / 1000)
+        for phase, values in timings.items()
+    }
+    report = common.build_report("startup", results, runs=args.runs)
+    return common.finish(report, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+"""gunicorn settings, loaded automatically by `gunicorn` from this directory.
+
+Run with `gunicorn`, every setting can be overridden through environment
+variables or `GUNICORN_CMD_ARGS`, e.g.
+`GUNICORN_WORKER_CLASS=sync WEB_CONCURRENCY=9 gunicorn`.
+
+The application is imported once in the master (`preload_app`) and forked
+into the workers, `post_fork` drops database connections and hashing
+executors the children would otherwise share with the master.
+"""
+
+from os import cpu_count, environ
+
+# "sync", "gthread" or "gevent", gevent needs `pip install gevent`.
+worker_class = environ.get("GUNICORN_WORKER_CLASS", "gthread")
+if worker_class == "gevent":
+    # Patch before the application and its locks are imported by preload.
+    from gevent import monkey
+
+    monkey.patch_all()
+
+wsgi_app = "src.app:create_app()"
+bind = environ.get("GUNICORN_BIND", "127.0.0.1:8000")
+
+CPUS = cpu_count() or 1
+# Sync workers handle one request each, so more processes than cores keep
+# the CPU busy while some wait on the database. Threaded and gevent workers
+# overlap waits themselves and only need a process per core.
+DEFAULT_WORKERS = {"sync": 2 * CPUS + 1, "gthread": CPUS + 1, "gevent": CPUS}
+workers = int(
+    environ.get("WEB_CONCURRENCY", DEFAULT_WORKERS.get(worker_class, CPUS))
+)
+threads = int(environ.get("GUNICORN_THREADS", 4))
+worker_connections = int(environ.get("GUNICORN_WORKER_CONNECTIONS", 1000))
+
+preload_app = environ.get("GUNICORN_PRELOAD", "true").lower() == "true"
+# Recycle workers after a randomised number of requests, so they do not all
+# restart at once.
+max_requests = int(environ.get("GUNICORN_MAX_REQUESTS", 1000))
+max_requests_jitter = int(environ.get("GUNICORN_MAX_REQUESTS_JITTER", 100))
+# Longer than the default 2 seconds, load balancers reuse idle connections.
+keepalive = int(environ.get("GUNICORN_KEEPALIVE", 5))
+timeout = int(environ.get("GUNICORN_TIMEOUT", 30))
+graceful_timeout = int(environ.get("GUNICORN_GRACEFUL_TIMEOUT", 30))
+errorlog = "-"
+
+
+def post_fork(server, worker):  # pylint: disable=W0613
+    """Give the worker its own database connections and hashing executor."""
+    from src.app import db, hasher  # pylint: disable=C
+
+    flask_app = server.app.wsgi()
+    with flask_app.app_context():
+        for engine in db.engines.values():
+            # Keep the parent's connections open for the parent, only forget
+            # them in this process.
+            engine.dispose(close=False)
+    flask_app.extensions[hasher.extension_name].after_fork()
@@ -1,18 +1,23 @@
 """This module is used to automated deployment related stuff."""
-from flask_migrate import migrate, upgrade
+from flask_migrate import upgrade
 
-from src.app import create_app, db
+from src.app import create_app, db, init_migrations
 
 
 def deploy():
-    """Run deployment tasks."""
-    app = create_app()
-    app.app_context().push()
-    db.create_all()
+    """Run deployment tasks.
 
-    # migrate database to latest revision
-    migrate()
-    upgrade()
+    Revisions are written during development with `flask db migrate`,
+    deploy only applies them.
+    """
+    app = create_app()
+    init_migrations(app)
+    with app.app_context():
+        # migrate database to latest revision, tables created by revisions
+        # must not already exist
+        upgrade()
+        db.create_all()
 
 
-deploy()
+if __name__ == "__main__":
+    deploy()
@@ -10,8 +10,9 @@ from alembic import context
 config = context.config
 
 # Interpret the config file for Python logging.
-# This line sets up loggers basically.
-fileConfig(config.config_file_name)
+# This line sets up loggers basically. Loggers of the application stay
+# enabled when migrations run in its process, e.g. from `manage.py`.
+fileConfig(config.config_file_name, disable_existing_loggers=False)
 logger = logging.getLogger('alembic.env')
 
 
@@ -51,6 +52,21 @@ def get_metadata():
     return target_db.metadata
 
 
+# Search objects created by raw SQL in revision 7a41c9d2e8f3, unknown to the
+# models, so autogenerate must not drop them: the SQLite FTS5 table with its
+# shadow tables and the PostgreSQL tsvector column with its GIN index.
+SEARCH_OBJECTS = {
+    ('column', 'search_vector'),
+    ('index', 'ix_posts_search_vector'),
+}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    if type_ == 'table' and name.startswith('posts_fts'):
+        return False
+    return (type_, name) not in SEARCH_OBJECTS
+
+
 def run_migrations_offline():
     """Run migrations in 'offline' mode.
 
@@ -65,7 +81,10 @@ def run_migrations_offline():
     """
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
-        url=url, target_metadata=get_metadata(), literal_binds=True
+        url=url,
+        target_metadata=get_metadata(),
+        literal_binds=True,
+        include_object=include_object
     )
 
     with context.begin_transaction():
@@ -100,6 +119,7 @@ def run_migrations_online():
         context.configure(
             connection=connection,
             target_metadata=get_metadata(),
+            include_object=include_object,
             **conf_args
         )
 
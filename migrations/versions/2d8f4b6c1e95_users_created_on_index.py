@@ -0,0 +1,38 @@
+"""Add users (created_on, id) index for keyset pagination
+
+Revision ID: 2d8f4b6c1e95
+Revises: 9c3e1f7a2b41
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2d8f4b6c1e95'
+down_revision = '9c3e1f7a2b41'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # PostgreSQL builds the index without blocking writes to users.
+    if op.get_bind().dialect.name == 'postgresql':
+        with op.get_context().autocommit_block():
+            op.create_index(
+                'ix_users_created_on_id',
+                'users',
+                ['created_on', 'id'],
+                unique=False,
+                postgresql_concurrently=True
+            )
+        return
+
+    op.create_index(
+        'ix_users_created_on_id', 'users', ['created_on', 'id'], unique=False
+    )
+
+
+def downgrade():
+    op.drop_index('ix_users_created_on_id', table_name='users')
@@ -1,4 +1,4 @@
-"""empty message
+"""Create users table
 
 Revision ID: 5173be9a6b87
 Revises: 
@@ -17,12 +17,24 @@ depends_on = None
 
 
 def upgrade():
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
+    # Baseline schema, databases created before this revision was filled in
+    # already have the table from `db.create_all()`.
+    op.create_table(
+        'users',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('username', sa.String(length=80), nullable=False),
+        sa.Column('email', sa.String(length=120), nullable=False),
+        sa.Column('password', sa.String(length=500), nullable=False),
+        sa.Column('created_on', sa.DateTime(), nullable=False),
+        sa.Column('is_admin', sa.Boolean(), nullable=False),
+        sa.Column('access_token', sa.String(length=500), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('access_token'),
+        sa.UniqueConstraint('email'),
+        sa.UniqueConstraint('password'),
+        sa.UniqueConstraint('username')
+    )
 
 
 def downgrade():
-    # ### commands auto generated by Alembic - please adjust! ###
-    pass
-    # ### end Alembic commands ###
+    op.drop_table('users')
@@ -0,0 +1,83 @@
+"""Add posts table with full-text index
+
+Revision ID: 7a41c9d2e8f3
+Revises: 2d8f4b6c1e95
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7a41c9d2e8f3'
+down_revision = '2d8f4b6c1e95'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'posts',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('author_id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(length=200), nullable=False),
+        sa.Column('body', sa.Text(), nullable=False),
+        sa.Column('created_on', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['author_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('posts', schema=None) as batch_op:
+        batch_op.create_index(
+            'ix_posts_created_on_id', ['created_on', 'id'], unique=False
+        )
+        batch_op.create_index(
+            'ix_posts_author_id_created_on_id',
+            ['author_id', 'created_on', 'id'],
+            unique=False
+        )
+
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE posts_fts USING fts5("
+            "title, body, content='posts', content_rowid='id')"
+        )
+        op.execute(
+            "CREATE TRIGGER posts_fts_insert AFTER INSERT ON posts BEGIN "
+            "INSERT INTO posts_fts(rowid, title, body) "
+            "VALUES (new.id, new.title, new.body); END"
+        )
+        op.execute(
+            "CREATE TRIGGER posts_fts_delete AFTER DELETE ON posts BEGIN "
+            "INSERT INTO posts_fts(posts_fts, rowid, title, body) "
+            "VALUES ('delete', old.id, old.title, old.body); END"
+        )
+        op.execute(
+            "CREATE TRIGGER posts_fts_update AFTER UPDATE ON posts BEGIN "
+            "INSERT INTO posts_fts(posts_fts, rowid, title, body) "
+            "VALUES ('delete', old.id, old.title, old.body); "
+            "INSERT INTO posts_fts(rowid, title, body) "
+            "VALUES (new.id, new.title, new.body); END"
+        )
+    elif dialect == 'postgresql':
+        op.execute(
+            "ALTER TABLE posts ADD COLUMN search_vector tsvector "
+            "GENERATED ALWAYS AS "
+            "(to_tsvector('english', title || ' ' || body)) STORED"
+        )
+        op.execute(
+            "CREATE INDEX ix_posts_search_vector ON posts "
+            "USING GIN (search_vector)"
+        )
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        op.execute("DROP TABLE IF EXISTS posts_fts")
+
+    with op.batch_alter_table('posts', schema=None) as batch_op:
+        batch_op.drop_index('ix_posts_author_id_created_on_id')
+        batch_op.drop_index('ix_posts_created_on_id')
+
+    op.drop_table('posts')
@@ -0,0 +1,41 @@
+"""Add revoked_tokens table
+
+Revision ID: 9c3e1f7a2b41
+Revises: 5173be9a6b87
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9c3e1f7a2b41'
+down_revision = '5173be9a6b87'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'revoked_tokens',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('jti', sa.String(length=32), nullable=True),
+        sa.Column('user_id', sa.Integer(), nullable=True),
+        sa.Column('revoked_before', sa.DateTime(), nullable=True),
+        sa.Column('expires_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('revoked_tokens', schema=None) as batch_op:
+        batch_op.create_index(
+            batch_op.f('ix_revoked_tokens_expires_at'),
+            ['expires_at'],
+            unique=False
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('revoked_tokens', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_revoked_tokens_expires_at'))
+
+    op.drop_table('revoked_tokens')
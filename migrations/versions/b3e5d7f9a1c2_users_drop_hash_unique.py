@@ -0,0 +1,94 @@
+"""Drop unique constraints of users.password and users.access_token
+
+Revision ID: b3e5d7f9a1c2
+Revises: 7a41c9d2e8f3
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b3e5d7f9a1c2'
+down_revision = '7a41c9d2e8f3'
+branch_labels = None
+depends_on = None
+
+# Salted hashes and signed tokens never collide, the unique indexes only
+# cost an extra B-tree write on every insert and token update.
+COLUMNS = ('password', 'access_token')
+# Names the baseline constraints get on SQLite, where they are unnamed.
+NAMING_CONVENTION = {'uq': 'uq_%(table_name)s_%(column_0_name)s'}
+
+
+def unique_constraint_names(bind):
+    """Map the columns to the names of their single column constraints."""
+    return {
+        constraint['column_names'][0]: constraint['name']
+        for constraint in sa.inspect(bind).get_unique_constraints('users')
+        if constraint['column_names'] in ([column] for column in COLUMNS)
+    }
+
+
+def upgrade():
+    bind = op.get_bind()
+    # bcrypt hashes are always 60 characters.
+    if bind.dialect.name == 'sqlite':
+        # SQLite cannot drop constraints, the table is copied without them.
+        with op.batch_alter_table(
+            'users',
+            naming_convention=NAMING_CONVENTION,
+            recreate='always'
+        ) as batch_op:
+            for column in COLUMNS:
+                batch_op.drop_constraint(
+                    f'uq_users_{column}', type_='unique'
+                )
+            batch_op.alter_column(
+                'password',
+                existing_type=sa.String(length=500),
+                type_=sa.String(length=60),
+                existing_nullable=False
+            )
+        return
+
+    for name in unique_constraint_names(bind).values():
+        op.drop_constraint(name, 'users', type_='unique')
+    op.alter_column(
+        'users',
+        'password',
+        existing_type=sa.String(length=500),
+        type_=sa.String(length=60),
+        existing_nullable=False
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'sqlite':
+        with op.batch_alter_table(
+            'users',
+            naming_convention=NAMING_CONVENTION,
+            recreate='always'
+        ) as batch_op:
+            batch_op.alter_column(
+                'password',
+                existing_type=sa.String(length=60),
+                type_=sa.String(length=500),
+                existing_nullable=False
+            )
+            for column in COLUMNS:
+                batch_op.create_unique_constraint(
+                    f'uq_users_{column}', [column]
+                )
+        return
+
+    op.alter_column(
+        'users',
+        'password',
+        existing_type=sa.String(length=60),
+        type_=sa.String(length=500),
+        existing_nullable=False
+    )
+    for column in COLUMNS:
+        op.create_unique_constraint(f'users_{column}_key', 'users', [column])
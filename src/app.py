@@ -1,57 +1,134 @@
-"""This module is used to bootstrap flask application."""
+"""This module is used to bootstrap flask application.
 
+Importing this module only creates the extension objects, applications are
+built by `create_app`, e.g. `flask --app src.app run` or
+`gunicorn "src.app:create_app()"`.
+"""
+
+from typing import Optional
+
+import click
 from flask import Flask
-from flask_bcrypt import Bcrypt
 from flask_login import (
     LoginManager,
 )
-from flask_marshmallow import Marshmallow
-from flask_migrate import Migrate
 from flask_sqlalchemy import SQLAlchemy
 
+from src.cache import PrincipalCache
+from src.compression import Compressor
+from src.database import (
+    RoutingSession,
+    engine_options,
+    register_sqlite_pragmas,
+    replica_binds,
+)
+from src.hashing import PasswordHasher
+from src.json_provider import FastJSONProvider
+from src.metrics import Metrics
+from src.profiling import Profiler
+from src.ratelimit import RateLimiter
+from src.revocation import TokenDenylist
+from src.slowquery import SlowQueryLog
+
 login_manager = LoginManager()
 # login_manager.session_protection = "strong"
 # login_manager.login_message_category = "info"
 
-db = SQLAlchemy()
-migrate = Migrate()
-bcrypt = Bcrypt()
-marshmallow = Marshmallow()
+db = SQLAlchemy(session_options={"class_": RoutingSession})
+hasher = PasswordHasher()
+principal_cache = PrincipalCache()
+metrics = Metrics()
+compressor = Compressor()
+rate_limiter = RateLimiter()
+token_denylist = TokenDenylist()
+profiler = Profiler()
+slow_query_log = SlowQueryLog()
+
+
+def health() -> dict:
+    """Method to check current application health.
+
+    Returns:
+        dictionary
+    """
+    return {"status": "ok"}
+
+
+def init_migrations(flask_app: Flask) -> None:
+    """Register Flask-Migrate, which imports alembic.
 
+    Args:
+        flask_app (Flask): Flask application object.
+    """
+    from flask_migrate import Migrate  # pylint: disable=C
+
+    Migrate(flask_app, db)
 
-def create_app() -> Flask:
+
+def create_app(config: Optional[dict] = None) -> Flask:
     """Create a flask application object with dependencies.
 
+    Args:
+        config (Optional[dict]): Settings overriding `src.config.Config`.
+
     Returns:
         Flask app object
     """
     flask_app = Flask(__name__)
 
     flask_app.config.from_object("src.config.Config")
+    flask_app.config.update(config or {})
+    flask_app.json = FastJSONProvider(flask_app)
+    flask_app.config.setdefault(
+        "SQLALCHEMY_ENGINE_OPTIONS", engine_options(flask_app.config)
+    )
+    flask_app.config["SQLALCHEMY_BINDS"] = {
+        **replica_binds(flask_app.config),
+        **flask_app.config.get("SQLALCHEMY_BINDS", {}),
+    }
     login_manager.init_app(flask_app)
     db.init_app(flask_app)
-    migrate.init_app(flask_app, db)
-    bcrypt.init_app(flask_app)
-    marshmallow.init_app(flask_app)
+    with flask_app.app_context():
+        for engine in db.engines.values():
+            register_sqlite_pragmas(engine, flask_app.config)
+    slow_query_log.init_app(flask_app)
+    # Registered first, so profiles include the other request hooks.
+    profiler.init_app(flask_app)
+    metrics.init_app(flask_app)
+    hasher.init_app(flask_app)
+    principal_cache.init_app(flask_app)
+    rate_limiter.init_app(flask_app)
+    token_denylist.init_app(flask_app)
+    # Registered after metrics, so request durations include compression.
+    compressor.init_app(flask_app)
+    metrics.add_collector(
+        "auth_cache",
+        principal_cache.stats,
+        counters=("hits", "misses", "evictions"),
+    )
+    metrics.add_collector(
+        "login_rate_limit",
+        rate_limiter.stats,
+        counters=("rejected_ip", "rejected_email"),
+    )
+    metrics.add_collector("token_denylist", token_denylist.stats)
+    metrics.add_collector(
+        "slow_queries", slow_query_log.stats, counters=("logged", "repeated")
+    )
+    # Migrations are only needed by `flask db` commands, so web workers skip
+    # importing alembic when the app is not loaded by the flask CLI.
+    if click.get_current_context(silent=True) is not None:
+        init_migrations(flask_app)
+
+    from src.application.post.route import post  # pylint: disable=C
     from src.application.user.route import user  # pylint: disable=C
 
     flask_app.register_blueprint(user)
+    flask_app.register_blueprint(post)
+    flask_app.add_url_rule("/", "health", health)
 
     return flask_app
 
 
-app = create_app()
-
-
-@app.route("/")
-def health() -> dict:
-    """Method to check current application health.
-
-    Returns:
-        dictionary
-    """
-    return {"status": "ok"}
-
-
 if __name__ == "__main__":
-    app.run(host="127.0.0.1")
+    create_app().run(host="127.0.0.1")
@@ -0,0 +1,128 @@
+"""Post model to perform database operations."""
+
+import datetime
+import re
+
+from marshmallow import Schema, fields, validate
+from sqlalchemy import DDL, event
+
+from src.app import db
+from src.application.user.model import User
+from src.pagination import MAX_INTEGER, MIN_INTEGER
+
+# Full-text index kept in sync by the database, see `search_posts`.
+SQLITE_FTS_DDL = (
+    "CREATE VIRTUAL TABLE posts_fts USING fts5("
+    "title, body, content='posts', content_rowid='id')",
+    "CREATE TRIGGER posts_fts_insert AFTER INSERT ON posts BEGIN "
+    "INSERT INTO posts_fts(rowid, title, body) "
+    "VALUES (new.id, new.title, new.body); END",
+    "CREATE TRIGGER posts_fts_delete AFTER DELETE ON posts BEGIN "
+    "INSERT INTO posts_fts(posts_fts, rowid, title, body) "
+    "VALUES ('delete', old.id, old.title, old.body); END",
+    "CREATE TRIGGER posts_fts_update AFTER UPDATE ON posts BEGIN "
+    "INSERT INTO posts_fts(posts_fts, rowid, title, body) "
+    "VALUES ('delete', old.id, old.title, old.body); "
+    "INSERT INTO posts_fts(rowid, title, body) "
+    "VALUES (new.id, new.title, new.body); END",
+)
+POSTGRESQL_FTS_DDL = (
+    "ALTER TABLE posts ADD COLUMN search_vector tsvector GENERATED ALWAYS AS "
+    "(to_tsvector('english', title || ' ' || body)) STORED",
+    "CREATE INDEX ix_posts_search_vector ON posts USING GIN (search_vector)",
+)
+SEARCH_TERM = re.compile(r"\w+")
+
+
+class Post(db.Model):
+    """Post class."""
+
+    __tablename__ = "posts"
+    # Sort keys of post listings, see `src.pagination`.
+    __table_args__ = (
+        db.Index("ix_posts_created_on_id", "created_on", "id"),
+        db.Index(
+            "ix_posts_author_id_created_on_id", "author_id", "created_on", "id"
+        ),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    author_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    title = db.Column(db.String(200), nullable=False)
+    body = db.Column(db.Text, nullable=False)
+    created_on = db.Column(
+        db.DateTime, default=datetime.datetime.utcnow, nullable=False
+    )
+
+    author = db.relationship(User, lazy="raise")
+
+    def __repr__(self) -> str:
+        """Method to represent post class."""
+        return f"<Post {self.id}>"
+
+    @property
+    def serialize(self) -> dict:
+        """Return object data in easily serializable format."""
+        return {
+            "id": self.id,
+            "author_id": self.author_id,
+            "title": self.title,
+            "body": self.body,
+            "created_at": User.dump_datetime(self.created_on),
+        }
+
+
+for statement in SQLITE_FTS_DDL:
+    event.listen(
+        Post.__table__,
+        "after_create",
+        DDL(statement).execute_if(dialect="sqlite"),
+    )
+for statement in POSTGRESQL_FTS_DDL:
+    event.listen(
+        Post.__table__,
+        "after_create",
+        DDL(statement).execute_if(dialect="postgresql"),
+    )
+event.listen(
+    Post.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS posts_fts").execute_if(dialect="sqlite"),
+)
+
+
+def search_terms(query: str) -> list:
+    """Split a search query into words, dropping full-text query syntax."""
+    return SEARCH_TERM.findall(query.lower())
+
+
+class PostSchema(Schema):
+    """Class to validate user input while creating post."""
+
+    title = fields.Str(required=True, validate=validate.Length(min=1, max=200))
+    body = fields.Str(required=True, validate=validate.Length(min=1))
+
+
+class PostListSchema(Schema):
+    """Class to validate post listing query parameters."""
+
+    limit = fields.Int(load_default=20, validate=validate.Range(min=1, max=100))
+    cursor = fields.Str(load_default=None)
+    author_id = fields.Int(
+        load_default=None,
+        validate=validate.Range(min=MIN_INTEGER, max=MAX_INTEGER),
+    )
+
+
+class PostSearchSchema(Schema):
+    """Class to validate post search query parameters."""
+
+    q = fields.Str(required=True, validate=validate.Length(min=1, max=200))
+    limit = fields.Int(load_default=20, validate=validate.Range(min=1, max=50))
+    cursor = fields.Str(load_default=None)
+
+
+# Schemas hold no per-request state, so one instance is shared by all threads.
+post_schema = PostSchema()
+post_list_schema = PostListSchema()
+post_search_schema = PostSearchSchema()
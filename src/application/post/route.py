@@ -0,0 +1,63 @@
+"""Defines all the post routes."""
+
+from flask import Blueprint, make_response, request
+
+from src.application.post.service import (
+    create_post,
+    get_post,
+    list_posts,
+    search_posts,
+)
+from src.util import conditional, parse_json_body
+
+post = Blueprint(
+    "post",
+    __name__,
+    url_prefix="/post",
+)
+
+
+@post.get("/")
+@conditional(cache_control="public, no-cache")
+def index():
+    """Method to list posts
+    Returns:
+        json.
+    """
+    response, status = list_posts(request.args.to_dict())
+    return make_response(response, status)
+
+
+@post.post("/")
+def store_post():
+    """Post method to create post of the current user
+    Returns:
+        json.
+    """
+    input_data, error = parse_json_body()
+    if error:
+        return make_response(*error)
+    response, status = create_post(input_data)
+    return make_response(response, status)
+
+
+@post.get("/search")
+@conditional(cache_control="public, no-cache")
+def search():
+    """Method to search posts
+    Returns:
+        json.
+    """
+    response, status = search_posts(request.args.to_dict())
+    return make_response(response, status)
+
+
+@post.get("/<int:post_id>")
+@conditional(cache_control="public, max-age=60")
+def show(post_id: int):
+    """Method to get post details
+    Returns:
+        json.
+    """
+    response, status = get_post(post_id)
+    return make_response(response, status)
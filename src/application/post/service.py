@@ -0,0 +1,204 @@
+"""Perform all post related operations."""
+
+import datetime
+
+from flask_login import current_user
+from sqlalchemy import or_, select, text
+
+from src.app import db
+from src.application.post.model import (
+    Post,
+    post_list_schema,
+    post_schema,
+    post_search_schema,
+    search_terms,
+)
+from src.application.user.service import AUTHENTICATION_REQUIRED_MESSAGE
+from src.pagination import (
+    MAX_INTEGER,
+    MIN_INTEGER,
+    decode_cursor,
+    encode_cursor,
+    seek,
+)
+from src.util import generate_response, load_payload
+
+POST_NOT_FOUND_MESSAGE = "Post not found"
+POST_COLUMNS = ", ".join(f"posts.{column.name}" for column in Post.__table__.c)
+# Newest matches first by walking the full-text index in id order, which
+# stops after `limit` rows. Ranking by relevance has to score every match,
+# too slow for common words on large corpora.
+SEARCH_STATEMENTS = {
+    "sqlite": text(
+        f"SELECT {POST_COLUMNS} FROM posts_fts "
+        "JOIN posts ON posts.id = posts_fts.rowid "
+        "WHERE posts_fts MATCH :query AND posts_fts.rowid < :before "
+        "ORDER BY posts_fts.rowid DESC LIMIT :limit"
+    ),
+    "postgresql": text(
+        f"SELECT {POST_COLUMNS} FROM posts "
+        "WHERE posts.search_vector @@ plainto_tsquery('english', :query) "
+        "AND posts.id < :before "
+        "ORDER BY posts.id DESC LIMIT :limit"
+    ),
+}
+# Largest signed 64 bit integer, `before` of the first page.
+MAX_ID = MAX_INTEGER
+
+
+def create_post(input_data: dict) -> tuple:
+    """Method to create post of the current user.
+
+    Args:
+        input_data (dict): Post title and body.
+
+    Returns:
+        tuple: A response object
+    """
+    if not current_user.is_authenticated:
+        return generate_response(
+            message=AUTHENTICATION_REQUIRED_MESSAGE, status=401
+        )
+    payload, errors = load_payload(post_schema, input_data)
+    if errors:
+        return generate_response(message=errors)
+
+    post = Post(author_id=current_user.id, **payload)
+    db.session.add(post)
+    db.session.commit()
+
+    return generate_response(
+        data=post.serialize, message="Post Created", status=201
+    )
+
+
+def get_post(post_id: int) -> tuple:
+    """Method to load a single post.
+
+    Args:
+        post_id (int): Post id.
+
+    Returns:
+        tuple: A response object
+    """
+    # Ids past the column range would overflow the driver, none can match.
+    post = None
+    if MIN_INTEGER <= post_id <= MAX_INTEGER:
+        post = db.session.get(Post, post_id)
+    if post is None:
+        return generate_response(message=POST_NOT_FOUND_MESSAGE, status=404)
+
+    return generate_response(data=post.serialize, status=200)
+
+
+def list_posts(input_data: dict) -> tuple:
+    """Method to list posts newest first, optionally of one author.
+
+    Pages use keyset pagination on `(created_on, id)`, the `next_cursor` of
+    a page is sent back as `cursor` to get the following page.
+
+    Args:
+        input_data (dict): Query parameters, `limit`, `cursor` and
+            `author_id`.
+
+    Returns:
+        tuple: A response object
+    """
+    payload, errors = load_payload(post_list_schema, input_data)
+    if errors:
+        return generate_response(message=errors)
+    after = ()
+    if payload["cursor"]:
+        try:
+            after = decode_cursor(payload["cursor"], (datetime.datetime, int))
+        except ValueError as error:
+            return generate_response(message=str(error), status=400)
+
+    query = select(Post)
+    if payload["author_id"] is not None:
+        query = query.where(Post.author_id == payload["author_id"])
+    limit = payload["limit"]
+    posts = db.session.scalars(
+        seek(query, (Post.created_on, Post.id), after, descending=True).limit(
+            limit + 1
+        )
+    ).all()
+
+    page = posts[:limit]
+    return generate_response(
+        data={
+            "posts": [post.serialize for post in page],
+            "next_cursor": encode_cursor((page[-1].created_on, page[-1].id))
+            if len(posts) > limit
+            else None,
+        },
+        status=200,
+    )
+
+
+def search_posts(input_data: dict) -> tuple:
+    """Method to find posts matching every word of the query, newest first.
+
+    SQLite and PostgreSQL use their full-text index, other backends fall
+    back to a LIKE scan. Pages use keyset pagination on the post id.
+
+    Args:
+        input_data (dict): Query parameters, `q`, `limit` and `cursor`.
+
+    Returns:
+        tuple: A response object
+    """
+    payload, errors = load_payload(post_search_schema, input_data)
+    if errors:
+        return generate_response(message=errors)
+    before = MAX_ID
+    if payload["cursor"]:
+        try:
+            (before,) = decode_cursor(payload["cursor"], (int,))
+        except ValueError as error:
+            return generate_response(message=str(error), status=400)
+    terms = search_terms(payload["q"])
+    if not terms:
+        return generate_response(
+            data={"posts": [], "next_cursor": None}, status=200
+        )
+
+    limit = payload["limit"]
+    params = {"before": before, "limit": limit + 1}
+    backend = db.session.get_bind().dialect.name
+    if backend == "sqlite":
+        # Quoted terms are plain words, FTS5 operators in input are ignored.
+        query = select(Post).from_statement(SEARCH_STATEMENTS[backend])
+        params["query"] = " ".join(f'"{term}"' for term in terms)
+    elif backend == "postgresql":
+        query = select(Post).from_statement(SEARCH_STATEMENTS[backend])
+        params["query"] = " ".join(terms)
+    else:
+        query = (
+            select(Post)
+            .where(
+                Post.id < before,
+                *(
+                    or_(
+                        Post.title.ilike(f"%{term}%"),
+                        Post.body.ilike(f"%{term}%"),
+                    )
+                    for term in terms
+                ),
+            )
+            .order_by(Post.id.desc())
+            .limit(limit + 1)
+        )
+        params = {}
+    posts = db.session.scalars(query, params).all()
+
+    page = posts[:limit]
+    return generate_response(
+        data={
+            "posts": [post.serialize for post in page],
+            "next_cursor": encode_cursor((page[-1].id,))
+            if len(posts) > limit
+            else None,
+        },
+        status=200,
+    )
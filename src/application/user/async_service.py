@@ -0,0 +1,185 @@
+"""Async variants of the user operations used in ASGI mode.
+
+Validation, messages and the principal cache are shared with
+`src.application.user.service`, only database access goes through an
+`AsyncSession` and bcrypt is awaited on the hashing pool.
+"""
+
+from typing import Mapping, Optional, Union
+
+import jwt
+from flask import current_app as app
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.app import hasher, principal_cache, token_denylist
+from src.application.user.model import (
+    ClaimsPrincipal,
+    RevokedToken,
+    User,
+    login_schema,
+    signup_schema,
+)
+from src.application.user.service import (
+    DUPLICATE_USER_MESSAGES,
+    HASHING_BUSY_MESSAGE,
+    unique_violation_field,
+)
+from src.hashing import HashingBusyError
+from src.util import generate_response, load_payload
+
+
+async def find_user_by_email(
+    session: AsyncSession, email: str
+) -> Optional[User]:
+    """Return the user with the given email, if any."""
+    result = await session.execute(select(User).filter_by(email=email))
+    return result.scalars().first()
+
+
+async def is_token_revoked(session: AsyncSession, claims: dict) -> bool:
+    """Check claims against the denylist, refreshing it with the session."""
+    store = token_denylist.store
+    after_id = store.start_refresh()
+    if after_id is not None:
+        result = await session.execute(
+            select(RevokedToken)
+            .filter(RevokedToken.id > after_id)
+            .order_by(RevokedToken.id)
+        )
+        store.finish_refresh(row.revocation() for row in result.scalars())
+    return store.is_revoked(claims)
+
+
+async def create_user(session: AsyncSession, input_data: dict) -> tuple:
+    """Method to create user with given data.
+
+    Args:
+        session (AsyncSession): Database session of the request.
+        input_data (dict): Required user data to create user object.
+
+    Returns:
+        tuple: A response object
+    """
+    payload, errors = load_payload(signup_schema, input_data)
+    if errors:
+        return generate_response(message=errors)
+
+    new_user = User(**payload)
+    try:
+        new_user.password = await hasher.hash_async(new_user.password)
+    except HashingBusyError:
+        return generate_response(message=HASHING_BUSY_MESSAGE, status=503)
+    session.add(new_user)
+    try:
+        await session.commit()
+    except IntegrityError as error:
+        await session.rollback()
+        field = unique_violation_field(error)
+        if field not in DUPLICATE_USER_MESSAGES:
+            raise
+        return generate_response(
+            message=DUPLICATE_USER_MESSAGES[field], status=400
+        )
+    del payload["password"]
+
+    return generate_response(data=payload, message="User Created", status=201)
+
+
+async def login_user(session: AsyncSession, input_data: dict) -> tuple:
+    """Method to login user with given data.
+
+    Args:
+        session (AsyncSession): Database session of the request.
+        input_data (dict): Required user data to create user object.
+
+    Returns:
+        tuple: A response object
+    """
+    payload, errors = load_payload(login_schema, input_data)
+    if errors:
+        return generate_response(message=errors)
+
+    user_details = await find_user_by_email(session, payload["email"])
+
+    try:
+        if (user_details is None) or not await hasher.check_async(
+            user_details.password, payload["password"]
+        ):
+            return generate_response(
+                message="Invalid username or password", status=400
+            )
+
+        if user_details.password_needs_rehash():
+            user_details.password = await hasher.hash_async(payload["password"])
+            await session.commit()
+    except HashingBusyError:
+        return generate_response(message=HASHING_BUSY_MESSAGE, status=503)
+
+    token = user_details.encode_auth_token()
+
+    return generate_response(
+        data={"access_token": token},
+        message="User login successfully",
+        status=201,
+    )
+
+
+async def load_user_from_headers(
+    session: AsyncSession, headers: Mapping[str, str]
+) -> Union[None, User, ClaimsPrincipal]:
+    """Authenticate the user from the JWT in the `Authorization` header.
+
+    Args:
+        session (AsyncSession): Database session of the request.
+        headers (Mapping[str, str]): Request headers with lower case names.
+
+    Returns:
+        Union[None, User, ClaimsPrincipal]: User details if the token is
+            valid otherwise None
+    """
+    auth_headers = headers.get("authorization", "").split()
+    if len(auth_headers) != 2:
+        return None
+    try:
+        data = jwt.decode(
+            auth_headers[1], app.config.get("SECRET_KEY"), algorithms=["HS256"]
+        )
+        if await is_token_revoked(session, data):
+            return None
+        if app.config.get("AUTH_CLAIMS_ONLY") and ClaimsPrincipal.has_claims(
+            data
+        ):
+            return ClaimsPrincipal(data)
+        snapshot = principal_cache.get(data["id"])
+        if snapshot is not None and snapshot["email"] == data["email"]:
+            return User.detached_from_snapshot(snapshot)
+
+        user = await find_user_by_email(session, data["email"])
+        if user:
+            principal_cache.set(user.id, user.snapshot())
+            return user
+    except (jwt.InvalidTokenError, Exception):  # pylint: disable=broad-except
+        return None
+
+    return None
+
+
+async def get_current_user(
+    session: AsyncSession, headers: Mapping[str, str]
+) -> tuple:
+    """Method to load current user.
+
+    Args:
+        session (AsyncSession): Database session of the request.
+        headers (Mapping[str, str]): Request headers with lower case names.
+
+    Returns:
+        tuple: A response object
+    """
+    user = await load_user_from_headers(session, headers)
+    if user is not None:
+        return generate_response(data=user.serialize, status=200)
+
+    return generate_response(data=User().serialize, status=200)
@@ -0,0 +1,162 @@
+"""Bulk user import used by `flask user import`.
+
+Records are read lazily and processed in batches: every batch is validated
+with the signup schema, its passwords are hashed on a process pool and the
+valid rows are inserted with one executemany statement. A batch that hits a
+unique constraint is retried row by row inside savepoints, so a duplicate
+only fails its own row.
+"""
+
+import csv
+import itertools
+import json
+from concurrent.futures import Executor
+from typing import Callable, Dict, Iterable, Iterator, List, TextIO, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+
+from src.app import db, hasher
+from src.application.user.model import User, signup_schema
+from src.application.user.service import (
+    DUPLICATE_USER_MESSAGES,
+    unique_violation_field,
+)
+from src.hashing import hash_password_value
+from src.util import load_payload, modify_error
+
+# Line number and the record read from it, None when it is not an object.
+Record = Tuple[int, object]
+ErrorReporter = Callable[[int, str], None]
+IMPORT_FORMATS = ("csv", "jsonl")
+
+
+def read_records(stream: TextIO, import_format: str) -> Iterator[Record]:
+    """Read user records from CSV with a header row or JSON lines.
+
+    Args:
+        stream (TextIO): Open input file.
+        import_format (str): `csv` or `jsonl`.
+
+    Yields:
+        Record: Line number and record, blank lines are skipped.
+    """
+    if import_format == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+        return
+
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except ValueError:
+            yield line_number, None
+
+
+def validate_batch(
+    records: List[Record], report: ErrorReporter
+) -> List[Tuple[int, dict]]:
+    """Load records with the signup schema, reporting invalid ones.
+
+    Returns:
+        List[Tuple[int, dict]]: Line number and payload of valid records.
+    """
+    valid = []
+    for line_number, record in records:
+        if not isinstance(record, dict):
+            report(line_number, "Invalid record")
+            continue
+        payload, errors = load_payload(signup_schema, record)
+        if errors:
+            report(
+                line_number,
+                "; ".join(
+                    error["error"] for error in modify_error(errors, False)
+                ),
+            )
+            continue
+        valid.append((line_number, payload))
+    return valid
+
+
+def insert_rows(rows: List[Tuple[int, dict]], report: ErrorReporter) -> int:
+    """Insert rows in one statement, falling back to one per row.
+
+    Every attempt runs in a savepoint, so a failed batch leaves the rows of
+    previous batches of the transaction in place.
+
+    Returns:
+        int: Number of inserted rows.
+    """
+    try:
+        with db.session.begin_nested():
+            db.session.execute(insert(User), [row for _, row in rows])
+        return len(rows)
+    except IntegrityError:
+        pass
+
+    inserted = 0
+    for line_number, row in rows:
+        try:
+            with db.session.begin_nested():
+                db.session.execute(insert(User), [row])
+            inserted += 1
+        except IntegrityError as error:
+            field = unique_violation_field(error)
+            if field not in DUPLICATE_USER_MESSAGES:
+                raise
+            report(line_number, DUPLICATE_USER_MESSAGES[field])
+    return inserted
+
+
+def import_users(
+    records: Iterable[Record],
+    executor: Executor,
+    report: ErrorReporter,
+    batch_size: int = 500,
+    batches_per_commit: int = 10,
+) -> Dict[str, int]:
+    """Create users from records without going through the signup route.
+
+    Args:
+        records (Iterable[Record]): Records from `read_records`.
+        executor (Executor): Pool hashing the passwords of a batch.
+        report (ErrorReporter): Called with the line number and message of
+            every rejected record.
+        batch_size (int): Records validated, hashed and inserted at once.
+        batches_per_commit (int): Batches per transaction.
+
+    Returns:
+        Dict[str, int]: Number of imported and failed records.
+    """
+    counts = {"imported": 0, "failed": 0}
+
+    def reject(line_number: int, message: str) -> None:
+        counts["failed"] += 1
+        report(line_number, message)
+
+    rounds = hasher.rounds
+    records = iter(records)
+    batches = 0
+    while True:
+        batch = list(itertools.islice(records, batch_size))
+        if not batch:
+            break
+        valid = validate_batch(batch, reject)
+        hashes = executor.map(
+            hash_password_value,
+            (payload["password"] for _, payload in valid),
+            itertools.repeat(rounds),
+            chunksize=max(1, len(valid) // 32),
+        )
+        for (_, payload), password_hash in zip(valid, hashes):
+            payload["password"] = password_hash
+        counts["imported"] += insert_rows(valid, reject) if valid else 0
+        batches += 1
+        if batches % batches_per_commit == 0:
+            db.session.commit()
+    db.session.commit()
+    return counts
@@ -1,30 +1,67 @@
 """User model to perform database operations."""
 
 import datetime
+import uuid
+from typing import List
 
 import jwt
 from flask import current_app as app
-from flask_bcrypt import check_password_hash, generate_password_hash
 from flask_login import UserMixin
 from marshmallow import Schema, fields, validate
+from sqlalchemy import event
+from sqlalchemy.orm import make_transient_to_detached
 
-from src.app import db, login_manager
+from src.app import (
+    db,
+    hasher,
+    login_manager,
+    principal_cache,
+    token_denylist,
+)
+from src.revocation import Revocation
 
+TOKEN_LIFETIME = datetime.timedelta(minutes=30)
 
-class User(UserMixin, db.Model):
+
+class UserSerializer:
+    """Serialization shared by `User` and `ClaimsPrincipal`."""
+
+    @staticmethod
+    def dump_datetime(value):
+        """Deserialize datetime object into string form for JSON processing."""
+        if value is None:
+            return None
+        # Same as strftime("%Y-%m-%d") and strftime("%H:%M:%S") in one call.
+        return value.isoformat(sep=" ", timespec="seconds").split(" ")
+
+    @property
+    def serialize(self) -> dict:
+        """Return object data in easily serializable format."""
+        return {
+            "id": self.id,
+            "username": self.username,
+            "email": self.email,
+            "modified_at": self.dump_datetime(self.created_on),
+        }
+
+
+class User(UserMixin, UserSerializer, db.Model):
     """User class."""
 
     __tablename__ = "users"
+    # Sort key of the admin listing, see `src.pagination`.
+    __table_args__ = (db.Index("ix_users_created_on_id", "created_on", "id"),)
 
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
-    password = db.Column(db.String(500), nullable=False, unique=True)
+    # bcrypt hashes are 60 characters, salted hashes need no unique index.
+    password = db.Column(db.String(60), nullable=False)
     created_on = db.Column(
         db.DateTime, default=datetime.datetime.utcnow, nullable=False
     )
     is_admin = db.Column(db.Boolean, nullable=False, default=False)
-    access_token = db.Column(db.String(500), nullable=True, unique=True)
+    access_token = db.Column(db.String(500), nullable=True)
 
     def __init__(self, **kwargs):
         """The function takes in a dictionary
@@ -38,28 +75,48 @@ class User(UserMixin, db.Model):
         """Method to represent user class."""
         return f"<User {self.username}>"
 
-    @staticmethod
-    def dump_datetime(value):
-        """Deserialize datetime object into string form for JSON processing."""
-        if value is None:
-            return None
-        return [value.strftime("%Y-%m-%d"), value.strftime("%H:%M:%S")]
-
-    @property
-    def serialize(self) -> dict:
-        """Return object data in easily serializable format."""
+    def snapshot(self) -> dict:
+        """Return loaded column values, used to cache the user across requests."""
         return {
-            "id": self.id,
-            "username": self.username,
-            "email": self.email,
-            "modified_at": self.dump_datetime(self.created_on),
+            column.key: getattr(self, column.key)
+            for column in self.__table__.columns
         }
 
+    @classmethod
+    def detached_from_snapshot(cls, snapshot: dict) -> "User":
+        """Rebuild a detached user from a snapshot without querying database.
+
+        Args:
+            snapshot (dict): Column values returned by `User.snapshot`.
+
+        Returns:
+            User: User object not attached to any session.
+        """
+        user = cls.__mapper__.class_manager.new_instance()
+        for key, value in snapshot.items():
+            setattr(user, key, value)
+        make_transient_to_detached(user)
+        return user
+
+    @classmethod
+    def from_snapshot(cls, snapshot: dict) -> "User":
+        """Rebuild a persistent user from a snapshot without querying database.
+
+        Args:
+            snapshot (dict): Column values returned by `User.snapshot`.
+
+        Returns:
+            User: User object attached to the current session.
+        """
+        return db.session.merge(
+            cls.detached_from_snapshot(snapshot), load=False
+        )
+
     def hash_password(self) -> None:
         """It takes the password that the user has entered, hashes it, and then stores the hashed password in
         the database.
         """
-        self.password = generate_password_hash(self.password).decode("utf8")
+        self.password = hasher.hash(self.password)
 
     def check_password(self, password: str) -> bool:
         """It takes a plaintext password, hashes it,
@@ -71,25 +128,136 @@ class User(UserMixin, db.Model):
         Returns:
             bool: True if hash matched with password
         """
-        return check_password_hash(self.password, password)
+        return hasher.check(self.password, password)
+
+    def password_needs_rehash(self) -> bool:
+        """Return True if stored hash was created with an outdated work factor."""
+        return hasher.needs_rehash(self.password)
 
     def encode_auth_token(self):
         """Generates the Auth Token
         Returns:
             str: Access Token.
         """
+        now = datetime.datetime.utcnow()
         return jwt.encode(
             {
                 "id": self.id,
                 "email": self.email,
                 "username": self.username,
-                "exp": datetime.datetime.utcnow()
-                + datetime.timedelta(minutes=30),
+                "created_on": int(epoch_seconds(self.created_on))
+                if self.created_on
+                else None,
+                "is_admin": bool(self.is_admin),
+                "iat": now,
+                "exp": now + TOKEN_LIFETIME,
+                # Identifies the token in `RevokedToken`.
+                "jti": uuid.uuid4().hex,
             },
             app.config.get("SECRET_KEY"),
         )
 
 
+def epoch_seconds(value: datetime.datetime) -> float:
+    """Convert naive UTC datetime to seconds since epoch."""
+    return value.replace(tzinfo=datetime.timezone.utc).timestamp()
+
+
+class ClaimsPrincipal(UserMixin, UserSerializer):
+    """Authenticated user built from verified token claims.
+
+    Claims cover what `serialize` needs, any other `User` attribute loads
+    the row on first access, so requests that only read claims run no SQL.
+    Claims are as fresh as the token, up to `TOKEN_LIFETIME` old.
+    """
+
+    CLAIMS = ("id", "email", "username", "created_on", "is_admin")
+
+    _user = None
+
+    def __init__(self, claims: dict) -> None:
+        """Copy user fields from claims.
+
+        Args:
+            claims (dict): Verified JWT claims, see `has_claims`.
+        """
+        self.id = claims["id"]
+        self.email = claims["email"]
+        self.username = claims["username"]
+        self.created_on = (
+            datetime.datetime.utcfromtimestamp(claims["created_on"])
+            if claims["created_on"] is not None
+            else None
+        )
+        self.is_admin = claims["is_admin"]
+
+    @classmethod
+    def has_claims(cls, claims: dict) -> bool:
+        """Return True if the token carries every field of the principal."""
+        return all(name in claims for name in cls.CLAIMS)
+
+    def __getattr__(self, name: str):
+        """Load the user row for attributes not present in the claims."""
+        if (
+            name.startswith("__")
+            or name not in User.__mapper__.all_orm_descriptors
+        ):
+            raise AttributeError(name)
+        if self._user is None:
+            self._user = db.session.get(User, self.id)
+            if self._user is None:
+                raise AttributeError(name)
+        return getattr(self._user, name)
+
+    def __repr__(self) -> str:
+        """Method to represent principal."""
+        return f"<ClaimsPrincipal {self.username}>"
+
+
+class RevokedToken(db.Model):
+    """Revoked access token, or every token of a user issued before a time.
+
+    Rows are append only, workers read new rows by increasing id, see
+    `src.revocation`.
+    """
+
+    __tablename__ = "revoked_tokens"
+
+    id = db.Column(db.Integer, primary_key=True)
+    jti = db.Column(db.String(32), nullable=True)
+    user_id = db.Column(db.Integer, nullable=True)
+    revoked_before = db.Column(db.DateTime, nullable=True)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    def revocation(self) -> Revocation:
+        """Return the row in the form kept by the denylist."""
+        return (
+            self.id,
+            self.jti,
+            self.user_id,
+            epoch_seconds(self.revoked_before) if self.revoked_before else None,
+            epoch_seconds(self.expires_at),
+        )
+
+
+@token_denylist.revocation_loader
+def load_revocations(after_id: int) -> List[Revocation]:
+    """Method to load revocations added after the given row id."""
+    rows = (
+        RevokedToken.query.filter(RevokedToken.id > after_id)
+        .order_by(RevokedToken.id)
+        .all()
+    )
+    return [row.revocation() for row in rows]
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def invalidate_cached_user(mapper, connection, target: User) -> None:  # pylint: disable=W0613
+    """Drop cached principal whenever user row changes."""
+    principal_cache.invalidate(target.id)
+
+
 @login_manager.user_loader
 def load_user(userid: int) -> User:
     """Method to load user using id."""
@@ -111,6 +279,31 @@ class LoginSchema(Schema):
     password = fields.Str(required=True, validate=validate.Length(min=6))
 
 
+class UserListSchema(Schema):
+    """Class to validate admin user listing query parameters."""
+
+    limit = fields.Int(load_default=50, validate=validate.Range(min=1, max=200))
+    cursor = fields.Str(load_default=None)
+    count = fields.Str(
+        load_default=None, validate=validate.OneOf(["approximate"])
+    )
+
+
+class UserExportSchema(Schema):
+    """Class to validate user export query parameters."""
+
+    format = fields.Str(
+        load_default="ndjson", validate=validate.OneOf(["ndjson", "csv"])
+    )
+
+
+# Schemas hold no per-request state, so one instance is shared by all threads.
+signup_schema = UserSignupSchema()
+login_schema = LoginSchema()
+user_list_schema = UserListSchema()
+user_export_schema = UserExportSchema()
+
+
 # class ResetPasswordEmailSendSchema(Schema):
 #     email = fields.Email(required=True)
 #
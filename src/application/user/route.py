@@ -1,12 +1,35 @@
 """Defines all the user routes."""
 
-from flask import Blueprint, make_response, request
+import os
+from concurrent.futures import ProcessPoolExecutor
 
+import click
+from flask import (
+    Blueprint,
+    Response,
+    make_response,
+    request,
+    stream_with_context,
+)
+
+from src.app import rate_limiter
+from src.application.user.importer import (
+    IMPORT_FORMATS,
+    import_users,
+    read_records,
+)
 from src.application.user.service import (
+    EXPORT_MIMETYPES,
     create_user,
+    export_rows,
+    export_users,
     get_current_user,
+    list_users,
     login_user,
+    logout_user,
+    revoke_all_tokens,
 )
+from src.util import conditional, parse_json_body, rate_limited_response
 
 user = Blueprint(
     "user",
@@ -18,6 +41,7 @@ user = Blueprint(
 
 
 @user.get("/")
+@conditional(vary="Authorization")
 def index():
     """Method to get the user details
     Returns:
@@ -27,13 +51,47 @@ def index():
     return make_response(response, status)
 
 
+@user.get("/list")
+@conditional(vary="Authorization")
+def user_list():
+    """Method to list users for admins
+    Returns:
+        json.
+    """
+    response, status = list_users(request.args.to_dict())
+    return make_response(response, status)
+
+
+@user.get("/export")
+def user_export():
+    """Method to stream all users for admins as NDJSON or CSV
+    Returns:
+        Streamed response.
+    """
+    export, error = export_users(request.args.to_dict())
+    if error:
+        return make_response(*error)
+    chunks, export_format = export
+    return Response(
+        stream_with_context(chunks),
+        mimetype=EXPORT_MIMETYPES[export_format],
+        headers={
+            "Content-Disposition": (
+                f"attachment; filename=users.{export_format}"
+            )
+        },
+    )
+
+
 @user.post("/")
 def store_user():
     """Post method to create user in system
     Returns:
         json.
     """
-    input_data = request.get_json()
+    input_data, error = parse_json_body()
+    if error:
+        return make_response(*error)
     response, status = create_user(input_data)
     return make_response(response, status)
 
@@ -44,6 +102,106 @@ def user_auth():
     Returns:
         json.
     """
-    input_data = request.get_json()
+    input_data, error = parse_json_body()
+    if error:
+        return make_response(*error)
+    # Rejected before the user lookup and bcrypt check.
+    retry_after = rate_limiter.check_login(
+        request.remote_addr,
+        input_data.get("email"),
+        request.headers.get("x-forwarded-for"),
+    )
+    if retry_after:
+        return make_response(*rate_limited_response(retry_after))
     response, status = login_user(input_data)
     return make_response(response, status)
+
+
+@user.post("/logout")
+def user_logout():
+    """Post method to revoke the access token of the request
+    Returns:
+        json.
+    """
+    response, status = logout_user()
+    return make_response(response, status)
+
+
+@user.post("/revoke-all")
+def user_revoke_all():
+    """Post method to revoke every access token of the user
+    Returns:
+        json.
+    """
+    response, status = revoke_all_tokens()
+    return make_response(response, status)
+
+
+@user.cli.command("export")
+@click.option(
+    "--format",
+    "export_format",
+    type=click.Choice(sorted(EXPORT_MIMETYPES)),
+    default="ndjson",
+    show_default=True,
+)
+@click.option(
+    "--output",
+    type=click.File("wb"),
+    default="-",
+    help="File to write, standard output by default.",
+)
+def export_command(export_format: str, output) -> None:
+    """Stream all users as NDJSON or CSV without loading the table."""
+    for chunk in export_rows(export_format):
+        output.write(chunk)
+
+
+@user.cli.command("import")
+@click.argument("source", type=click.File("r", encoding="utf-8"))
+@click.option(
+    "--format",
+    "import_format",
+    type=click.Choice(IMPORT_FORMATS),
+    help="Input format, guessed from the file extension by default.",
+)
+@click.option("--batch-size", type=click.IntRange(min=1), default=500)
+@click.option("--batches-per-commit", type=click.IntRange(min=1), default=10)
+@click.option(
+    "--workers",
+    type=click.IntRange(min=1),
+    default=os.cpu_count() or 1,
+    help="Processes hashing passwords.",
+)
+def import_command(
+    source,
+    import_format: str,
+    batch_size: int,
+    batches_per_commit: int,
+    workers: int,
+) -> None:
+    """Create users from a CSV or JSON lines file.
+
+    Records need `username`, `email` and `password`. Rejected records are
+    reported on standard error with their line number, the command exits
+    with status 1 when any record failed.
+    """
+    if import_format is None:
+        import_format = "csv" if source.name.endswith(".csv") else "jsonl"
+
+    def report(line_number: int, message: str) -> None:
+        click.echo(f"line {line_number}: {message}", err=True)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        counts = import_users(
+            read_records(source, import_format),
+            executor,
+            report,
+            batch_size=batch_size,
+            batches_per_commit=batches_per_commit,
+        )
+    click.echo(
+        f"Imported {counts['imported']} users, {counts['failed']} failed"
+    )
+    if counts["failed"]:
+        raise SystemExit(1)
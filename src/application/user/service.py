@@ -1,81 +1,154 @@
 """Perform all user related operations."""
 
-from typing import Union
+import csv
+import datetime
+import io
+import re
+from typing import Iterator, Optional, Tuple, Union
 
 import jwt
 from flask import current_app as app
+from flask import g
 from flask_login import current_user
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import load_only
 
-from src.app import db, login_manager
+from src.app import (
+    db,
+    hasher,
+    login_manager,
+    principal_cache,
+    token_denylist,
+)
 from src.application.user.model import (
-    LoginSchema,
+    TOKEN_LIFETIME,
+    ClaimsPrincipal,
+    RevokedToken,
     User,
-    UserSignupSchema,
+    login_schema,
+    signup_schema,
+    user_export_schema,
+    user_list_schema,
+)
+from src.database import approximate_row_count
+from src.hashing import HashingBusyError
+from src.pagination import decode_cursor, encode_cursor, seek
+from src.util import generate_response, load_payload
+
+HASHING_BUSY_MESSAGE = "Server is busy, please try again"
+AUTHENTICATION_REQUIRED_MESSAGE = "Authentication required"
+ADMIN_REQUIRED_MESSAGE = "Admin access required"
+DUPLICATE_USER_MESSAGES = {
+    "username": "Username already exist",
+    "email": "Email  already taken",
+}
+# Exported user columns, the password hash is never selected.
+EXPORT_COLUMNS = (
+    User.id,
+    User.username,
+    User.email,
+    User.created_on,
+    User.is_admin,
+)
+EXPORT_FIELDS = tuple(column.key for column in EXPORT_COLUMNS)
+# Rows fetched from the cursor and written out per chunk.
+EXPORT_BATCH_SIZE = 1000
+EXPORT_MIMETYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+UNIQUE_VIOLATION_PATTERNS = (
+    re.compile(r"UNIQUE constraint failed: users\.(\w+)"),  # SQLite
+    re.compile(r'unique constraint "users_(\w+)_key"'),  # PostgreSQL
+    re.compile(r"for key '(?:users\.)?(\w+)'"),  # MySQL / MariaDB
 )
-from src.util import generate_response
+
+
+def unique_violation_field(error: IntegrityError) -> Optional[str]:
+    """Return the users column whose unique constraint was violated.
+
+    Args:
+        error (IntegrityError): Error raised by the database driver.
+
+    Returns:
+        Optional[str]: Column name or None for any other integrity error.
+    """
+    detail = str(error.orig)
+    for pattern in UNIQUE_VIOLATION_PATTERNS:
+        match = pattern.search(detail)
+        if match:
+            return match.group(1)
+    return None
 
 
 def create_user(input_data: dict) -> tuple:
     """Method to create user with given data.
 
+    Duplicates are detected by the unique constraints on `users.username`
+    and `users.email`, so signup is a single INSERT without racy pre-checks.
+
     Args:
         input_data (dict): Required user data to create user object.
 
     Returns:
         tuple: A response object
     """
-    create_validation_schema = UserSignupSchema()
-    errors = create_validation_schema.validate(input_data)
-
+    payload, errors = load_payload(signup_schema, input_data)
     if errors:
         return generate_response(message=errors)
 
-    check_username_exist = User.query.filter_by(
-        username=input_data.get("username")
-    ).first()
-
-    if check_username_exist:
-        return generate_response(message="Username already exist", status=400)
-
-    check_email_exist = User.query.filter_by(
-        email=input_data.get("email")
-    ).first()
-    if check_email_exist:
-        return generate_response(message="Email  already taken", status=400)
-
-    new_user = User(**input_data)
-    new_user.hash_password()
+    new_user = User(**payload)
+    try:
+        new_user.hash_password()
+    except HashingBusyError:
+        return generate_response(message=HASHING_BUSY_MESSAGE, status=503)
     db.session.add(new_user)
-    db.session.commit()
-    del input_data["password"]
+    try:
+        db.session.commit()
+    except IntegrityError as error:
+        db.session.rollback()
+        field = unique_violation_field(error)
+        if field not in DUPLICATE_USER_MESSAGES:
+            raise
+        return generate_response(
+            message=DUPLICATE_USER_MESSAGES[field], status=400
+        )
+    del payload["password"]
 
-    return generate_response(
-        data=input_data, message="User Created", status=201
-    )
+    return generate_response(data=payload, message="User Created", status=201)
 
 
 def login_user(input_data: dict) -> tuple:
     """Method to login user with given data.
 
+    Stored hashes created with an outdated work factor are transparently
+    rehashed with the configured `BCRYPT_LOG_ROUNDS`.
+
     Args:
         input_data (dict): Required user data to create user object.
 
     Returns:
         tuple: A response object
     """
-    create_validation_schema = LoginSchema()
-    errors = create_validation_schema.validate(input_data)
+    payload, errors = load_payload(login_schema, input_data)
     if errors:
         return generate_response(message=errors)
 
-    user_details = User.query.filter_by(email=input_data.get("email")).first()
+    user_details = User.query.filter_by(email=payload["email"]).first()
 
-    if (user_details is None) or not user_details.check_password(
-        input_data.get("password")
-    ):
-        return generate_response(
-            message="Invalid username or password", status=400
-        )
+    try:
+        if (user_details is None) or not user_details.check_password(
+            payload["password"]
+        ):
+            return generate_response(
+                message="Invalid username or password", status=400
+            )
+
+        if user_details.password_needs_rehash():
+            # Hashed before assignment, a busy hasher must not leave the
+            # plaintext on the user for a later flush to write.
+            user_details.password = hasher.hash(payload["password"])
+            db.session.commit()
+    except HashingBusyError:
+        return generate_response(message=HASHING_BUSY_MESSAGE, status=503)
 
     token = user_details.encode_auth_token()
 
@@ -87,14 +160,21 @@ def login_user(input_data: dict) -> tuple:
 
 
 @login_manager.request_loader
-def load_user_from_request(request) -> Union[None, User]:
+def load_user_from_request(
+    request,
+) -> Union[None, User, ClaimsPrincipal]:
     """Method take JWT user token from header and try to authenticate user based on given details.
 
+    Verified users are served from the principal cache and revoked tokens
+    are looked up in the in-memory denylist, so steady-state traffic does
+    not query the database for every authenticated request. With
+    `AUTH_CLAIMS_ONLY` the user is built from the token claims instead.
+
     Args:
         request : Flask request object.
 
     Returns:
-        Union[None, User]: User details if user provides valid token otherwise None
+        Union[None, User, ClaimsPrincipal]: User details if user provides valid token otherwise None
     """
     auth_headers = request.headers.get("Authorization", "").split()
     if len(auth_headers) != 2:
@@ -104,8 +184,20 @@ def load_user_from_request(request) -> Union[None, User]:
         data = jwt.decode(
             token, app.config.get("SECRET_KEY"), algorithms=["HS256"]
         )
+        if token_denylist.is_revoked(data):
+            return None
+        g.token_claims = data
+        if app.config.get("AUTH_CLAIMS_ONLY") and ClaimsPrincipal.has_claims(
+            data
+        ):
+            return ClaimsPrincipal(data)
+        snapshot = principal_cache.get(data["id"])
+        if snapshot is not None and snapshot["email"] == data["email"]:
+            return User.from_snapshot(snapshot)
+
         user = User.query.filter_by(email=data["email"]).first()
         if user:
+            principal_cache.set(user.id, user.snapshot())
             return user
     except jwt.ExpiredSignatureError:
         return None
@@ -128,3 +220,233 @@ def get_current_user() -> tuple:
         )
 
     return generate_response(data=User().serialize, status=200)
+
+
+def revocation_for_claims(claims: dict) -> RevokedToken:
+    """Build the revocation of a single token.
+
+    Tokens issued before `jti` was added are revoked with every other token
+    of the user issued up to now.
+
+    Args:
+        claims (dict): Verified JWT claims.
+
+    Returns:
+        RevokedToken: Row to store.
+    """
+    expires_at = datetime.datetime.utcfromtimestamp(claims["exp"])
+    if "jti" in claims:
+        return RevokedToken(jti=claims["jti"], expires_at=expires_at)
+    return RevokedToken(
+        user_id=claims["id"],
+        revoked_before=revocation_cutoff(),
+        expires_at=expires_at,
+    )
+
+
+def revocation_cutoff() -> datetime.datetime:
+    """Return the current time in whole seconds, the precision of `iat`."""
+    return datetime.datetime.utcnow().replace(microsecond=0)
+
+
+def revocation_for_user(user_id: int) -> RevokedToken:
+    """Build the revocation of every token of the user issued before now."""
+    now = revocation_cutoff()
+    return RevokedToken(
+        user_id=user_id, revoked_before=now, expires_at=now + TOKEN_LIFETIME
+    )
+
+
+def store_revocation(revoked: RevokedToken) -> None:
+    """Persist the revocation and apply it to this process immediately.
+
+    Expired rows can not match any token anymore and are deleted on the way.
+
+    Args:
+        revoked (RevokedToken): Revocation to store.
+    """
+    RevokedToken.query.filter(
+        RevokedToken.expires_at < datetime.datetime.utcnow()
+    ).delete()
+    db.session.add(revoked)
+    db.session.flush()
+    # Read before the commit expires the row, which would reload it.
+    revocation = revoked.revocation()
+    db.session.commit()
+    token_denylist.add([revocation])
+
+
+def logout_user() -> tuple:
+    """Method to revoke the access token of the current request.
+
+    Returns:
+        tuple: A response object
+    """
+    if not current_user.is_authenticated:
+        return generate_response(
+            message=AUTHENTICATION_REQUIRED_MESSAGE, status=401
+        )
+
+    store_revocation(revocation_for_claims(g.token_claims))
+    return generate_response(message="User logout successfully", status=200)
+
+
+def revoke_all_tokens() -> tuple:
+    """Method to revoke every access token of the current user.
+
+    Returns:
+        tuple: A response object
+    """
+    if not current_user.is_authenticated:
+        return generate_response(
+            message=AUTHENTICATION_REQUIRED_MESSAGE, status=401
+        )
+
+    store_revocation(revocation_for_user(current_user.id))
+    return generate_response(message="All tokens revoked", status=200)
+
+
+def require_admin() -> Optional[tuple]:
+    """Method to check the current user may use admin routes.
+
+    Token claims and cached principals may be up to `TOKEN_LIFETIME` or
+    `AUTH_CACHE_TTL` old, so the admin flag is read from the database and a
+    demoted admin loses access on the next request.
+
+    Returns:
+        Optional[tuple]: None for admins, otherwise a 401 or 403 response.
+    """
+    if not current_user.is_authenticated:
+        return generate_response(
+            message=AUTHENTICATION_REQUIRED_MESSAGE, status=401
+        )
+    is_admin = db.session.scalar(
+        select(User.is_admin).where(User.id == current_user.id)
+    )
+    if not is_admin:
+        return generate_response(message=ADMIN_REQUIRED_MESSAGE, status=403)
+    return None
+
+
+def list_users(input_data: dict) -> tuple:
+    """Method to list users for admins, newest first.
+
+    Pages use keyset pagination on `(created_on, id)`, the `next_cursor` of
+    a page is sent back as `cursor` to get the following page.
+
+    Args:
+        input_data (dict): Query parameters, `limit`, `cursor` and
+            `count=approximate` to add an estimated total.
+
+    Returns:
+        tuple: A response object
+    """
+    error = require_admin()
+    if error:
+        return error
+
+    payload, errors = load_payload(user_list_schema, input_data)
+    if errors:
+        return generate_response(message=errors)
+    after = ()
+    if payload["cursor"]:
+        try:
+            after = decode_cursor(payload["cursor"], (datetime.datetime, int))
+        except ValueError as error:
+            return generate_response(message=str(error), status=400)
+
+    limit = payload["limit"]
+    query = seek(
+        select(User).options(
+            load_only(User.id, User.username, User.email, User.created_on)
+        ),
+        (User.created_on, User.id),
+        after,
+        descending=True,
+    ).limit(limit + 1)
+    users = db.session.scalars(query).all()
+
+    page = users[:limit]
+    data = {
+        "users": [user.serialize for user in page],
+        "next_cursor": encode_cursor((page[-1].created_on, page[-1].id))
+        if len(users) > limit
+        else None,
+    }
+    if payload["count"] == "approximate":
+        data["approximate_total"] = approximate_row_count(
+            db.session, User.__tablename__
+        )
+    return generate_response(data=data, status=200)
+
+
+def export_rows(
+    export_format: str, batch_size: int = EXPORT_BATCH_SIZE
+) -> Iterator[bytes]:
+    """Stream every user as NDJSON lines or CSV rows, ordered by id.
+
+    Rows are plain column tuples fetched `batch_size` at a time through a
+    server side cursor where the driver supports one, so memory use does
+    not grow with the table. One chunk is yielded per batch, CSV output
+    starts with the header row before the query runs.
+
+    Args:
+        export_format (str): `ndjson` or `csv`.
+        batch_size (int): Rows fetched and yielded at once.
+
+    Yields:
+        bytes: Encoded output chunks.
+    """
+    if export_format == "csv":
+        yield (",".join(EXPORT_FIELDS) + "\r\n").encode("utf-8")
+    result = db.session.execute(
+        select(*EXPORT_COLUMNS)
+        .order_by(User.id)
+        .execution_options(yield_per=batch_size)
+    )
+    try:
+        for rows in result.partitions():
+            records = [
+                (
+                    row.id,
+                    row.username,
+                    row.email,
+                    row.created_on.isoformat(sep=" ", timespec="seconds"),
+                    row.is_admin,
+                )
+                for row in rows
+            ]
+            if export_format == "csv":
+                buffer = io.StringIO()
+                csv.writer(buffer).writerows(records)
+                yield buffer.getvalue().encode("utf-8")
+            else:
+                dumps = app.json.compact_dumps
+                yield b"".join(
+                    dumps(dict(zip(EXPORT_FIELDS, record))) + b"\n"
+                    for record in records
+                )
+    finally:
+        result.close()
+
+
+def export_users(
+    input_data: dict,
+) -> Tuple[Optional[Tuple[Iterator[bytes], str]], Optional[tuple]]:
+    """Method to export all users for admins.
+
+    Args:
+        input_data (dict): Query parameters, `format` is `ndjson` or `csv`.
+
+    Returns:
+        tuple: Output chunks with their format and None, or None and an
+            error response.
+    """
+    error = require_admin()
+    if error:
+        return None, error
+    payload, errors = load_payload(user_export_schema, input_data)
+    if errors:
+        return None, generate_response(message=errors)
+    export_format = payload["format"]
+    return (export_rows(export_format), export_format), None
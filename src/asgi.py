@@ -0,0 +1,225 @@
+"""ASGI entry point serving the user endpoints with async handlers.
+
+The Flask application still provides configuration, extensions and JSON
+encoding, requests are dispatched here without going through WSGI, e.g.
+`uvicorn --factory src.asgi:create_asgi_app`.
+
+Only the routes in `AsgiApp.routes` are served, request metrics and the `/metrics`
+endpoint stay with the WSGI application.
+"""
+
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from flask import Flask
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.app import create_app, db, hasher, rate_limiter, slow_query_log
+from src.application.user import async_service
+from src.database import create_async_engine_from_config
+from src.util import (
+    BODY_TOO_LARGE_MESSAGE,
+    INVALID_JSON_MESSAGE,
+    NOT_JSON_MESSAGE,
+    generate_response,
+    rate_limited_response,
+)
+
+Handler = Callable[["Request", AsyncSession], Awaitable[tuple]]
+
+
+class BodyError(Exception):
+    """Raised when a request body is rejected before validation."""
+
+    def __init__(self, message: str, status: int) -> None:
+        """Keep the response message and status."""
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+class Request:
+    """Minimal view of an ASGI HTTP request."""
+
+    def __init__(self, scope: dict, receive: Callable) -> None:
+        """Read method, path and headers from the connection scope."""
+        self.method = scope["method"]
+        self.path = scope["path"]
+        self.remote_addr = (scope.get("client") or (None,))[0]
+        self.headers = {
+            name.decode("latin-1").lower(): value.decode("latin-1")
+            for name, value in scope.get("headers", [])
+        }
+        self._receive = receive
+
+    @property
+    def is_json(self) -> bool:
+        """Check the mimetype the same way as `flask.Request.is_json`."""
+        mimetype = (
+            self.headers.get("content-type", "").split(";")[0].strip().lower()
+        )
+        return mimetype == "application/json" or (
+            mimetype.startswith("application/") and mimetype.endswith("+json")
+        )
+
+    async def body(self, max_size: int) -> bytes:
+        """Read the body, refusing to buffer more than `max_size` bytes.
+
+        Raises:
+            BodyError: Body is larger than `max_size`.
+        """
+        length = self.headers.get("content-length")
+        if length is not None and length.isdigit() and int(length) > max_size:
+            raise BodyError(BODY_TOO_LARGE_MESSAGE, 413)
+
+        chunks: List[bytes] = []
+        size = 0
+        more_body = True
+        while more_body:
+            message = await self._receive()
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > max_size:
+                raise BodyError(BODY_TOO_LARGE_MESSAGE, 413)
+            chunks.append(chunk)
+            more_body = message.get("more_body", False)
+        return b"".join(chunks)
+
+
+class AsgiApp:
+    """ASGI application backed by an `AsyncSession` per request."""
+
+    def __init__(self, flask_app: Flask) -> None:
+        """Create the async engine for the Flask application database.
+
+        Args:
+            flask_app (Flask): Application built by `create_app`.
+        """
+        self.flask_app = flask_app
+        with flask_app.app_context():
+            sync_url = db.engine.url
+        self.engine = create_async_engine_from_config(
+            flask_app.config, sync_url
+        )
+        slow_query_log.attach(flask_app, self.engine.sync_engine)
+        self.sessionmaker = async_sessionmaker(
+            self.engine, expire_on_commit=False
+        )
+        self.routes: Dict[Tuple[str, str], Handler] = {
+            ("GET", "/user/"): self.index,
+            ("POST", "/user/"): self.store_user,
+            ("POST", "/user/login"): self.user_auth,
+        }
+
+    async def __call__(self, scope: dict, receive: Callable, send: Callable):
+        """Handle one ASGI connection."""
+        if scope["type"] == "lifespan":
+            await self.lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        request = Request(scope, receive)
+        with self.flask_app.app_context():
+            response, status, *extra = await self.dispatch(request)
+            body = self.flask_app.json.compact_dumps(response) + b"\n"
+        headers = [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("latin-1")),
+        ]
+        for name, value in (extra[0] if extra else {}).items():
+            headers.append((name.lower().encode(), value.encode("latin-1")))
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": headers,
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+    async def lifespan(self, receive: Callable, send: Callable) -> None:
+        """Release the engine and hashing pool when the server stops."""
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.engine.dispose()
+                self.flask_app.extensions[hasher.extension_name].shutdown()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def dispatch(self, request: Request) -> tuple:
+        """Call the handler registered for the request method and path."""
+        if request.method == "GET" and request.path == "/":
+            return {"status": "ok"}, 200
+
+        handler = self.routes.get((request.method, request.path))
+        if handler is None:
+            if any(path == request.path for _, path in self.routes):
+                return generate_response(
+                    message="Method not allowed", status=405
+                )
+            return generate_response(message="Not found", status=404)
+
+        async with self.sessionmaker() as session:
+            return await handler(request, session)
+
+    async def json_body(self, request: Request) -> Optional[dict]:
+        """Read the request JSON object like `src.util.parse_json_body`.
+
+        Raises:
+            BodyError: Body is too large, not JSON or not an object.
+        """
+        data = await request.body(
+            self.flask_app.config.get("MAX_JSON_BODY_SIZE", 16 * 1024)
+        )
+        if not request.is_json:
+            raise BodyError(NOT_JSON_MESSAGE, 415)
+        try:
+            data = self.flask_app.json.loads(data)
+        except ValueError:
+            data = None
+        if not isinstance(data, dict):
+            raise BodyError(INVALID_JSON_MESSAGE, 400)
+        return data
+
+    @staticmethod
+    async def index(request: Request, session: AsyncSession) -> tuple:
+        """Return the current user details."""
+        return await async_service.get_current_user(session, request.headers)
+
+    async def store_user(self, request: Request, session: AsyncSession):
+        """Create user in system."""
+        try:
+            input_data = await self.json_body(request)
+        except BodyError as error:
+            return generate_response(message=error.message, status=error.status)
+        return await async_service.create_user(session, input_data)
+
+    async def user_auth(self, request: Request, session: AsyncSession):
+        """Return user access token."""
+        try:
+            input_data = await self.json_body(request)
+        except BodyError as error:
+            return generate_response(message=error.message, status=error.status)
+        retry_after = rate_limiter.check_login(
+            request.remote_addr,
+            input_data.get("email"),
+            request.headers.get("x-forwarded-for"),
+        )
+        if retry_after:
+            return rate_limited_response(retry_after)
+        return await async_service.login_user(session, input_data)
+
+
+def create_asgi_app(config: Optional[dict] = None) -> AsgiApp:
+    """Create the ASGI application.
+
+    Args:
+        config (Optional[dict]): Settings overriding `src.config.Config`.
+
+    Returns:
+        AsgiApp: ASGI callable.
+    """
+    return AsgiApp(create_app(config))
@@ -0,0 +1,138 @@
+"""In-process caches shared by the application modules."""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+from flask import Flask, current_app
+
+
+class TTLCache:
+    """Bounded LRU cache whose entries expire after a fixed time to live.
+
+    The cache is local to the worker process, so entries written by another
+    process are only picked up once the local copy expires.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60) -> None:
+        """Set cache limits.
+
+        Args:
+            maxsize (int): Maximum number of entries, 0 disables the cache.
+            ttl (float): Seconds an entry stays valid after it is stored.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return number of stored entries, including expired ones."""
+        return len(self._data)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return cached value for the key and mark it as recently used.
+
+        Args:
+            key (Hashable): Cache key.
+
+        Returns:
+            Optional[Any]: Cached value or None if missing or expired.
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store the value, evicting the least recently used entry if full.
+
+        Args:
+            key (Hashable): Cache key.
+            value (Any): Value to store.
+        """
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop the entry stored for the key, if any."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop all entries and reset counters."""
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> dict:
+        """Return counters used to size the cache.
+
+        Returns:
+            dict: Cache size, limits, hit, miss and eviction counts.
+        """
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class PrincipalCache:
+    """Flask extension caching authenticated users per application."""
+
+    extension_name = "principal_cache"
+
+    def init_app(self, app: Flask) -> None:
+        """Create the application cache from configuration.
+
+        Args:
+            app (Flask): Flask application object.
+        """
+        app.extensions[self.extension_name] = TTLCache(
+            maxsize=app.config.get("AUTH_CACHE_SIZE", 1024),
+            ttl=app.config.get("AUTH_CACHE_TTL", 60),
+        )
+
+    @property
+    def store(self) -> TTLCache:
+        """Return the cache of the current application."""
+        return current_app.extensions[self.extension_name]
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return cached principal for the key."""
+        return self.store.get(key)
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store principal for the key."""
+        self.store.set(key, value)
+
+    def invalidate(self, key: Hashable) -> None:
+        """Drop cached principal for the key."""
+        self.store.invalidate(key)
+
+    def stats(self) -> dict:
+        """Return hit and miss counters of the current application cache."""
+        return self.store.stats()
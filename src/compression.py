@@ -0,0 +1,212 @@
+"""Response compression negotiated from `Accept-Encoding`.
+
+Buffered bodies smaller than `COMPRESSION_MIN_SIZE` are sent as is, larger
+ones are compressed in one call. Streamed bodies are compressed chunk by
+chunk and flushed after every chunk, so clients receive data as soon as the
+application yields it and nothing is buffered.
+
+gzip is always available, brotli (`br`) and zstd are offered when the
+`brotli` and `zstandard` packages are installed.
+"""
+
+import zlib
+from typing import Callable, Dict, Iterable, Iterator, Union
+
+from flask import Flask, Response, current_app, request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+# Content types worth compressing, compared without parameters.
+COMPRESSIBLE_MIMETYPES = frozenset(
+    (
+        "application/json",
+        "application/x-ndjson",
+        "text/csv",
+        "text/html",
+        "text/plain",
+    )
+)
+
+
+class GzipEncoder:
+    """Incremental gzip stream."""
+
+    def __init__(self, level: int) -> None:
+        """Create compressor with a gzip header."""
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + 15)
+
+    def compress(self, data: bytes) -> bytes:
+        """Compress data, output may be held back until a flush."""
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        """Emit everything compressed so far, keeping the stream open."""
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        """End the stream."""
+        return self._compressor.flush()
+
+
+class BrotliEncoder:
+    """Incremental brotli stream."""
+
+    def __init__(self, level: int) -> None:
+        """Create compressor, `level` is the brotli quality 0 to 11."""
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data: bytes) -> bytes:
+        """Compress data, output may be held back until a flush."""
+        return self._compressor.process(data)
+
+    def flush(self) -> bytes:
+        """Emit everything compressed so far, keeping the stream open."""
+        return self._compressor.flush()
+
+    def finish(self) -> bytes:
+        """End the stream."""
+        return self._compressor.finish()
+
+
+class ZstdEncoder:
+    """Incremental zstd stream."""
+
+    def __init__(self, level: int) -> None:
+        """Create compressor, `level` is the zstd level 1 to 22."""
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        """Compress data, output may be held back until a flush."""
+        return self._compressor.compress(data)
+
+    def flush(self) -> bytes:
+        """Emit everything compressed so far, keeping the stream open."""
+        return self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        """End the stream."""
+        return self._compressor.flush()
+
+
+def available_encoders() -> Dict[str, Callable[[int], object]]:
+    """Return encoder factories by content coding for installed libraries."""
+    encoders: Dict[str, Callable[[int], object]] = {}
+    if zstandard is not None:
+        encoders["zstd"] = ZstdEncoder
+    if brotli is not None:
+        encoders["br"] = BrotliEncoder
+    encoders["gzip"] = GzipEncoder
+    return encoders
+
+
+def compress_stream(
+    encoder, chunks: Iterable[Union[bytes, str]]
+) -> Iterator[bytes]:
+    """Compress a response iterable without buffering it.
+
+    Args:
+        encoder: Encoder created for this response.
+        chunks (Iterable[Union[bytes, str]]): Body chunks produced by the
+            application, text is encoded as UTF-8 like werkzeug does.
+
+    Yields:
+        bytes: Compressed chunks, one per non-empty input chunk.
+    """
+    try:
+        for chunk in chunks:
+            if chunk:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode("utf-8")
+                yield encoder.compress(chunk) + encoder.flush()
+        yield encoder.finish()
+    finally:
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
+
+
+class Compressor:
+    """Flask extension compressing responses after every request."""
+
+    extension_name = "compression"
+
+    def init_app(self, app: Flask) -> None:
+        """Register the response hook and resolve enabled encodings.
+
+        Args:
+            app (Flask): Flask application object.
+        """
+        if not app.config.get("COMPRESSION_ENABLED", True):
+            return
+
+        encoders = available_encoders()
+        wanted = app.config.get("COMPRESSION_ALGORITHMS", "zstd,br,gzip")
+        app.extensions[self.extension_name] = {
+            coding: encoders[coding]
+            for coding in (name.strip() for name in wanted.split(","))
+            if coding in encoders
+        }
+        app.after_request(self.compress_response)
+
+    @staticmethod
+    def levels() -> Dict[str, int]:
+        """Return configured compression level by content coding."""
+        config = current_app.config
+        return {
+            "gzip": config.get("COMPRESSION_GZIP_LEVEL", 6),
+            "br": config.get("COMPRESSION_BROTLI_LEVEL", 4),
+            "zstd": config.get("COMPRESSION_ZSTD_LEVEL", 3),
+        }
+
+    def compress_response(self, response: Response) -> Response:
+        """Compress the response body when the client accepts it.
+
+        Args:
+            response (Response): Response built by the view.
+
+        Returns:
+            Response: The same response, possibly with an encoded body.
+        """
+        encoders = current_app.extensions[self.extension_name]
+        if (
+            not encoders
+            or request.method == "HEAD"
+            or response.status_code < 200
+            or response.status_code in (204, 206, 304)
+            or response.direct_passthrough
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+        ):
+            return response
+
+        response.vary.add("Accept-Encoding")
+        streamed = response.is_streamed
+        min_size = current_app.config.get("COMPRESSION_MIN_SIZE", 500)
+        if not streamed and len(response.get_data()) < min_size:
+            return response
+        coding = request.accept_encodings.best_match(list(encoders))
+        if coding is None:
+            return response
+
+        encoder = encoders[coding](self.levels()[coding])
+        if streamed:
+            response.response = compress_stream(encoder, response.response)
+            response.headers.pop("Content-Length", None)
+        else:
+            response.set_data(
+                encoder.compress(response.get_data()) + encoder.finish()
+            )
+        response.headers["Content-Encoding"] = coding
+        # Encoded bytes differ from the identity body the ETag was made of.
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
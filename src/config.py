@@ -1,5 +1,5 @@
 """Flask App configuration."""
-from os import environ
+from os import cpu_count, environ
 
 
 class Config:
@@ -9,6 +9,12 @@ class Config:
     ENVIRONMENT = environ.get("ENVIRONMENT", "development")
     FLASK_DEBUG = environ.get("FLASK_DEBUG", 1)
     SECRET_KEY = environ.get("SECRET_KEY", "3d6f45a5fc12445dbac2f59c3b6c7cb1")
+    # Serialize responses with orjson when it is installed
+    JSON_FAST_ENCODER = (
+        environ.get("JSON_FAST_ENCODER", "true").lower() == "true"
+    )
+    # Bytes, larger JSON request bodies are rejected before validation
+    MAX_JSON_BODY_SIZE = int(environ.get("MAX_JSON_BODY_SIZE", 16 * 1024))
     STATIC_FOLDER = "static"
     TEMPLATES_FOLDER = "templates"
 
@@ -29,3 +35,113 @@ class Config:
         "SQLALCHEMY_DATABASE_URI", SQL_DATABASE_URI
     )
     SQLALCHEMY_TRACK_MODIFICATIONS = True
+    # Comma separated read replica URLs, plain SELECTs of a request go to
+    # one of them until the request writes, see `src.database.RoutingSession`
+    DATABASE_REPLICA_URIS = [
+        uri.strip()
+        for uri in environ.get("DATABASE_REPLICA_URIS", "").split(",")
+        if uri.strip()
+    ]
+    # ASGI mode, derived from SQLALCHEMY_DATABASE_URI with an async driver
+    # (aiosqlite, asyncpg or aiomysql) when not set
+    ASYNC_DATABASE_URI = environ.get("ASYNC_DATABASE_URI")
+
+    # Engine profile, see `src.database`. Pool settings apply to server
+    # databases, pragmas to every new SQLite connection.
+    DB_POOL_SIZE = int(environ.get("DB_POOL_SIZE", 10))
+    DB_MAX_OVERFLOW = int(environ.get("DB_MAX_OVERFLOW", 20))
+    DB_POOL_RECYCLE = int(environ.get("DB_POOL_RECYCLE", 1800))
+    DB_POOL_TIMEOUT = int(environ.get("DB_POOL_TIMEOUT", 30))
+    DB_POOL_PRE_PING = environ.get("DB_POOL_PRE_PING", "true").lower() == "true"
+    SQLITE_JOURNAL_MODE = environ.get("SQLITE_JOURNAL_MODE", "WAL")
+    SQLITE_SYNCHRONOUS = environ.get("SQLITE_SYNCHRONOUS", "NORMAL")
+    SQLITE_MMAP_SIZE = int(environ.get("SQLITE_MMAP_SIZE", 256 * 1024 * 1024))
+    # Negative value is size in KiB
+    SQLITE_CACHE_SIZE = int(environ.get("SQLITE_CACHE_SIZE", -64000))
+    # Milliseconds
+    SQLITE_BUSY_TIMEOUT = int(environ.get("SQLITE_BUSY_TIMEOUT", 5000))
+
+    # Authentication
+    # Verified principals are cached per worker process, size 0 disables it
+    AUTH_CACHE_SIZE = int(environ.get("AUTH_CACHE_SIZE", 1024))
+    AUTH_CACHE_TTL = int(environ.get("AUTH_CACHE_TTL", 60))
+    # Build `current_user` from token claims instead of loading the user,
+    # profile changes show up once the user gets a new token
+    AUTH_CLAIMS_ONLY = (
+        environ.get("AUTH_CLAIMS_ONLY", "false").lower() == "true"
+    )
+    # Seconds a worker trusts its copy of revoked tokens before reading
+    # revocations made by other workers
+    TOKEN_DENYLIST_REFRESH = float(environ.get("TOKEN_DENYLIST_REFRESH", 5))
+    # Login attempts allowed per client IP and per target email, as
+    # "<requests>/<seconds>" token buckets. "memory" keeps buckets per worker
+    # process, "sqlite" shares them between workers through a local file.
+    RATELIMIT_ENABLED = (
+        environ.get("RATELIMIT_ENABLED", "true").lower() == "true"
+    )
+    RATELIMIT_BACKEND = environ.get("RATELIMIT_BACKEND", "memory")
+    RATELIMIT_SQLITE_PATH = environ.get("RATELIMIT_SQLITE_PATH")
+    RATELIMIT_MEMORY_SIZE = int(environ.get("RATELIMIT_MEMORY_SIZE", 10000))
+    RATELIMIT_LOGIN_PER_IP = environ.get("RATELIMIT_LOGIN_PER_IP", "30/60")
+    RATELIMIT_LOGIN_PER_EMAIL = environ.get(
+        "RATELIMIT_LOGIN_PER_EMAIL", "10/300"
+    )
+    # Number of reverse proxies in front of the app. The per IP limit is
+    # keyed on the address they add to X-Forwarded-For instead of the peer
+    # address, 0 ignores the header, which clients can forge.
+    RATELIMIT_TRUSTED_PROXIES = int(environ.get("RATELIMIT_TRUSTED_PROXIES", 0))
+
+    # Password hashing
+    BCRYPT_LOG_ROUNDS = int(environ.get("BCRYPT_LOG_ROUNDS", 12))
+    # "thread", "process" or "inline" to hash on the request thread
+    BCRYPT_EXECUTOR = environ.get("BCRYPT_EXECUTOR", "thread")
+    BCRYPT_WORKERS = int(environ.get("BCRYPT_WORKERS", cpu_count() or 1))
+    BCRYPT_QUEUE_SIZE = int(environ.get("BCRYPT_QUEUE_SIZE", 32))
+    BCRYPT_QUEUE_TIMEOUT = float(environ.get("BCRYPT_QUEUE_TIMEOUT", 5))
+
+    # Response compression, negotiated from Accept-Encoding in the order
+    # listed. br and zstd need the brotli and zstandard packages. Buffered
+    # bodies below COMPRESSION_MIN_SIZE bytes are sent uncompressed.
+    COMPRESSION_ENABLED = (
+        environ.get("COMPRESSION_ENABLED", "true").lower() == "true"
+    )
+    COMPRESSION_ALGORITHMS = environ.get(
+        "COMPRESSION_ALGORITHMS", "zstd,br,gzip"
+    )
+    COMPRESSION_MIN_SIZE = int(environ.get("COMPRESSION_MIN_SIZE", 500))
+    COMPRESSION_GZIP_LEVEL = int(environ.get("COMPRESSION_GZIP_LEVEL", 6))
+    COMPRESSION_BROTLI_LEVEL = int(environ.get("COMPRESSION_BROTLI_LEVEL", 4))
+    COMPRESSION_ZSTD_LEVEL = int(environ.get("COMPRESSION_ZSTD_LEVEL", 3))
+
+    # Metrics, recorded per worker process
+    METRICS_ENABLED = environ.get("METRICS_ENABLED", "true").lower() == "true"
+    METRICS_PATH = environ.get("METRICS_PATH", "/metrics")
+
+    # Request profiling, off by default. A fraction PROFILING_SAMPLE_RATE of
+    # requests is profiled, plus requests with a PROFILING_HEADER signed with
+    # PROFILING_SECRET (`flask profile-token`). Profiles are written to
+    # PROFILING_DIR, `instance/profiles` by default, keeping the newest
+    # PROFILING_MAX_FILES.
+    PROFILING_ENABLED = (
+        environ.get("PROFILING_ENABLED", "false").lower() == "true"
+    )
+    PROFILING_SAMPLE_RATE = float(environ.get("PROFILING_SAMPLE_RATE", 0))
+    PROFILING_SECRET = environ.get("PROFILING_SECRET")
+    PROFILING_HEADER = environ.get("PROFILING_HEADER", "X-Profile")
+    PROFILING_DIR = environ.get("PROFILING_DIR")
+    PROFILING_MAX_FILES = int(environ.get("PROFILING_MAX_FILES", 100))
+
+    # Statements slower than SLOW_QUERY_THRESHOLD_MS are logged with their
+    # plan, repeats of a statement are summarised every
+    # SLOW_QUERY_LOG_INTERVAL seconds.
+    SLOW_QUERY_LOG_ENABLED = (
+        environ.get("SLOW_QUERY_LOG_ENABLED", "true").lower() == "true"
+    )
+    SLOW_QUERY_THRESHOLD_MS = float(environ.get("SLOW_QUERY_THRESHOLD_MS", 200))
+    SLOW_QUERY_LOG_INTERVAL = float(environ.get("SLOW_QUERY_LOG_INTERVAL", 60))
+    SLOW_QUERY_EXPLAIN = (
+        environ.get("SLOW_QUERY_EXPLAIN", "true").lower() == "true"
+    )
+    SLOW_QUERY_MAX_STATEMENTS = int(
+        environ.get("SLOW_QUERY_MAX_STATEMENTS", 1000)
+    )
@@ -0,0 +1,241 @@
+"""Database engine profiles applied per backend and replica routing."""
+
+import random
+from typing import Any, Dict, Mapping, Optional, Union
+
+from flask_sqlalchemy.session import Session as FlaskSession
+from sqlalchemy import Select, event, text
+from sqlalchemy.engine import URL, Connection, Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+from sqlalchemy.sql.dml import UpdateBase
+
+# Async driver used for each backend in ASGI mode.
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+
+# Bind keys of read replicas are this prefix and the replica position.
+REPLICA_BIND_PREFIX = "replica_"
+
+
+def engine_options(config: Mapping) -> dict:
+    """Build `SQLALCHEMY_ENGINE_OPTIONS` for the configured database.
+
+    SQLite keeps SQLAlchemy's default pool and is tuned through pragmas,
+    server databases get a sized QueuePool.
+
+    Args:
+        config (Mapping): Flask application config.
+
+    Returns:
+        dict: Keyword arguments passed to `create_engine`.
+    """
+    url = make_url(config["SQLALCHEMY_DATABASE_URI"])
+    if url.get_backend_name() == "sqlite":
+        return {}
+
+    return {
+        "pool_size": config["DB_POOL_SIZE"],
+        "max_overflow": config["DB_MAX_OVERFLOW"],
+        "pool_recycle": config["DB_POOL_RECYCLE"],
+        "pool_timeout": config["DB_POOL_TIMEOUT"],
+        "pool_pre_ping": config["DB_POOL_PRE_PING"],
+    }
+
+
+def sqlite_pragmas(config: Mapping) -> dict:
+    """Return pragmas applied to every new SQLite connection."""
+    return {
+        "journal_mode": config["SQLITE_JOURNAL_MODE"],
+        "synchronous": config["SQLITE_SYNCHRONOUS"],
+        "mmap_size": config["SQLITE_MMAP_SIZE"],
+        "cache_size": config["SQLITE_CACHE_SIZE"],
+        "busy_timeout": config["SQLITE_BUSY_TIMEOUT"],
+    }
+
+
+def register_sqlite_pragmas(engine: Engine, config: Mapping) -> None:
+    """Apply configured pragmas whenever the engine opens a SQLite connection.
+
+    Args:
+        engine (Engine): SQLAlchemy engine, ignored unless it is SQLite.
+        config (Mapping): Flask application config.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+
+    pragmas = sqlite_pragmas(config)
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):  # pylint: disable=W0613
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+
+def replica_binds(config: Mapping) -> Dict[str, str]:
+    """Build `SQLALCHEMY_BINDS` entries for `DATABASE_REPLICA_URIS`.
+
+    Args:
+        config (Mapping): Flask application config.
+
+    Returns:
+        Dict[str, str]: Replica URL by bind key.
+    """
+    return {
+        f"{REPLICA_BIND_PREFIX}{index}": uri
+        for index, uri in enumerate(config.get("DATABASE_REPLICA_URIS") or ())
+    }
+
+
+class RoutingSession(FlaskSession):
+    """Session reading from a replica until it writes.
+
+    Plain SELECT statements go to a replica picked once per session, so
+    reads within a request see one consistent replica. Flushes, DML, text
+    statements and `SELECT ... FOR UPDATE` go to the primary. After the
+    first write every statement of the session goes to the primary, so a
+    request reads its own writes however far the replica lags.
+
+    Without replica binds every statement goes to the primary.
+    """
+
+    def get_bind(
+        self,
+        mapper: Optional[Any] = None,
+        clause: Optional[Any] = None,
+        bind: Optional[Union[Engine, Connection]] = None,
+        **kwargs: Any,
+    ) -> Union[Engine, Connection]:
+        """Return a replica engine for reads, the primary for anything else."""
+        if bind is not None:
+            return bind
+        if self._flushing or isinstance(clause, UpdateBase):
+            self.info["wrote"] = True
+        elif (
+            not self.info.get("wrote")
+            and isinstance(clause, Select)
+            and clause._for_update_arg is None  # pylint: disable=W0212
+        ):
+            replica = self.replica_engine()
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper, clause, bind, **kwargs)
+
+    def replica_engine(self) -> Optional[Engine]:
+        """Return the replica of this session, None without replicas."""
+        engines = self._db.engines
+        key = self.info.get("replica")
+        if key is None:
+            keys = [
+                name
+                for name in engines
+                if name and name.startswith(REPLICA_BIND_PREFIX)
+            ]
+            if not keys:
+                return None
+            key = self.info["replica"] = random.choice(keys)
+        return engines[key]
+
+
+def async_database_url(url: Union[str, URL]) -> URL:
+    """Return the URL of the same database with its async driver.
+
+    Args:
+        url (Union[str, URL]): Database URL using a synchronous driver.
+
+    Raises:
+        ValueError: The backend has no supported async driver.
+
+    Returns:
+        URL: Database URL for `create_async_engine`.
+    """
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver for database backend: {backend}")
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+
+def create_async_engine_from_config(
+    config: Mapping, url: Union[str, URL]
+) -> AsyncEngine:
+    """Create the async engine with the same profile as the sync engine.
+
+    Args:
+        config (Mapping): Flask application config.
+        url (Union[str, URL]): Synchronous database URL of the application,
+            used when `ASYNC_DATABASE_URI` is not configured.
+
+    Returns:
+        AsyncEngine: Engine used by the ASGI application.
+    """
+    async_url = make_url(
+        config.get("ASYNC_DATABASE_URI") or async_database_url(url)
+    )
+    options = {}
+    if async_url.get_backend_name() != "sqlite":
+        options = engine_options(
+            {**config, "SQLALCHEMY_DATABASE_URI": async_url}
+        )
+    elif async_url.database in (None, "", ":memory:"):
+        # Every connection would get its own empty in-memory database.
+        options = {
+            "poolclass": StaticPool,
+            "connect_args": {"check_same_thread": False},
+        }
+
+    engine = create_async_engine(async_url, **options)
+    register_sqlite_pragmas(engine.sync_engine, config)
+    return engine
+
+
+def approximate_row_count(
+    session: Session, table: str, key: str = "id"
+) -> Optional[int]:
+    """Return a cheap row count estimate instead of a `COUNT(*)` scan.
+
+    PostgreSQL and MySQL report planner statistics, SQLite uses the largest
+    integer primary key, which ignores deleted rows.
+
+    Args:
+        session (Session): Session to query with.
+        table (str): Table name.
+        key (str): Integer primary key column, used on SQLite.
+
+    Returns:
+        Optional[int]: Estimated rows, None if the backend has no estimate.
+    """
+    backend = session.get_bind().dialect.name
+    if backend == "postgresql":
+        estimate = session.execute(
+            text(
+                "SELECT reltuples::bigint FROM pg_class "
+                "WHERE oid = CAST(:t AS regclass)"
+            ),
+            {"t": table},
+        ).scalar()
+        # -1 until the table was vacuumed or analyzed once.
+        return estimate if estimate is not None and estimate >= 0 else None
+    if backend in ("mysql", "mariadb"):
+        return session.execute(
+            text(
+                "SELECT table_rows FROM information_schema.tables "
+                "WHERE table_schema = DATABASE() AND table_name = :t"
+            ),
+            {"t": table},
+        ).scalar()
+    if backend == "sqlite":
+        return (
+            session.execute(
+                text(f'SELECT max("{key}") FROM "{table}"')
+            ).scalar()
+            or 0
+        )
+    return None
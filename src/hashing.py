@@ -0,0 +1,241 @@
+"""Password hashing executed on a bounded worker pool."""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import (
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from typing import Any, Callable, Optional
+
+import bcrypt
+from flask import Flask, current_app, g, has_request_context
+
+# bcrypt only uses the first 72 bytes of a password, newer releases of the
+# library raise instead of truncating so keep the historical behaviour.
+BCRYPT_MAX_PASSWORD_BYTES = 72
+
+
+class HashingBusyError(Exception):
+    """Raised when the hashing queue stays full for longer than the timeout."""
+
+
+def hash_password_value(password: str, rounds: int) -> str:
+    """Hash the password with bcrypt.
+
+    Args:
+        password (str): Plain text password.
+        rounds (int): bcrypt work factor.
+
+    Returns:
+        str: bcrypt hash.
+    """
+    secret = password.encode("utf-8")[:BCRYPT_MAX_PASSWORD_BYTES]
+    return bcrypt.hashpw(secret, bcrypt.gensalt(rounds)).decode("utf-8")
+
+
+def check_password_value(password_hash: str, password: str) -> bool:
+    """Compare the password with a stored bcrypt hash.
+
+    Args:
+        password_hash (str): Stored bcrypt hash.
+        password (str): Plain text password.
+
+    Returns:
+        bool: True if hash matched with password
+    """
+    secret = password.encode("utf-8")[:BCRYPT_MAX_PASSWORD_BYTES]
+    return bcrypt.checkpw(secret, password_hash.encode("utf-8"))
+
+
+def hash_rounds(password_hash: str) -> int:
+    """Return the work factor stored in a bcrypt hash, e.g. `$2b$12$...`."""
+    return int(password_hash.split("$")[2])
+
+
+class HashingPool:
+    """Run hashing jobs on a lazily created executor with a bounded queue.
+
+    At most `workers + queue_size` jobs are admitted at once, callers beyond
+    that wait up to `timeout` seconds and then get `HashingBusyError`, so a
+    login burst is shed instead of piling up on every request thread.
+    """
+
+    def __init__(
+        self,
+        mode: str = "thread",
+        workers: int = 1,
+        queue_size: int = 0,
+        timeout: float = 5,
+    ) -> None:
+        """Set executor options.
+
+        Args:
+            mode (str): "thread", "process" or "inline".
+            workers (int): Number of executor workers.
+            queue_size (int): Jobs allowed to wait for a free worker.
+            timeout (float): Seconds to wait for a queue slot.
+        """
+        if mode not in ("thread", "process", "inline"):
+            raise ValueError(f"Unknown hashing executor: {mode}")
+        self.mode = mode
+        self.workers = max(workers, 1)
+        self.timeout = timeout
+        self.queue_size = queue_size
+        self._slots = threading.BoundedSemaphore(self.workers + queue_size)
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> Executor:
+        """Return the executor, creating it on first use.
+
+        Creating it lazily keeps pools out of a pre-forking master process.
+        """
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    executor_class = (
+                        ProcessPoolExecutor
+                        if self.mode == "process"
+                        else ThreadPoolExecutor
+                    )
+                    self._executor = executor_class(max_workers=self.workers)
+        return self._executor
+
+    def run(self, func: Callable, *args) -> Any:
+        """Run the function on the pool and wait for its result.
+
+        Args:
+            func (Callable): Picklable module level function.
+            *args: Function arguments.
+
+        Raises:
+            HashingBusyError: No queue slot became free within the timeout.
+
+        Returns:
+            Any: Function result.
+        """
+        if self.mode == "inline":
+            return func(*args)
+        if not self._slots.acquire(timeout=self.timeout):
+            raise HashingBusyError("Password hashing queue is full")
+        try:
+            future = self.executor.submit(func, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result()
+
+    async def run_async(self, func: Callable, *args) -> Any:
+        """Await the function on the pool without blocking the event loop.
+
+        Args:
+            func (Callable): Picklable module level function.
+            *args: Function arguments.
+
+        Raises:
+            HashingBusyError: No queue slot became free within the timeout.
+
+        Returns:
+            Any: Function result.
+        """
+        loop = asyncio.get_running_loop()
+        if self.mode == "inline":
+            return await loop.run_in_executor(None, func, *args)
+
+        deadline = loop.time() + self.timeout
+        while not self._slots.acquire(blocking=False):
+            if loop.time() >= deadline:
+                raise HashingBusyError("Password hashing queue is full")
+            await asyncio.sleep(0.01)
+        try:
+            future = self.executor.submit(func, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return await asyncio.wrap_future(future)
+
+    def after_fork(self) -> None:
+        """Drop executor state inherited from the parent process.
+
+        Worker threads or processes of the parent do not exist in a forked
+        child, a new executor is created on next use.
+        """
+        self._executor = None
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.workers + self.queue_size)
+
+    def shutdown(self) -> None:
+        """Stop the executor, a new one is created on next use."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+
+class PasswordHasher:
+    """Flask extension hashing passwords with the configured work factor."""
+
+    extension_name = "password_hasher"
+
+    def init_app(self, app: Flask) -> None:
+        """Create the application hashing pool from configuration.
+
+        Args:
+            app (Flask): Flask application object.
+        """
+        app.extensions[self.extension_name] = HashingPool(
+            mode=app.config.get("BCRYPT_EXECUTOR", "thread"),
+            workers=app.config.get("BCRYPT_WORKERS", 1),
+            queue_size=app.config.get("BCRYPT_QUEUE_SIZE", 0),
+            timeout=app.config.get("BCRYPT_QUEUE_TIMEOUT", 5),
+        )
+
+    @property
+    def pool(self) -> HashingPool:
+        """Return the hashing pool of the current application."""
+        return current_app.extensions[self.extension_name]
+
+    @property
+    def rounds(self) -> int:
+        """Return configured bcrypt work factor."""
+        return current_app.config.get("BCRYPT_LOG_ROUNDS", 12)
+
+    def run(self, func: Callable, *args) -> Any:
+        """Run the function on the pool, adding its time to request metrics."""
+        started = time.perf_counter()
+        try:
+            return self.pool.run(func, *args)
+        finally:
+            # Request total is reported by `src.metrics`.
+            if has_request_context() and "bcrypt_seconds" in g:
+                g.bcrypt_seconds += time.perf_counter() - started
+
+    def hash(self, password: str) -> str:
+        """Hash the password on the hashing pool."""
+        return self.run(hash_password_value, password, self.rounds)
+
+    def check(self, password_hash: str, password: str) -> bool:
+        """Check the password against the hash on the hashing pool."""
+        return self.run(check_password_value, password_hash, password)
+
+    async def hash_async(self, password: str) -> str:
+        """Hash the password on the hashing pool from a coroutine."""
+        return await self.pool.run_async(
+            hash_password_value, password, self.rounds
+        )
+
+    async def check_async(self, password_hash: str, password: str) -> bool:
+        """Check the password against the hash from a coroutine."""
+        return await self.pool.run_async(
+            check_password_value, password_hash, password
+        )
+
+    def needs_rehash(self, password_hash: str) -> bool:
+        """Return True if the hash uses a different work factor than config."""
+        return hash_rounds(password_hash) != self.rounds
@@ -0,0 +1,161 @@
+"""JSON provider using orjson when it is installed.
+
+Output is byte for byte what Flask's default provider produces for compact
+responses: keys sorted, ASCII only and datetimes as HTTP dates. Anything
+orjson would render differently is handed to the standard library: types
+it does not know, non string keys, integers over 64 bits and floats that
+Python writes in exponent notation or as `NaN`/`Infinity`.
+"""
+
+import dataclasses
+import json
+from typing import Any, Optional
+
+from flask import Flask, Response
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+# orjson and the standard library agree on floats inside this range, outside
+# it they disagree on the exponent (`1e16` and `1e+16`) and non finite
+# values, which orjson writes as `null`.
+PLAIN_FLOAT_RANGE = (1e-4, 1e16)
+SCALAR_TYPES = frozenset((str, int, bool, type(None)))
+# orjson writes exponents as `e-7` or `e16`, never with a plus sign. Mapping
+# digits and minus signs to `0` turns every exponent into `0e0`, found with a
+# single search. Strings such as "1e5" match too and only cost a walk.
+EXPONENT_TABLE = bytes.maketrans(b"123456789-", b"0" * 10)
+
+
+def differs_from_stdlib(obj: Any) -> bool:
+    """Return whether the data holds a float orjson renders differently.
+
+    Args:
+        obj (Any): The data to serialize.
+
+    Returns:
+        bool: True when a non zero float lies outside
+            `PLAIN_FLOAT_RANGE` or is not finite.
+    """
+    low, high = PLAIN_FLOAT_RANGE
+    stack = [obj]
+    while stack:
+        value = stack.pop()
+        kind = type(value)
+        # Exact type checks first, most values of a response are scalars.
+        if kind in SCALAR_TYPES:
+            continue
+        if kind is dict:
+            stack.extend(value.values())
+        elif kind is list or kind is tuple:
+            stack.extend(value)
+        elif isinstance(value, float):
+            # NaN fails both comparisons.
+            if value != 0 and not low <= abs(value) < high:
+                return True
+        elif isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+        elif dataclasses.is_dataclass(value) and not isinstance(value, type):
+            stack.extend(
+                getattr(value, field.name)
+                for field in dataclasses.fields(value)
+            )
+    return False
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider with an optional orjson fast path."""
+
+    def __init__(self, app: Flask) -> None:
+        """Choose the encoder from `JSON_FAST_ENCODER` config."""
+        super().__init__(app)
+        self.use_orjson = orjson is not None and app.config.get(
+            "JSON_FAST_ENCODER", True
+        )
+
+    @property
+    def orjson_options(self) -> int:
+        """Return orjson flags matching the provider settings."""
+        # Flask renders dates as HTTP dates and dataclasses via `asdict`, so
+        # they go through `default` instead of orjson's native encoding.
+        options = (
+            orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        )
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        return options
+
+    def fast_dumps(self, obj: Any) -> Optional[bytes]:
+        """Serialize with orjson, None if the result could differ from stdlib.
+
+        Args:
+            obj (Any): The data to serialize.
+
+        Returns:
+            Optional[bytes]: Compact JSON or None.
+        """
+        try:
+            body = orjson.dumps(
+                obj, default=self.default, option=self.orjson_options
+            )
+        except TypeError:
+            # Unsupported types, non string keys or integers over 64 bits.
+            return None
+        if self.ensure_ascii and not body.isascii():
+            return None
+        if self.may_differ(body) and differs_from_stdlib(obj):
+            return None
+        return body
+
+    @staticmethod
+    def may_differ(body: bytes) -> bool:
+        """Return whether the output may hold floats stdlib writes otherwise.
+
+        Floats outside `PLAIN_FLOAT_RANGE` are written with an exponent and
+        non finite floats as null, bodies without either match the standard
+        library and their data is not walked. Both are byte searches, a
+        regular expression is several times slower on large bodies.
+
+        Args:
+            body (bytes): orjson output.
+
+        Returns:
+            bool: True when `differs_from_stdlib` has to check the data.
+        """
+        return b"null" in body or b"0e0" in body.translate(EXPONENT_TABLE)
+
+    def compact_dumps(self, obj: Any) -> bytes:
+        """Serialize data as compact JSON bytes.
+
+        Args:
+            obj (Any): The data to serialize.
+
+        Returns:
+            bytes: JSON without whitespace between items.
+        """
+        if self.use_orjson:
+            body = self.fast_dumps(obj)
+            if body is not None:
+                return body
+        return json.dumps(
+            obj,
+            default=self.default,
+            ensure_ascii=self.ensure_ascii,
+            sort_keys=self.sort_keys,
+            separators=(",", ":"),
+        ).encode("utf-8")
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        """Serialize arguments as a JSON response, see `DefaultJSONProvider`."""
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            self.compact_dumps(obj) + b"\n", mimetype=self.mimetype
+        )
@@ -0,0 +1,333 @@
+"""Per-process request metrics exposed in Prometheus text format.
+
+Every thread records into its own shard, so recording never takes a lock.
+Shards are only merged when `/metrics` is scraped. Shards of exited threads
+are folded into a single retired shard, so servers starting a thread per
+request do not grow the list. Numbers are per worker process, a scrape
+through a load balancer sees one worker at a time.
+"""
+
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+from flask import Flask, Response, g, has_request_context, request
+from sqlalchemy import event
+
+LATENCY_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+
+HISTOGRAMS = {
+    "http_request_duration_seconds": (
+        "Request latency in seconds.",
+        LATENCY_BUCKETS,
+    ),
+    "http_request_db_queries": (
+        "SQL statements executed per request.",
+        QUERY_COUNT_BUCKETS,
+    ),
+    "http_request_db_duration_seconds": (
+        "Time spent executing SQL per request in seconds.",
+        LATENCY_BUCKETS,
+    ),
+    "http_request_bcrypt_duration_seconds": (
+        "Time spent on password hashing per request in seconds.",
+        LATENCY_BUCKETS,
+    ),
+}
+COUNTERS = {
+    "http_responses_total": "Responses sent, by endpoint and status.",
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """Bucket counts of observed values, buckets are not cumulative."""
+
+    __slots__ = ("buckets", "counts", "sum")
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+        """Create empty histogram with given upper bounds."""
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Record a value."""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+class Shard:
+    """Metrics recorded by a single thread, only that thread writes to it."""
+
+    __slots__ = ("histograms", "counters")
+
+    def __init__(self) -> None:
+        """Create empty shard."""
+        self.histograms: Dict[Tuple[str, Labels], Histogram] = {}
+        self.counters: Dict[Tuple[str, Labels], float] = {}
+
+
+class ShardOwner:
+    """Held only by the thread local, collected when its thread exits."""
+
+    __slots__ = ("__weakref__",)
+
+
+def merge(target: Shard, source: Shard) -> None:
+    """Add the values recorded in `source` to `target`."""
+    for key, histogram in list(source.histograms.items()):
+        merged = target.histograms.get(key)
+        if merged is None:
+            merged = target.histograms[key] = Histogram(histogram.buckets)
+        merged.counts = [
+            total + count
+            for total, count in zip(merged.counts, histogram.counts)
+        ]
+        merged.sum += histogram.sum
+    for key, value in list(source.counters.items()):
+        target.counters[key] = target.counters.get(key, 0) + value
+
+
+def escape(value: str) -> str:
+    """Escape a label value for the Prometheus text format."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(labels: Labels, **extra) -> str:
+    """Render labels as `{name="value",...}`."""
+    pairs = list(labels) + list(extra.items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{escape(str(v))}"' for k, v in pairs) + "}"
+
+
+def format_bound(bound: float) -> str:
+    """Render a bucket bound the way Prometheus clients do."""
+    return repr(float(bound))
+
+
+class Metrics:
+    """Flask extension recording request, SQL and hashing metrics."""
+
+    extension_name = "metrics"
+
+    def __init__(self) -> None:
+        """Create empty registry."""
+        self._local = threading.local()
+        self._shards: List[Shard] = []
+        # Shards of exited threads, appended by finalizers without the lock
+        # because garbage collection may run them while the lock is held.
+        self._exited: List[Shard] = []
+        self._retired = Shard()
+        self._lock = threading.Lock()
+        self._collectors: Dict[str, Tuple[Callable[[], dict], tuple]] = {}
+
+    def init_app(self, app: Flask) -> None:
+        """Register request hooks, SQL events and the metrics route.
+
+        Args:
+            app (Flask): Flask application object, its SQLAlchemy extension
+                must be initialised first.
+        """
+        if not app.config.get("METRICS_ENABLED", True):
+            return
+
+        app.extensions[self.extension_name] = self
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        with app.app_context():
+            for engine in app.extensions["sqlalchemy"].engines.values():
+                event.listen(engine, "before_cursor_execute", self._start_query)
+                event.listen(engine, "after_cursor_execute", self._end_query)
+        app.add_url_rule(
+            app.config.get("METRICS_PATH", "/metrics"),
+            "metrics",
+            self.render_view,
+        )
+
+    def add_collector(
+        self,
+        prefix: str,
+        collect: Callable[[], dict],
+        counters: Iterable[str] = (),
+    ) -> None:
+        """Export values returned by `collect` when metrics are scraped.
+
+        Args:
+            prefix (str): Metric name prefix, e.g. `auth_cache`.
+            collect (Callable[[], dict]): Returns numeric values by name.
+            counters (Iterable[str]): Names exported as counters, the rest
+                are exported as gauges.
+        """
+        self._collectors[prefix] = (collect, tuple(counters))
+
+    @property
+    def shard(self) -> Shard:
+        """Return shard of the current thread."""
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = Shard()
+            owner = self._local.owner = ShardOwner()
+            weakref.finalize(owner, self._exited.append, shard).atexit = False
+            with self._lock:
+                self._retire_exited()
+                self._shards.append(shard)
+        return shard
+
+    def _retire_exited(self) -> None:
+        # Called with the lock held, exited threads no longer write.
+        while self._exited:
+            shard = self._exited.pop()
+            merge(self._retired, shard)
+            self._shards.remove(shard)
+
+    def observe(self, name: str, value: float, labels: Labels = ()) -> None:
+        """Record value in a histogram declared in `HISTOGRAMS`."""
+        histograms = self.shard.histograms
+        histogram = histograms.get((name, labels))
+        if histogram is None:
+            histogram = histograms[(name, labels)] = Histogram(
+                HISTOGRAMS[name][1]
+            )
+        histogram.observe(value)
+
+    def increment(
+        self, name: str, labels: Labels = (), value: float = 1
+    ) -> None:
+        """Increase a counter declared in `COUNTERS`."""
+        counters = self.shard.counters
+        counters[(name, labels)] = counters.get((name, labels), 0) + value
+
+    def reset(self) -> None:
+        """Drop all recorded values."""
+        with self._lock:
+            self._retire_exited()
+            for shard in (self._retired, *self._shards):
+                shard.histograms.clear()
+                shard.counters.clear()
+
+    @staticmethod
+    def _start_request() -> None:
+        g.metrics_started = time.perf_counter()
+        g.sql_queries = 0
+        g.sql_seconds = 0.0
+        g.bcrypt_seconds = 0.0
+
+    def _finish_request(self, response: Response) -> Response:
+        started = g.pop("metrics_started", None)
+        if started is None:
+            return response
+
+        endpoint = request.endpoint or "unmatched"
+        labels = (("endpoint", endpoint), ("method", request.method))
+        self.observe(
+            "http_request_duration_seconds",
+            time.perf_counter() - started,
+            labels,
+        )
+        self.observe("http_request_db_queries", g.sql_queries, labels)
+        self.observe("http_request_db_duration_seconds", g.sql_seconds, labels)
+        if g.bcrypt_seconds:
+            self.observe(
+                "http_request_bcrypt_duration_seconds",
+                g.bcrypt_seconds,
+                labels,
+            )
+        self.increment(
+            "http_responses_total",
+            (("endpoint", endpoint), ("status", str(response.status_code))),
+        )
+        return response
+
+    @staticmethod
+    def _start_query(conn, cursor, statement, parameters, context, many):  # pylint: disable=W0613
+        if context is not None:
+            context.metrics_started = time.perf_counter()
+
+    @staticmethod
+    def _end_query(conn, cursor, statement, parameters, context, many):  # pylint: disable=W0613
+        started = getattr(context, "metrics_started", None)
+        if started is None or not has_request_context():
+            return
+        if "sql_queries" in g:
+            g.sql_queries += 1
+            g.sql_seconds += time.perf_counter() - started
+
+    def render(self) -> str:
+        """Merge thread shards and render them in Prometheus text format."""
+        total = Shard()
+        with self._lock:
+            self._retire_exited()
+            for shard in (self._retired, *self._shards):
+                merge(total, shard)
+        histograms, counters = total.histograms, total.counters
+
+        lines = []
+        for name, (description, _) in HISTOGRAMS.items():
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} histogram")
+            for (metric, labels), histogram in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    bucket_labels = format_labels(
+                        labels, le=format_bound(bound)
+                    )
+                    lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+                cumulative += histogram.counts[-1]
+                lines.append(
+                    f"{name}_bucket{format_labels(labels, le='+Inf')} "
+                    f"{cumulative}"
+                )
+                lines.append(
+                    f"{name}_sum{format_labels(labels)} {histogram.sum}"
+                )
+                lines.append(
+                    f"{name}_count{format_labels(labels)} {cumulative}"
+                )
+
+        for name, description in COUNTERS.items():
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} counter")
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f"{name}{format_labels(labels)} {value}")
+
+        for prefix, (collect, counter_names) in self._collectors.items():
+            for key, value in collect().items():
+                if key in counter_names:
+                    name, kind = f"{prefix}_{key}_total", "counter"
+                else:
+                    name, kind = f"{prefix}_{key}", "gauge"
+                lines.append(f"# TYPE {name} {kind}")
+                lines.append(f"{name} {value}")
+
+        return "\n".join(lines) + "\n"
+
+    def render_view(self) -> Response:
+        """Flask view serving the metrics."""
+        return Response(
+            self.render(),
+            content_type="text/plain; version=0.0.4; charset=utf-8",
+        )
@@ -0,0 +1,117 @@
+"""Keyset pagination helpers.
+
+Pages are addressed by the sort key of the last row already returned, so
+every page is an index range scan no matter how deep it is. The key is
+handed to clients as an opaque cursor.
+"""
+
+import base64
+import binascii
+import datetime
+import json
+from typing import Any, Sequence, Tuple
+
+from sqlalchemy import Select, tuple_
+from sqlalchemy.orm import InstrumentedAttribute
+
+# Marks datetimes in the cursor payload.
+DATETIME_PREFIX = "dt:"
+# Range of signed 64 bit integer columns, database drivers raise
+# OverflowError for integers outside of it.
+MIN_INTEGER = -(2**63)
+MAX_INTEGER = 2**63 - 1
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode the sort key of a row as an opaque URL safe cursor.
+
+    Args:
+        values (Sequence[Any]): JSON serializable values or datetimes.
+
+    Returns:
+        str: Cursor without base64 padding.
+    """
+    payload = [
+        DATETIME_PREFIX + value.isoformat()
+        if isinstance(value, datetime.datetime)
+        else value
+        for value in values
+    ]
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_value(value: Any, expected: type) -> Any:
+    """Return a cursor value as `expected` type.
+
+    Raises:
+        ValueError: The value has another type, booleans are not integers
+            and integers must fit a 64 bit column.
+    """
+    if expected is datetime.datetime:
+        if isinstance(value, str) and value.startswith(DATETIME_PREFIX):
+            try:
+                return datetime.datetime.fromisoformat(
+                    value[len(DATETIME_PREFIX) :]
+                )
+            except ValueError:
+                pass
+    elif isinstance(value, expected) and not isinstance(value, bool):
+        if not isinstance(value, int) or MIN_INTEGER <= value <= MAX_INTEGER:
+            return value
+    raise ValueError("Invalid cursor")
+
+
+def decode_cursor(cursor: str, types: Sequence[type]) -> Tuple[Any, ...]:
+    """Decode a cursor created by `encode_cursor`.
+
+    Args:
+        cursor (str): Cursor sent by the client.
+        types (Sequence[type]): Expected type of every value, e.g.
+            `(datetime.datetime, int)`.
+
+    Raises:
+        ValueError: The cursor is malformed or a value has another type.
+
+    Returns:
+        Tuple[Any, ...]: Sort key values.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as error:
+        raise ValueError("Invalid cursor") from error
+    if not isinstance(payload, list) or len(payload) != len(types):
+        raise ValueError("Invalid cursor")
+    return tuple(
+        decode_value(value, expected) for value, expected in zip(payload, types)
+    )
+
+
+def seek(
+    query: Select,
+    columns: Sequence[InstrumentedAttribute],
+    after: Sequence[Any] = (),
+    descending: bool = False,
+) -> Select:
+    """Order the query by the columns and skip rows up to the cursor key.
+
+    Args:
+        query (Select): Query to page through.
+        columns (Sequence[InstrumentedAttribute]): Unique sort key, backed
+            by an index in the same order.
+        after (Sequence[Any]): Key of the last row of the previous page,
+            empty for the first page.
+        descending (bool): Page from the largest key down.
+
+    Returns:
+        Select: Query returning the next rows, caller applies the limit.
+    """
+    if after:
+        key = tuple_(*columns)
+        query = query.where(
+            key < tuple_(*after) if descending else key > tuple_(*after)
+        )
+    return query.order_by(
+        *(column.desc() if descending else column for column in columns)
+    )
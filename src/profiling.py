@@ -0,0 +1,174 @@
+"""Sampled cProfile capture of single requests.
+
+A request is profiled when a random draw falls below the sample rate or
+when it carries a trigger header signed with `PROFILING_SECRET`. Profiles
+are written as `pstats` files named after the time, endpoint and duration
+of the request, only the newest files of the directory are kept. Inspect
+them with `python -m pstats <file>` or a viewer such as snakeviz. Streamed
+bodies are produced after the profile is written and are not part of it.
+
+When disabled no hook is registered, so requests do not pay for it.
+"""
+
+import contextlib
+import cProfile
+import datetime
+import hashlib
+import hmac
+import os
+import random
+import re
+import time
+from typing import Optional
+
+import click
+from flask import Flask, Response, current_app, g, request
+from flask.cli import with_appcontext
+
+# Characters of an endpoint name kept in file names.
+UNSAFE_FILENAME_CHARACTERS = re.compile(r"[^A-Za-z0-9_.-]")
+
+
+def sign_trigger(secret: str, expires: int) -> str:
+    """Return a trigger header value valid until `expires`.
+
+    Args:
+        secret (str): Value of `PROFILING_SECRET`.
+        expires (int): Unix time after which the value is rejected.
+
+    Returns:
+        str: `<expires>:<hex HMAC-SHA256 of expires>`.
+    """
+    signature = hmac.new(
+        secret.encode("utf-8"), str(expires).encode("utf-8"), hashlib.sha256
+    ).hexdigest()
+    return f"{expires}:{signature}"
+
+
+def verify_trigger(secret: str, value: str, now: float) -> bool:
+    """Check a trigger header value signed by `sign_trigger`."""
+    expires, _, _ = value.partition(":")
+    if not expires.isdigit() or int(expires) < now:
+        return False
+    return hmac.compare_digest(sign_trigger(secret, int(expires)), value)
+
+
+def profile_filename(endpoint: Optional[str], duration: float) -> str:
+    """Return a sortable file name tagged with endpoint and duration."""
+    name = UNSAFE_FILENAME_CHARACTERS.sub("_", endpoint or "unmatched")
+    return (
+        f"{datetime.datetime.now():%Y%m%dT%H%M%S.%f}-{name}-"
+        f"{round(duration * 1000)}ms-{os.getpid()}.prof"
+    )
+
+
+def rotate(directory: str, keep: int) -> None:
+    """Delete the oldest profiles of the directory beyond `keep` files."""
+    paths = [
+        entry.path
+        for entry in os.scandir(directory)
+        if entry.name.endswith(".prof")
+    ]
+    paths.sort(key=os.path.getmtime)
+    for path in paths[: max(len(paths) - keep, 0)]:
+        # Another worker may rotate the same directory.
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(path)
+
+
+@click.command("profile-token")
+@click.option(
+    "--ttl", type=int, default=300, show_default=True, help="Seconds valid."
+)
+@with_appcontext
+def profile_token_command(ttl: int) -> None:
+    """Print a header value profiling requests for the next TTL seconds."""
+    secret = current_app.config.get("PROFILING_SECRET")
+    if not secret:
+        raise click.ClickException("PROFILING_SECRET is not set")
+    header = current_app.config.get("PROFILING_HEADER", "X-Profile")
+    value = sign_trigger(secret, int(time.time()) + ttl)
+    click.echo(f"{header}: {value}")
+
+
+class Profiler:
+    """Flask extension profiling sampled or signed requests with cProfile."""
+
+    extension_name = "profiler"
+
+    def init_app(self, app: Flask) -> None:
+        """Register request hooks when `PROFILING_ENABLED` is set.
+
+        Args:
+            app (Flask): Flask application object.
+        """
+        if not app.config.get("PROFILING_ENABLED", False):
+            return
+
+        directory = app.config.get("PROFILING_DIR") or os.path.join(
+            app.instance_path, "profiles"
+        )
+        os.makedirs(directory, exist_ok=True)
+        app.extensions[self.extension_name] = {
+            "sample_rate": float(app.config.get("PROFILING_SAMPLE_RATE", 0)),
+            "secret": app.config.get("PROFILING_SECRET") or "",
+            "header": app.config.get("PROFILING_HEADER", "X-Profile"),
+            "directory": directory,
+            "max_files": int(app.config.get("PROFILING_MAX_FILES", 100)),
+        }
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        app.teardown_request(self._discard)
+        app.cli.add_command(profile_token_command)
+
+    @property
+    def settings(self) -> dict:
+        """Return profiling settings of the current app."""
+        return current_app.extensions[self.extension_name]
+
+    def signed(self) -> bool:
+        """Return whether the request carries a valid trigger header."""
+        settings = self.settings
+        value = request.headers.get(settings["header"])
+        if not value or not settings["secret"]:
+            return False
+        return verify_trigger(settings["secret"], value, time.time())
+
+    def _start_request(self) -> None:
+        signed = self.signed()
+        if not signed and random.random() >= self.settings["sample_rate"]:
+            return
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler is already active on this thread.
+            return
+        g.profile = profile
+        g.profile_signed = signed
+        g.profile_started = time.perf_counter()
+
+    def _finish_request(self, response: Response) -> Response:
+        profile = g.pop("profile", None)
+        if profile is None:
+            return response
+        profile.disable()
+        duration = time.perf_counter() - g.pop("profile_started")
+
+        directory = self.settings["directory"]
+        path = os.path.join(
+            directory, profile_filename(request.endpoint, duration)
+        )
+        profile.dump_stats(path)
+        rotate(directory, self.settings["max_files"])
+        if g.pop("profile_signed"):
+            # Only callers holding the secret learn where the profile is.
+            response.headers["X-Profile-File"] = os.path.basename(path)
+        return response
+
+    @staticmethod
+    def _discard(error: Optional[BaseException] = None) -> None:  # pylint: disable=W0613
+        # The response was never finished, stop profiling the thread.
+        profile = g.pop("profile", None)
+        if profile is not None:
+            profile.disable()
@@ -0,0 +1,333 @@
+"""Token bucket rate limiting for expensive endpoints.
+
+A bucket holds up to `capacity` tokens and refills continuously at
+`capacity / period` tokens per second, every request takes one token.
+Buckets live in process memory or in a SQLite file shared by all worker
+processes on the host.
+"""
+
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+from flask import Flask, current_app
+
+logger = logging.getLogger(__name__)
+
+# Rows of buckets that would be full again are pruned every N hits.
+SQLITE_PRUNE_INTERVAL = 1000
+
+
+def parse_rate(rate: str) -> Tuple[float, float]:
+    """Parse a `"<requests>/<seconds>"` limit.
+
+    Args:
+        rate (str): Limit, e.g. `"10/60"` for ten requests per minute.
+
+    Raises:
+        ValueError: The limit is malformed or not positive.
+
+    Returns:
+        Tuple[float, float]: Bucket capacity and refill rate per second.
+    """
+    try:
+        requests, seconds = (float(part) for part in rate.split("/"))
+    except ValueError as error:
+        raise ValueError(f"Invalid rate limit: {rate!r}") from error
+    if requests <= 0 or seconds <= 0:
+        raise ValueError(f"Invalid rate limit: {rate!r}")
+    return requests, requests / seconds
+
+
+def client_address(
+    remote_addr: Optional[str],
+    forwarded_for: Optional[str],
+    trusted_proxies: int,
+) -> Optional[str]:
+    """Return the client IP of a request behind trusted reverse proxies.
+
+    Every proxy appends the address it received the request from to
+    `X-Forwarded-For`, so the client is the `trusted_proxies`-th address from
+    the right, as with werkzeug's `ProxyFix(x_for=trusted_proxies)`. Addresses
+    further left are sent by the client and never used.
+
+    Args:
+        remote_addr (Optional[str]): Address of the connected peer.
+        forwarded_for (Optional[str]): `X-Forwarded-For` header, if any.
+        trusted_proxies (int): Number of proxies in front of the app.
+
+    Returns:
+        Optional[str]: Client IP, `remote_addr` when no proxy is trusted or
+            the header has fewer addresses than trusted proxies.
+    """
+    if trusted_proxies <= 0 or not forwarded_for:
+        return remote_addr
+    addresses = [address.strip() for address in forwarded_for.split(",")]
+    if len(addresses) < trusted_proxies:
+        return remote_addr
+    return addresses[-trusted_proxies] or remote_addr
+
+
+def take_token(
+    tokens: float,
+    updated: float,
+    now: float,
+    capacity: float,
+    refill_rate: float,
+) -> Tuple[float, float]:
+    """Refill a bucket and take one token from it.
+
+    Args:
+        tokens (float): Tokens left at `updated`.
+        updated (float): Time of the last update.
+        now (float): Current time.
+        capacity (float): Maximum number of tokens.
+        refill_rate (float): Tokens added per second.
+
+    Returns:
+        Tuple[float, float]: Tokens left and seconds to wait before retrying,
+            0 when the token was taken.
+    """
+    tokens = min(capacity, tokens + max(now - updated, 0) * refill_rate)
+    if tokens >= 1:
+        return tokens - 1, 0.0
+    return tokens, (1 - tokens) / refill_rate
+
+
+class MemoryBackend:
+    """Buckets of the current process, least recently used are dropped."""
+
+    def __init__(self, maxsize: int = 10000) -> None:
+        """Set maximum number of tracked keys."""
+        self.maxsize = maxsize
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key: str, capacity: float, refill_rate: float) -> float:
+        """Take a token for the key, return seconds to wait or 0."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            tokens, retry_after = take_token(
+                tokens, updated, now, capacity, refill_rate
+            )
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+        return retry_after
+
+
+class SQLiteBackend:
+    """Buckets stored in a SQLite file shared by worker processes.
+
+    Every hit is one short `BEGIN IMMEDIATE` transaction, so workers never
+    interleave read and write of the same bucket.
+    """
+
+    def __init__(self, path: str) -> None:
+        """Set database file, connections are opened lazily per thread."""
+        self.path = path
+        self._local = threading.local()
+        self._hits = 0
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """Return connection of the current thread and process."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(
+                self.path, timeout=5, isolation_level=None
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS buckets ("
+                "key TEXT PRIMARY KEY, tokens REAL NOT NULL, "
+                "updated REAL NOT NULL, full_at REAL NOT NULL)"
+            )
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def hit(self, key: str, capacity: float, refill_rate: float) -> float:
+        """Take a token for the key, return seconds to wait or 0.
+
+        The request is let through when the file stays locked past the
+        busy timeout or cannot be written, a limiter failure must not fail
+        logins.
+        """
+        now = time.time()
+        connection = self.connection
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+            row = connection.execute(
+                "SELECT tokens, updated FROM buckets WHERE key = ?", (key,)
+            ).fetchone()
+            tokens, updated = row if row else (capacity, now)
+            tokens, retry_after = take_token(
+                tokens, updated, now, capacity, refill_rate
+            )
+            connection.execute(
+                "INSERT OR REPLACE INTO buckets VALUES (?, ?, ?, ?)",
+                (key, tokens, now, now + (capacity - tokens) / refill_rate),
+            )
+            self._hits += 1
+            if self._hits % SQLITE_PRUNE_INTERVAL == 0:
+                connection.execute(
+                    "DELETE FROM buckets WHERE full_at < ?", (now,)
+                )
+            connection.execute("COMMIT")
+        except sqlite3.OperationalError as error:
+            self.rollback(connection)
+            logger.warning("Rate limit not applied: %s", error)
+            return 0.0
+        except BaseException:
+            self.rollback(connection)
+            raise
+        return retry_after
+
+    @staticmethod
+    def rollback(connection: sqlite3.Connection) -> None:
+        """Roll back the transaction of a failed hit, if it was started."""
+        if connection.in_transaction:
+            connection.execute("ROLLBACK")
+
+
+class Limiter:
+    """Token buckets for a set of named scopes sharing one backend."""
+
+    def __init__(
+        self,
+        backend,
+        limits: Dict[str, Tuple[float, float]],
+        enabled: bool = True,
+    ) -> None:
+        """Set backend and limits.
+
+        Args:
+            backend: `MemoryBackend` or `SQLiteBackend`.
+            limits (Dict[str, Tuple[float, float]]): Capacity and refill rate
+                by scope, see `parse_rate`.
+            enabled (bool): False lets every request through.
+        """
+        self.backend = backend
+        self.limits = limits
+        self.enabled = enabled
+        self.rejected = dict.fromkeys(limits, 0)
+
+    def check(self, keys: Iterable[Tuple[str, Optional[str]]]) -> float:
+        """Take a token from the bucket of every scope and key.
+
+        Scopes are checked in order and stop at the first rejection, so a
+        blocked IP does not drain the buckets of the emails it targets.
+
+        Args:
+            keys (Iterable[Tuple[str, Optional[str]]]): Scope name and key,
+                None keys are skipped.
+
+        Returns:
+            float: Seconds to wait before retrying, 0 when allowed.
+        """
+        if not self.enabled:
+            return 0.0
+        for scope, key in keys:
+            if key is None:
+                continue
+            capacity, refill_rate = self.limits[scope]
+            retry_after = self.backend.hit(
+                f"{scope}:{key}", capacity, refill_rate
+            )
+            if retry_after:
+                self.rejected[scope] += 1
+                return retry_after
+        return 0.0
+
+    def stats(self) -> dict:
+        """Return rejected request counts by scope."""
+        return {
+            f"rejected_{scope}": count for scope, count in self.rejected.items()
+        }
+
+
+class RateLimiter:
+    """Flask extension limiting login attempts per client IP and email."""
+
+    extension_name = "rate_limiter"
+
+    def init_app(self, app: Flask) -> None:
+        """Create the application limiter from configuration.
+
+        Args:
+            app (Flask): Flask application object.
+        """
+        backend_name = app.config.get("RATELIMIT_BACKEND", "memory")
+        if backend_name == "sqlite":
+            backend = SQLiteBackend(
+                app.config.get("RATELIMIT_SQLITE_PATH")
+                or os.path.join(tempfile.gettempdir(), "blog-ratelimit.db")
+            )
+        elif backend_name == "memory":
+            backend = MemoryBackend(
+                app.config.get("RATELIMIT_MEMORY_SIZE", 10000)
+            )
+        else:
+            raise ValueError(f"Unknown rate limit backend: {backend_name}")
+
+        app.extensions[self.extension_name] = Limiter(
+            backend,
+            {
+                "ip": parse_rate(
+                    app.config.get("RATELIMIT_LOGIN_PER_IP", "30/60")
+                ),
+                "email": parse_rate(
+                    app.config.get("RATELIMIT_LOGIN_PER_EMAIL", "10/300")
+                ),
+            },
+            enabled=app.config.get("RATELIMIT_ENABLED", True),
+        )
+
+    @property
+    def limiter(self) -> Limiter:
+        """Return the limiter of the current application."""
+        return current_app.extensions[self.extension_name]
+
+    def check_login(
+        self,
+        remote_addr: Optional[str],
+        email: Optional[str],
+        forwarded_for: Optional[str] = None,
+    ) -> float:
+        """Check login limits for the client address and target email.
+
+        Args:
+            remote_addr (Optional[str]): Address of the connected peer.
+            email (Optional[str]): Email from the request body, if any.
+            forwarded_for (Optional[str]): `X-Forwarded-For` header, only
+                read when `RATELIMIT_TRUSTED_PROXIES` is set.
+
+        Returns:
+            float: Seconds to wait before retrying, 0 when allowed.
+        """
+        if not isinstance(email, str) or not email.strip():
+            email = None
+        client = client_address(
+            remote_addr,
+            forwarded_for,
+            current_app.config.get("RATELIMIT_TRUSTED_PROXIES", 0),
+        )
+        return self.limiter.check(
+            (
+                ("ip", client),
+                ("email", email.strip().lower() if email else None),
+            )
+        )
+
+    def stats(self) -> dict:
+        """Return rejected request counts of the current application."""
+        return self.limiter.stats()
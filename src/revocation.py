@@ -0,0 +1,181 @@
+"""In-memory denylist of revoked access tokens.
+
+Revocations are stored in the database and copied into every worker
+process. Checking a token is a dict lookup, the database is only read when
+the local copy is older than `TOKEN_DENYLIST_REFRESH` seconds and then only
+rows added since the previous refresh are fetched.
+"""
+
+import math
+import threading
+import time
+from typing import Callable, Dict, Iterable, Mapping, Optional, Tuple
+
+from flask import Flask, current_app
+
+# id, jti, user id, revoked before (epoch seconds), expires at (epoch seconds)
+Revocation = Tuple[int, Optional[str], Optional[int], Optional[float], float]
+RevocationLoader = Callable[[int], Iterable[Revocation]]
+
+# Rows re-read on every refresh, ids are not guaranteed to become visible in
+# commit order with concurrent writers. Merging a row twice is harmless.
+REFRESH_OVERLAP = 100
+
+
+class RevocationList:
+    """Revoked token ids and per-user cutoffs known to this process.
+
+    A token is revoked when its `jti` was revoked, or when it was issued at
+    or before a "revoke all" cutoff of its user. Entries are dropped once
+    every token they could match has expired.
+    """
+
+    def __init__(self, refresh_interval: float = 5) -> None:
+        """Set refresh interval.
+
+        Args:
+            refresh_interval (float): Seconds the local copy is trusted.
+        """
+        self.refresh_interval = refresh_interval
+        self.last_id = 0
+        self.refreshed_at = float("-inf")
+        self._tokens: Dict[str, float] = {}
+        self._cutoffs: Dict[int, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return number of revoked token ids and user cutoffs."""
+        return len(self._tokens) + len(self._cutoffs)
+
+    def add(
+        self, revocations: Iterable[Revocation], fetched: bool = True
+    ) -> None:
+        """Merge revocation rows.
+
+        Args:
+            revocations (Iterable[Revocation]): Rows in any order.
+            fetched (bool): Rows come from a refresh, False for rows written
+                by this process, which must not move the refresh position.
+        """
+        with self._lock:
+            for row_id, jti, user_id, revoked_before, expires_at in revocations:
+                if fetched:
+                    self.last_id = max(self.last_id, row_id)
+                if jti is not None:
+                    self._tokens[jti] = expires_at
+                if user_id is not None and revoked_before is not None:
+                    previous = self._cutoffs.get(user_id, (0.0, 0.0))
+                    self._cutoffs[user_id] = (
+                        max(previous[0], revoked_before),
+                        max(previous[1], expires_at),
+                    )
+
+    def prune(self, now: float) -> None:
+        """Drop entries that can only match already expired tokens."""
+        with self._lock:
+            self._tokens = {
+                jti: expires_at
+                for jti, expires_at in self._tokens.items()
+                if expires_at > now
+            }
+            self._cutoffs = {
+                user_id: cutoff
+                for user_id, cutoff in self._cutoffs.items()
+                if cutoff[1] > now
+            }
+
+    def start_refresh(self) -> Optional[int]:
+        """Return the id to read rows after if the local copy is stale.
+
+        Marks the copy as refreshed, so concurrent callers do not all query
+        the database, finish with `finish_refresh`.
+
+        Returns:
+            Optional[int]: Row id or None when no refresh is due.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if now - self.refreshed_at < self.refresh_interval:
+                return None
+            self.refreshed_at = now
+        return max(self.last_id - REFRESH_OVERLAP, 0)
+
+    def finish_refresh(self, revocations: Iterable[Revocation]) -> None:
+        """Merge rows read after `start_refresh` and drop expired entries."""
+        self.add(revocations)
+        self.prune(time.time())
+
+    def refresh(self, loader: RevocationLoader) -> None:
+        """Fetch rows added since the last refresh if the copy is stale.
+
+        Args:
+            loader (RevocationLoader): Returns rows with an id greater than
+                the given one.
+        """
+        after_id = self.start_refresh()
+        if after_id is not None:
+            self.finish_refresh(loader(after_id))
+
+    def is_revoked(self, claims: Mapping) -> bool:
+        """Check decoded token claims against the local copy.
+
+        Args:
+            claims (Mapping): Verified JWT claims.
+
+        Returns:
+            bool: True if the token must be rejected.
+        """
+        jti = claims.get("jti")
+        if jti is not None and jti in self._tokens:
+            return True
+        cutoff = self._cutoffs.get(claims.get("id"))
+        # `iat` has whole seconds, a token issued in the second of a revoke
+        # all is treated as issued after it.
+        return cutoff is not None and claims.get("iat", 0) < math.floor(
+            cutoff[0]
+        )
+
+
+class TokenDenylist:
+    """Flask extension checking tokens against revocations."""
+
+    extension_name = "token_denylist"
+
+    def __init__(self) -> None:
+        """Create extension without loader."""
+        self._loader: Optional[RevocationLoader] = None
+
+    def init_app(self, app: Flask) -> None:
+        """Create the application revocation list from configuration.
+
+        Args:
+            app (Flask): Flask application object.
+        """
+        app.extensions[self.extension_name] = RevocationList(
+            refresh_interval=app.config.get("TOKEN_DENYLIST_REFRESH", 5)
+        )
+
+    def revocation_loader(self, loader: RevocationLoader) -> RevocationLoader:
+        """Register the function reading revocations added after an id."""
+        self._loader = loader
+        return loader
+
+    @property
+    def store(self) -> RevocationList:
+        """Return the revocation list of the current application."""
+        return current_app.extensions[self.extension_name]
+
+    def is_revoked(self, claims: Mapping) -> bool:
+        """Refresh the local copy when stale and check the claims."""
+        store = self.store
+        if self._loader is not None:
+            store.refresh(self._loader)
+        return store.is_revoked(claims)
+
+    def add(self, revocations: Iterable[Revocation]) -> None:
+        """Apply revocations made by this process without waiting a refresh."""
+        self.store.add(revocations, fetched=False)
+
+    def stats(self) -> dict:
+        """Return size of the revocation list of the current application."""
+        return {"size": len(self.store)}
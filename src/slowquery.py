@@ -0,0 +1,306 @@
+"""Log of slow SQL statements with their query plan.
+
+Statements running longer than `SLOW_QUERY_THRESHOLD_MS` are logged with
+their parameters, duration and the endpoint that ran them, together with
+the plan the database reports for them. Entries are deduplicated by
+normalized statement: the first occurrence is logged in full with its plan,
+later ones are counted and summarised at most once per
+`SLOW_QUERY_LOG_INTERVAL` seconds, so a flood of one slow lookup produces a
+single line per interval instead of one per request.
+"""
+
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Set
+
+from flask import Flask, current_app, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# Parameters bound to these columns are never logged.
+REDACTED_COLUMNS = ("password", "access_token")
+REDACTED = "<redacted>"
+# Only statements the databases can explain without running them again.
+EXPLAINABLE = re.compile(r"^\s*(SELECT|WITH|INSERT|UPDATE|DELETE)\b", re.I)
+EXPLAIN_PREFIX = {
+    "sqlite": "EXPLAIN QUERY PLAN ",
+    "postgresql": "EXPLAIN ",
+    "mysql": "EXPLAIN ",
+}
+EXPLAIN_SAVEPOINT = "slow_query_explain"
+# Suffix SQLAlchemy adds to repeated bind names, e.g. `password_1`.
+BIND_SUFFIX = re.compile(r"_\d+$")
+# String literals, placeholders of every paramstyle and number literals.
+VALUES = re.compile(
+    r"'(?:[^']|'')*'|%\(\w+\)s|%s|(?<!:):\w+|\$\d+|\?|\b\d+(?:\.\d+)?\b"
+)
+PLACEHOLDER_LISTS = re.compile(r"\((?:\s*\?\s*,)+\s*\?\s*\)")
+
+
+def normalize(statement: str) -> str:
+    """Reduce a statement to its shape, used as deduplication key.
+
+    Literals and placeholders become `?`, lists of placeholders such as
+    expanded IN clauses become `(?)` and whitespace is collapsed.
+    """
+    shape = PLACEHOLDER_LISTS.sub("(?)", VALUES.sub("?", statement))
+    return " ".join(shape.split())
+
+
+def is_redacted(name: str) -> bool:
+    """Return whether a bind parameter name belongs to a redacted column."""
+    return BIND_SUFFIX.sub("", name) in REDACTED_COLUMNS
+
+
+def redacted_values(context) -> Optional[Set[str]]:
+    """Return values bound to redacted columns of a compiled statement.
+
+    Values are matched rather than positions, positions change when
+    SQLAlchemy expands IN lists or batches multi row INSERT statements.
+
+    Returns:
+        Optional[Set[str]]: Secret values, None for raw driver SQL whose
+            columns are unknown.
+    """
+    if getattr(context, "compiled", None) is None:
+        return None
+    return {
+        value
+        for parameters in context.compiled_parameters
+        for name, value in parameters.items()
+        if isinstance(value, str) and is_redacted(name)
+    }
+
+
+def secret(value: Any, secrets: Optional[Set[str]]) -> bool:
+    """Return whether a parameter value is one of the secrets."""
+    return bool(secrets) and isinstance(value, str) and value in secrets
+
+
+def redact(parameters: Any, secrets: Optional[Set[str]]) -> Any:
+    """Replace values of redacted columns in statement parameters.
+
+    Args:
+        parameters (Any): Parameters passed to the DBAPI cursor, a mapping,
+            a sequence or a list of either for executemany.
+        secrets (Optional[Set[str]]): Values from `redacted_values`, every
+            positional value is redacted when None.
+
+    Returns:
+        Any: Parameters safe to log.
+    """
+    if isinstance(parameters, list):
+        return [redact(row, secrets) for row in parameters]
+    if isinstance(parameters, dict):
+        return {
+            name: REDACTED
+            if is_redacted(name) or secret(value, secrets)
+            else value
+            for name, value in parameters.items()
+        }
+    if secrets is None:
+        return tuple(REDACTED for _ in parameters)
+    return tuple(
+        REDACTED if secret(value, secrets) else value for value in parameters
+    )
+
+
+def explain(connection, dialect: str, statement: str, parameters: Any) -> str:
+    """Return the plan of a statement on a new cursor of its connection.
+
+    The plan is read inside the transaction of the statement. Outside
+    SQLite it runs under a savepoint: a failing EXPLAIN would otherwise
+    abort the transaction on PostgreSQL and fail the rest of the request.
+
+    Args:
+        connection: DBAPI connection that ran the statement.
+        dialect (str): SQLAlchemy dialect name.
+        statement (str): SQL sent to the cursor.
+        parameters (Any): Parameters of the statement, the first row is
+            used for executemany.
+
+    Returns:
+        str: One line per plan row, empty when it cannot be explained.
+    """
+    prefix = EXPLAIN_PREFIX.get(dialect)
+    if prefix is None or not EXPLAINABLE.match(statement):
+        return ""
+    if isinstance(parameters, list):
+        parameters = parameters[0] if parameters else ()
+    savepoint = dialect != "sqlite"
+    cursor = connection.cursor()
+    try:
+        if savepoint:
+            cursor.execute(f"SAVEPOINT {EXPLAIN_SAVEPOINT}")
+        try:
+            cursor.execute(prefix + statement, parameters)
+            plan = "\n".join(
+                " ".join(str(column) for column in row)
+                for row in cursor.fetchall()
+            )
+        except Exception as error:  # pylint: disable=W0703
+            if savepoint:
+                cursor.execute(f"ROLLBACK TO SAVEPOINT {EXPLAIN_SAVEPOINT}")
+            plan = f"unavailable: {error}"
+        if savepoint:
+            cursor.execute(f"RELEASE SAVEPOINT {EXPLAIN_SAVEPOINT}")
+        return plan
+    except Exception as error:  # pylint: disable=W0703
+        return f"unavailable: {error}"
+    finally:
+        cursor.close()
+
+
+class SlowQueryRecorder:
+    """Slow statements of one application, keyed by normalized statement."""
+
+    def __init__(
+        self,
+        threshold: float,
+        interval: float,
+        maxsize: int = 1000,
+        capture_plan: bool = True,
+    ) -> None:
+        """Set threshold and summary interval in seconds."""
+        self.threshold = threshold
+        self.interval = interval
+        self.maxsize = maxsize
+        self.capture_plan = capture_plan
+        self.logged = 0
+        self.repeated = 0
+        self._entries: Dict[str, dict] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def attach(self, engines: Iterable[Engine]) -> None:
+        """Time every statement executed by the engines."""
+        for engine in engines:
+            event.listen(engine, "before_cursor_execute", self.start_query)
+            event.listen(engine, "after_cursor_execute", self.end_query)
+
+    @staticmethod
+    def start_query(conn, cursor, statement, parameters, context, many):  # pylint: disable=W0613
+        """Store the start time, registered as `before_cursor_execute`."""
+        if context is not None:
+            context.slow_query_started = time.perf_counter()
+
+    def end_query(self, conn, cursor, statement, parameters, context, many):  # pylint: disable=W0613
+        """Record a statement slower than the threshold."""
+        started = getattr(context, "slow_query_started", None)
+        if started is None:
+            return
+        duration = time.perf_counter() - started
+        if duration < self.threshold:
+            return
+
+        key = normalize(statement)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = {
+                    "reported": now,
+                    "count": 0,
+                    "total": 0.0,
+                    "max": 0.0,
+                }
+                if len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                first = True
+            else:
+                self._entries.move_to_end(key)
+                entry["count"] += 1
+                entry["total"] += duration
+                entry["max"] = max(entry["max"], duration)
+                if now - entry["reported"] < self.interval:
+                    return
+                summary = dict(entry)
+                entry.update(reported=now, count=0, total=0.0, max=0.0)
+                first = False
+
+        endpoint = (
+            (request.endpoint or "unmatched") if has_request_context() else "-"
+        )
+        if not first:
+            self.repeated += 1
+            logger.warning(
+                "Slow query repeated %d times in %.0fs, mean %.1f ms, "
+                "max %.1f ms, last on %s: %s",
+                summary["count"],
+                now - summary["reported"],
+                summary["total"] / summary["count"] * 1000,
+                summary["max"] * 1000,
+                endpoint,
+                key,
+            )
+            return
+
+        self.logged += 1
+        plan = ""
+        if self.capture_plan:
+            plan = explain(
+                conn.connection, conn.dialect.name, statement, parameters
+            )
+        logger.warning(
+            "Slow query %.1f ms on %s: %s\nparameters: %r\nplan:\n%s",
+            duration * 1000,
+            endpoint,
+            statement,
+            redact(parameters, redacted_values(context)),
+            plan,
+        )
+
+    def stats(self) -> dict:
+        """Return the number of logged and summarised slow statements."""
+        return {
+            "logged": self.logged,
+            "repeated": self.repeated,
+            "statements": len(self._entries),
+        }
+
+
+class SlowQueryLog:
+    """Flask extension logging slow statements of the app engines."""
+
+    extension_name = "slow_query_log"
+
+    def init_app(self, app: Flask) -> None:
+        """Create the application recorder and listen to its engines.
+
+        Args:
+            app (Flask): Flask application object, its SQLAlchemy extension
+                must be initialised first.
+        """
+        recorder = SlowQueryRecorder(
+            app.config.get("SLOW_QUERY_THRESHOLD_MS", 200) / 1000,
+            app.config.get("SLOW_QUERY_LOG_INTERVAL", 60),
+            app.config.get("SLOW_QUERY_MAX_STATEMENTS", 1000),
+            app.config.get("SLOW_QUERY_EXPLAIN", True),
+        )
+        app.extensions[self.extension_name] = recorder
+        with app.app_context():
+            for engine in app.extensions["sqlalchemy"].engines.values():
+                self.attach(app, engine)
+
+    def attach(self, app: Flask, engine: Engine) -> None:
+        """Log slow statements of an engine when the log is enabled.
+
+        Args:
+            app (Flask): Application whose recorder and settings are used.
+            engine (Engine): Engine, the `sync_engine` of async engines.
+        """
+        if app.config.get("SLOW_QUERY_LOG_ENABLED", True):
+            app.extensions[self.extension_name].attach((engine,))
+
+    @property
+    def recorder(self) -> SlowQueryRecorder:
+        """Return the recorder of the current application."""
+        return current_app.extensions[self.extension_name]
+
+    def stats(self) -> dict:
+        """Return slow statement counts of the current application."""
+        return self.recorder.stats()
@@ -1,6 +1,17 @@
 """General purpose module to host common functions."""
 
-from typing import Any, Optional, Union
+import functools
+import hashlib
+import math
+from typing import Any, Callable, Optional, Tuple, Union
+
+from flask import current_app, make_response, request
+from marshmallow import Schema, ValidationError
+
+BODY_TOO_LARGE_MESSAGE = "Request body too large"
+NOT_JSON_MESSAGE = "Content-Type must be application/json"
+INVALID_JSON_MESSAGE = "Invalid JSON body"
+RATE_LIMITED_MESSAGE = "Too many requests, please try again later"
 
 
 def generate_response(
@@ -19,7 +30,7 @@ def generate_response(
     Returns:
         tuple: A tuple of a dictionary with the keys: data, message, status.
     """
-    status_bool = bool(status == 200 or status == 201)
+    status_bool = status in (200, 201)
 
     return (
         {
@@ -41,17 +52,114 @@ def modify_error(message: Union[dict, list, str], status: int) -> list:
     Returns:
         list: A list of dictionaries.
     """
-    final_error = []
-    if message:
-        if isinstance(message, str):
-            if not status:
-                final_error.append({"error": message})
-            else:
-                final_error = message
-        elif isinstance(message, list):
-            final_error = message
-        else:
-            for key, value in message.items():
-                final_error.append({"error": str(key) + ": " + str(value[0])})
-
-    return final_error
+    if not message:
+        return []
+    if isinstance(message, str):
+        return message if status else [{"error": message}]
+    if isinstance(message, list):
+        return message
+    return [{"error": f"{key}: {value[0]}"} for key, value in message.items()]
+
+
+def load_payload(
+    schema: Schema, data: Any
+) -> Tuple[Optional[dict], Optional[dict]]:
+    """It validates and deserializes the data in a single pass.
+
+    Args:
+        schema (Schema): Marshmallow schema instance, safe to share.
+        data (Any): The data sent by the client.
+
+    Returns:
+        tuple: Loaded payload and None, or None and validation errors.
+    """
+    try:
+        return schema.load(data), None
+    except ValidationError as error:
+        return None, error.messages
+
+
+def parse_json_body() -> Tuple[Optional[dict], Optional[tuple]]:
+    """It reads the request JSON object,
+    rejecting oversized or malformed bodies before any validation runs.
+
+    Returns:
+        tuple: The JSON object and None, or None and an error response.
+    """
+    max_size = current_app.config.get("MAX_JSON_BODY_SIZE", 16 * 1024)
+    if request.content_length is not None and request.content_length > max_size:
+        return None, generate_response(
+            message=BODY_TOO_LARGE_MESSAGE, status=413
+        )
+    if not request.is_json:
+        return None, generate_response(message=NOT_JSON_MESSAGE, status=415)
+
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return None, generate_response(message=INVALID_JSON_MESSAGE, status=400)
+    return data, None
+
+
+def rate_limited_response(retry_after: float) -> tuple:
+    """It builds the 429 response for a request rejected by a rate limit.
+
+    Args:
+        retry_after (float): Seconds until the next request is allowed.
+
+    Returns:
+        tuple: Response body, status and `Retry-After` header.
+    """
+    body, status = generate_response(message=RATE_LIMITED_MESSAGE, status=429)
+    return body, status, {"Retry-After": str(max(1, math.ceil(retry_after)))}
+
+
+def body_etag(body: bytes) -> str:
+    """It hashes a response body into an ETag value.
+
+    Args:
+        body (bytes): Serialized response body.
+
+    Returns:
+        str: Hex digest, without quotes.
+    """
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+def conditional(
+    cache_control: str = "private, no-cache", vary: Optional[str] = None
+) -> Callable:
+    """It decorates a read route with ETag and `If-None-Match` handling.
+
+    Successful GET and HEAD responses get an ETag of their body and the
+    given `Cache-Control`, a request sending a matching `If-None-Match`
+    receives 304 without a body. Error and streamed responses are returned
+    unchanged.
+
+    Args:
+        cache_control (str): `Cache-Control` header of the route.
+        vary (Optional[str]): `Vary` header, e.g. `Authorization` for
+            responses that depend on the caller.
+
+    Returns:
+        Callable: Route decorator.
+    """
+
+    def decorator(view: Callable) -> Callable:
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            response = make_response(view(*args, **kwargs))
+            if (
+                request.method not in ("GET", "HEAD")
+                or response.status_code != 200
+                or response.is_streamed
+            ):
+                return response
+            response.set_etag(body_etag(response.get_data()))
+            response.headers["Cache-Control"] = cache_control
+            if vary:
+                response.vary.add(vary)
+            return response.make_conditional(request)
+
+        return wrapper
+
+    return decorator
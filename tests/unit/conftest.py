@@ -1,14 +1,16 @@
 """Fixture module."""
+from typing import List, Optional
+
 import pytest
+from sqlalchemy import event
 
-from src.app import create_app
+from src.app import create_app, db
 
 
 @pytest.fixture
 def app():
     """Create default app object."""
-    app = create_app()
-    app.config.update(
+    app = create_app(
         {
             "TESTING": True,
             "SQLALCHEMY_DATABASE_URI": "sqlite://",
@@ -23,3 +25,75 @@ def client(app):
     """Create an app testing client."""
     with app.test_client() as client:
         yield client
+
+
+class QueryBudget:
+    """Context manager recording SQL statements sent to the app engines.
+
+    On exit the number of statements is checked against the budget and the
+    captured SQL is part of the failure message.
+    """
+
+    def __init__(
+        self,
+        engines: list,
+        exact: Optional[int] = None,
+        maximum: Optional[int] = None,
+    ) -> None:
+        """Set the expected statement count, `exact` or at most `maximum`."""
+        self.engines = engines
+        self.exact = exact
+        self.maximum = maximum
+        self.statements: List[str] = []
+
+    def record(self, conn, cursor, statement, parameters, context, many):  # pylint: disable=W0613
+        """Store a statement, registered as `before_cursor_execute`."""
+        self.statements.append(statement)
+
+    def __enter__(self) -> "QueryBudget":
+        """Start recording."""
+        for engine in self.engines:
+            event.listen(engine, "before_cursor_execute", self.record)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        """Stop recording and check the budget unless the block failed."""
+        for engine in self.engines:
+            event.remove(engine, "before_cursor_execute", self.record)
+        if exc_type is not None:
+            return
+
+        count = len(self.statements)
+        captured = "\n".join(
+            f"  {index}. {statement}"
+            for index, statement in enumerate(self.statements, start=1)
+        )
+        if self.exact is not None:
+            assert count == self.exact, (
+                f"Expected {self.exact} SQL statements, got {count}:\n"
+                f"{captured}"
+            )
+        if self.maximum is not None:
+            assert count <= self.maximum, (
+                f"Expected at most {self.maximum} SQL statements, got "
+                f"{count}:\n{captured}"
+            )
+
+
+@pytest.fixture
+def query_budget(app):
+    """Return a factory of `QueryBudget` context managers for the app.
+
+    Example:
+        with query_budget(exact=1):
+            client.post("/user/login", ...)
+    """
+    with app.app_context():
+        engines = list(db.engines.values())
+
+    def budget(
+        exact: Optional[int] = None, maximum: Optional[int] = None
+    ) -> QueryBudget:
+        return QueryBudget(engines, exact=exact, maximum=maximum)
+
+    return budget
@@ -0,0 +1,45 @@
+"""Fixture module."""
+import datetime
+
+import pytest
+
+from src.app import db
+from src.application.post.model import Post
+from src.application.user.model import User
+
+
+@pytest.fixture
+def author(app):
+    """Create tables and an author, return the author token."""
+    with app.app_context():
+        db.create_all()
+        user = User(username="author", email="author@test.com", password="x")
+        db.session.add(user)
+        db.session.commit()
+        return user.encode_auth_token()
+
+
+@pytest.fixture
+def posts(app, author):  # pylint: disable=W0613
+    """Create posts of the author, oldest first."""
+    created_on = datetime.datetime(2024, 1, 1)
+    with app.app_context():
+        db.session.add_all(
+            [
+                Post(
+                    author_id=1,
+                    title=title,
+                    body=body,
+                    created_on=created_on + datetime.timedelta(minutes=index),
+                )
+                for index, (title, body) in enumerate(
+                    [
+                        ("Flask tips", "Blueprints keep routes organised."),
+                        ("SQLite search", "FTS5 tables index every word."),
+                        ("Keyset pages", "Seek on an index, never OFFSET."),
+                        ("Flask and SQLite", "Full text search with FTS5."),
+                    ]
+                )
+            ]
+        )
+        db.session.commit()
@@ -0,0 +1,179 @@
+"""route testing module."""
+import datetime
+import json
+
+import pytest
+
+from src.pagination import encode_cursor
+
+
+def test_store_post(client, author):
+    """Test authenticated users create posts."""
+    response = client.post(
+        "/post/",
+        data=json.dumps({"title": "First", "body": "Hello"}),
+        content_type="application/json",
+        headers={"Authorization": f"JWT {author}"},
+    )
+
+    assert response.status_code == 201
+    assert response.json["message"] == "Post Created"
+    assert response.json["data"]["author_id"] == 1
+
+    response = client.get(f"/post/{response.json['data']['id']}")
+    assert response.status_code == 200
+    assert response.json["data"]["title"] == "First"
+
+
+def test_store_post_anonymous(client, author):  # pylint: disable=W0613
+    """Test anonymous users can not post."""
+    response = client.post(
+        "/post/",
+        data=json.dumps({"title": "First", "body": "Hello"}),
+        content_type="application/json",
+    )
+
+    assert response.status_code == 401
+
+
+def test_store_post_invalid(client, author):
+    """Test post data is validated."""
+    response = client.post(
+        "/post/",
+        data=json.dumps({"title": ""}),
+        content_type="application/json",
+        headers={"Authorization": f"JWT {author}"},
+    )
+
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("post_id", [404, 10**20])
+def test_show_missing_post(client, author, post_id):  # pylint: disable=W0613
+    """Test unknown post id, ids past the column range included."""
+    response = client.get(f"/post/{post_id}")
+
+    assert response.status_code == 404
+    assert response.json["message"] == [{"error": "Post not found"}]
+
+
+@pytest.mark.usefixtures("posts")
+@pytest.mark.parametrize("author_id", [None, 1])
+def test_list_posts(client, author_id):
+    """Test posts are paged newest first."""
+    titles, cursor = [], None
+    while True:
+        query = {"limit": 3}
+        if author_id:
+            query["author_id"] = author_id
+        if cursor:
+            query["cursor"] = cursor
+        data = client.get("/post/", query_string=query).json["data"]
+        titles += [post["title"] for post in data["posts"]]
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+
+    assert titles == [
+        "Flask and SQLite",
+        "Keyset pages",
+        "SQLite search",
+        "Flask tips",
+    ]
+
+
+@pytest.mark.usefixtures("posts")
+def test_show_post_cached(client):
+    """Test posts are cacheable and revalidated with their ETag."""
+    response = client.get("/post/1")
+    etag = response.headers["ETag"]
+
+    assert response.headers["Cache-Control"] == "public, max-age=60"
+    response = client.get("/post/1", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+
+@pytest.mark.usefixtures("posts")
+def test_list_posts_other_author(client):
+    """Test author filter."""
+    data = client.get("/post/", query_string={"author_id": 2}).json["data"]
+
+    assert data == {"posts": [], "next_cursor": None}
+
+
+@pytest.mark.usefixtures("posts")
+@pytest.mark.parametrize(
+    ("query", "message"),
+    [
+        ({"cursor": "garbage"}, "Invalid cursor"),
+        ({"cursor": encode_cursor([1, [1, 2]])}, "Invalid cursor"),
+        (
+            {"cursor": encode_cursor([datetime.datetime(2024, 1, 2), 10**20])},
+            "Invalid cursor",
+        ),
+        (
+            {"author_id": 10**20},
+            "author_id: Must be greater than or equal to -9223372036854775808 "
+            "and less than or equal to 9223372036854775807.",
+        ),
+        (
+            {"limit": 500},
+            "limit: Must be greater than or equal to 1 and less than or equal to 100.",
+        ),
+    ],
+)
+def test_list_posts_invalid(client, query, message):
+    """Test invalid listing parameters."""
+    response = client.get("/post/", query_string=query)
+
+    assert response.status_code == 400
+    assert response.json["message"] == [{"error": message}]
+
+
+@pytest.mark.usefixtures("posts")
+@pytest.mark.parametrize(
+    ("query", "expected"),
+    [
+        ("flask", {"Flask tips", "Flask and SQLite"}),
+        ("FTS5 sqlite", {"SQLite search", "Flask and SQLite"}),
+        ("offset", {"Keyset pages"}),
+        ('fts5 "flask" (*', {"Flask and SQLite"}),
+        ("missing", set()),
+        ("!!!", set()),
+    ],
+)
+def test_search_posts(client, query, expected):
+    """Test search uses the full-text index kept in sync by triggers."""
+    response = client.get("/post/search", query_string={"q": query})
+
+    assert response.status_code == 200
+    assert {
+        post["title"] for post in response.json["data"]["posts"]
+    } == expected
+
+
+@pytest.mark.usefixtures("posts")
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "garbage",
+        encode_cursor([[1]]),
+        encode_cursor([True]),
+        encode_cursor([10**20]),
+    ],
+)
+def test_search_posts_invalid_cursor(client, cursor):
+    """Test tampered search cursors are rejected before querying."""
+    response = client.get(
+        "/post/search", query_string={"q": "flask", "cursor": cursor}
+    )
+
+    assert response.status_code == 400
+    assert response.json["message"] == [{"error": "Invalid cursor"}]
+
+
+def test_search_posts_missing_query(client, author):  # pylint: disable=W0613
+    """Test search requires a query."""
+    response = client.get("/post/search")
+
+    assert response.status_code == 400
@@ -0,0 +1,79 @@
+"""Module to test service module."""
+from unittest import mock
+
+import pytest
+
+from src.app import db
+from src.application.post.model import Post, search_terms
+from src.application.post.service import MAX_ID, search_posts
+
+
+def test_search_terms():
+    """Test query syntax is dropped from search input."""
+    assert search_terms('Flask "OR" NEAR(sqlite*') == [
+        "flask",
+        "or",
+        "near",
+        "sqlite",
+    ]
+
+
+@pytest.mark.usefixtures("posts")
+def test_index_follows_updates_and_deletes(app):
+    """Test triggers keep the full-text index in sync."""
+    with app.app_context():
+        post = db.session.get(Post, 1)
+        post.body = "Renamed to quokka"
+        db.session.delete(db.session.get(Post, 2))
+        db.session.commit()
+
+        quokka = search_posts({"q": "quokka"})[0]["data"]["posts"]
+        blueprints = search_posts({"q": "blueprints"})[0]["data"]["posts"]
+        words = search_posts({"q": "words"})[0]["data"]["posts"]
+
+    assert [post["id"] for post in quokka] == [1]
+    assert blueprints == []
+    assert words == []
+
+
+@pytest.mark.usefixtures("posts")
+def test_search_posts_like_fallback(app):
+    """Test backends without full-text index scan with LIKE."""
+    with app.app_context():
+        bind = db.session.get_bind()
+        with mock.patch.object(bind.dialect, "name", "mysql"):
+            response = search_posts({"q": "Flask sqlite"})
+
+    assert [post["title"] for post in response[0]["data"]["posts"]] == [
+        "Flask and SQLite"
+    ]
+
+
+def test_search_posts_postgresql(app):
+    """Test PostgreSQL uses the tsvector index."""
+    with app.app_context(), mock.patch(
+        "src.application.post.service.db"
+    ) as mocked_db:
+        mocked_db.session.get_bind.return_value.dialect.name = "postgresql"
+        mocked_db.session.scalars.return_value.all.return_value = []
+        search_posts({"q": "flask  sqlite", "limit": 5})
+
+    statement, params = mocked_db.session.scalars.call_args[0]
+    assert "plainto_tsquery" in str(statement)
+    assert params == {"query": "flask sqlite", "before": MAX_ID, "limit": 6}
+
+
+@pytest.mark.usefixtures("posts")
+def test_search_posts_pages_newest_first(app):
+    """Test search results are paged by descending id."""
+    with app.app_context():
+        first = search_posts({"q": "flask", "limit": 1})[0]["data"]
+        second = search_posts(
+            {"q": "flask", "limit": 1, "cursor": first["next_cursor"]}
+        )[0]["data"]
+        invalid = search_posts({"q": "flask", "cursor": "x"})
+
+    assert [post["id"] for post in first["posts"]] == [4]
+    assert [post["id"] for post in second["posts"]] == [1]
+    assert second["next_cursor"] is None
+    assert invalid[1] == 400
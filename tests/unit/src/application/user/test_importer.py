@@ -0,0 +1,92 @@
+"""Module to test importer module."""
+import io
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.app import db
+from src.application.user.importer import import_users, read_records
+from src.application.user.model import User
+
+CSV_INPUT = """username,email,password
+alice,alice@test.com,abcd1234
+bobby,not-an-email,abcd1234
+carol,carol@test.com,abcd1234
+alice2,alice@test.com,abcd1234
+dave,dave@test.com,abcd1234
+"""
+
+
+def test_read_records():
+    """Test both formats keep the line number of every record."""
+    csv_records = list(read_records(io.StringIO(CSV_INPUT), "csv"))
+    jsonl_records = list(
+        read_records(io.StringIO('{"username": "a"}\n\n[1\n'), "jsonl")
+    )
+
+    assert csv_records[0] == (
+        2,
+        {
+            "username": "alice",
+            "email": "alice@test.com",
+            "password": "abcd1234",
+        },
+    )
+    assert [line for line, _ in csv_records] == [2, 3, 4, 5, 6]
+    assert jsonl_records == [(1, {"username": "a"}), (3, None)]
+
+
+@pytest.mark.parametrize("batch_size", [1, 2, 10])
+def test_import_users(app, batch_size):
+    """Test invalid and duplicate records fail alone."""
+    app.config["BCRYPT_LOG_ROUNDS"] = 4
+    reports = []
+    with app.app_context():
+        db.create_all()
+        db.session.add(
+            User(username="dave", email="dave@other.com", password="x")
+        )
+        db.session.commit()
+        records = list(read_records(io.StringIO(CSV_INPUT), "csv"))
+        records.append((7, "not an object"))
+        with ThreadPoolExecutor(2) as executor:
+            counts = import_users(
+                records,
+                executor,
+                lambda line, message: reports.append((line, message)),
+                batch_size=batch_size,
+                batches_per_commit=2,
+            )
+        db.session.remove()
+        users = {user.username: user for user in User.query.all()}
+
+    assert counts == {"imported": 2, "failed": 4}
+    assert sorted(reports) == [
+        (3, "email: Not a valid email address."),
+        (5, "Email  already taken"),
+        (6, "Username already exist"),
+        (7, "Invalid record"),
+    ]
+    assert set(users) == {"alice", "carol", "dave"}
+    assert users["alice"].password.startswith("$2b$04$")
+    assert not users["alice"].is_admin
+
+
+def test_import_command(app, tmp_path):
+    """Test `flask user import` reports failures and exits with status 1."""
+    app.config["BCRYPT_LOG_ROUNDS"] = 4
+    source = tmp_path / "users.csv"
+    source.write_text(CSV_INPUT)
+    with app.app_context():
+        db.create_all()
+
+    result = app.test_cli_runner().invoke(
+        args=["user", "import", str(source), "--workers", "1"]
+    )
+
+    assert result.exit_code == 1
+    assert result.stdout == "Imported 3 users, 2 failed\n"
+    assert result.stderr.splitlines() == [
+        "line 3: email: Not a valid email address.",
+        "line 5: Email  already taken",
+    ]
@@ -0,0 +1,97 @@
+"""SQL statement budgets of the user routes.
+
+A failing budget prints the captured statements, raise a budget only when
+the extra query is intended.
+"""
+import pytest
+
+from src.app import db
+from src.application.user.model import User
+
+SIGNUP = {
+    "username": "testusername",
+    "email": "test@test.com",
+    "password": "abcd1234",
+}
+LOGIN = {"email": "test@test.com", "password": "abcd1234"}
+
+
+@pytest.fixture
+def token(app, client):
+    """Create an admin through the API and return its access token."""
+    app.config["BCRYPT_LOG_ROUNDS"] = 4
+    with app.app_context():
+        db.create_all()
+    client.post("/user/", json=SIGNUP)
+    with app.app_context():
+        db.session.execute(db.update(User).values(is_admin=True))
+        db.session.commit()
+    return client.post("/user/login", json=LOGIN).json["data"]["access_token"]
+
+
+def test_signup_budget(app, client, query_budget):
+    """Test signup is one INSERT, duplicates are left to the constraints."""
+    app.config["BCRYPT_LOG_ROUNDS"] = 4
+    with app.app_context():
+        db.create_all()
+
+    with query_budget(exact=1):
+        response = client.post("/user/", json=SIGNUP)
+    assert response.status_code == 201
+
+
+@pytest.mark.usefixtures("token")
+def test_login_budget(client, query_budget):
+    """Test login is one user lookup."""
+    with query_budget(exact=1):
+        response = client.post("/user/login", json=LOGIN)
+    assert response.status_code == 201
+
+
+def test_current_user_budget(client, token, query_budget):
+    """Test the denylist refresh and user lookup happen once."""
+    headers = {"Authorization": f"JWT {token}"}
+    with query_budget(exact=2):
+        response = client.get("/user/", headers=headers)
+    assert response.json["data"]["email"] == "test@test.com"
+
+    # Principal cache hit and a fresh denylist, no SQL at all.
+    with query_budget(exact=0):
+        client.get("/user/", headers=headers)
+
+
+@pytest.mark.parametrize(
+    ("path", "query", "budget"),
+    [
+        ("/user/list", {}, 2),
+        ("/user/list", {"count": "approximate"}, 3),
+        ("/user/export", {}, 2),
+    ],
+)
+def test_admin_read_budget(client, token, query_budget, path, query, budget):  # pylint: disable=R0913
+    """Test admin reads cost the admin flag lookup and one query each."""
+    headers = {"Authorization": f"JWT {token}"}
+    client.get("/user/", headers=headers)
+
+    with query_budget(exact=budget):
+        response = client.get(path, query_string=query, headers=headers)
+        assert response.status_code == 200
+
+
+def test_logout_budget(client, token, query_budget):
+    """Test logout deletes expired rows and inserts the revocation."""
+    headers = {"Authorization": f"JWT {token}"}
+    client.get("/user/", headers=headers)
+
+    with query_budget(exact=2):
+        response = client.post("/user/logout", headers=headers)
+    assert response.status_code == 200
+
+
+def test_budget_failure_lists_statements(app, query_budget):
+    """Test an exceeded budget reports the captured SQL."""
+    with app.app_context(), pytest.raises(
+        AssertionError,
+        match=r"at most 0 SQL statements, got 1:\n\s+1\. SELECT 1",
+    ), query_budget(maximum=0):
+        db.session.execute(db.text("SELECT 1"))
@@ -1,7 +1,15 @@
 """route testing module."""
+import datetime
 import json
+import time
 from unittest import mock
 
+import pytest
+from sqlalchemy import event
+
+from src.app import db, rate_limiter
+from src.application.user.model import User
+from src.pagination import encode_cursor
 from src.util import generate_response
 
 
@@ -34,6 +42,27 @@ def test_user_details_guest(client):
     assert expected_value == actual_dict
 
 
+@mock.patch("flask_login.utils._get_user")
+def test_user_details_not_modified(current_user, client, user_detail):
+    """Test unchanged user details are revalidated without a body."""
+    current_user.return_value = user_detail
+    response = client.get("/user/")
+    etag = response.headers["ETag"]
+
+    assert response.headers["Cache-Control"] == "private, no-cache"
+    assert "Authorization" in response.vary
+
+    response = client.get("/user/", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.data == b""
+    assert response.headers["ETag"] == etag
+
+    user_detail.username = "renamed"
+    response = client.get("/user/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
 def test_user_auth(app, client, user_detail):
     """Test user Login."""
     with app.app_context():
@@ -69,3 +98,385 @@ def test_user_register_route(app, client, user_detail):
         )
 
     assert response.status_code == 201
+
+
+@pytest.mark.parametrize(
+    ("body", "content_type", "expected_status", "expected_error"),
+    [
+        ("{", "application/json", 400, "Invalid JSON body"),
+        ("[1, 2]", "application/json", 400, "Invalid JSON body"),
+        ("email=a", "text/plain", 415, "Content-Type must be application/json"),
+        (
+            json.dumps({"email": "a" * 20000}),
+            "application/json",
+            413,
+            "Request body too large",
+        ),
+    ],
+)
+def test_user_auth_invalid_body(
+    client, body, content_type, expected_status, expected_error
+):
+    """Test malformed bodies are rejected before validation."""
+    with mock.patch("src.application.user.route.login_user") as mocked_login:
+        response = client.post(
+            "/user/login", data=body, content_type=content_type
+        )
+
+    mocked_login.assert_not_called()
+    assert response.status_code == expected_status
+    assert response.json == {
+        "data": None,
+        "message": [{"error": expected_error}],
+        "status": False,
+    }
+
+
+def test_user_auth_rate_limited(app, client):
+    """Test login bursts get 429 before credentials are checked."""
+    app.config["RATELIMIT_LOGIN_PER_EMAIL"] = "2/60"
+    rate_limiter.init_app(app)
+    body = json.dumps({"email": "Test@test.com ", "password": "abcd1234"})
+    with mock.patch("src.application.user.route.login_user") as mocked_login:
+        mocked_login.return_value = generate_response(status=400)
+        statuses = [
+            client.post(
+                "/user/login", data=body, content_type="application/json"
+            ).status_code
+            for _ in range(2)
+        ]
+        response = client.post(
+            "/user/login",
+            data=json.dumps({"email": "test@test.com", "password": "x"}),
+            content_type="application/json",
+        )
+
+    assert statuses == [400, 400]
+    assert mocked_login.call_count == 2
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) == 30
+    assert response.json["message"] == [
+        {"error": "Too many requests, please try again later"}
+    ]
+    with app.app_context():
+        assert rate_limiter.stats() == {"rejected_ip": 0, "rejected_email": 1}
+
+
+def test_user_auth_rate_limited_behind_proxy(app, client):
+    """Test the per IP limit keys on the address added by the proxy."""
+    app.config["RATELIMIT_LOGIN_PER_IP"] = "1/60"
+    app.config["RATELIMIT_TRUSTED_PROXIES"] = 1
+    rate_limiter.init_app(app)
+    with mock.patch("src.application.user.route.login_user") as mocked_login:
+        mocked_login.return_value = generate_response(status=400)
+        statuses = [
+            client.post(
+                "/user/login",
+                json={"email": f"{index}@test.com", "password": "x"},
+                headers={"X-Forwarded-For": forwarded_for},
+            ).status_code
+            for index, forwarded_for in enumerate(
+                ("1.1.1.1", "2.2.2.2", "9.9.9.9, 1.1.1.1")
+            )
+        ]
+
+    assert statuses == [400, 400, 429]
+
+
+def test_user_logout_and_revoke_all(app, client):
+    """Test revoked tokens stop authenticating without a query per request."""
+    app.config["BCRYPT_LOG_ROUNDS"] = 4
+    with app.app_context():
+        db.create_all()
+    headers = {"content_type": "application/json"}
+    client.post(
+        "/user/",
+        data=json.dumps(
+            {
+                "username": "testusername",
+                "email": "test@test.com",
+                "password": "abcd1234",
+            }
+        ),
+        **headers,
+    )
+    login = json.dumps({"email": "test@test.com", "password": "abcd1234"})
+    tokens = [
+        client.post("/user/login", data=login, **headers).json["data"][
+            "access_token"
+        ]
+        for _ in range(3)
+    ]
+
+    def current_email(token):
+        response = client.get(
+            "/user/", headers={"Authorization": f"JWT {token}"}
+        )
+        return response.json["data"]["email"]
+
+    assert current_email(tokens[0]) == "test@test.com"
+    response = client.post(
+        "/user/logout", headers={"Authorization": f"JWT {tokens[0]}"}
+    )
+    assert response.status_code == 200
+    assert current_email(tokens[0]) is None
+    assert current_email(tokens[1]) == "test@test.com"
+
+    # Tokens issued in the second of the revoke all stay valid.
+    time.sleep(1 - time.time() % 1)
+    response = client.post(
+        "/user/revoke-all", headers={"Authorization": f"JWT {tokens[1]}"}
+    )
+    assert response.status_code == 200
+    assert current_email(tokens[1]) is None
+    assert current_email(tokens[2]) is None
+
+    token = client.post("/user/login", data=login, **headers).json["data"][
+        "access_token"
+    ]
+    assert current_email(token) == "test@test.com"
+
+
+@pytest.mark.parametrize("path", ["/user/logout", "/user/revoke-all"])
+def test_user_revoke_anonymous(client, path):
+    """Test revocation requires a valid token."""
+    response = client.post(path)
+
+    assert response.status_code == 401
+    assert response.json["message"] == [{"error": "Authentication required"}]
+
+
+def test_user_details_claims_only(app, client):
+    """Test current user is served from token claims without SQL."""
+    app.config.update(BCRYPT_LOG_ROUNDS=4, AUTH_CLAIMS_ONLY=True)
+    with app.app_context():
+        db.create_all()
+        user = User(
+            username="testusername", email="test@test.com", password="x"
+        )
+        db.session.add(user)
+        db.session.commit()
+        token = user.encode_auth_token()
+        expected = user.serialize
+    headers = {"Authorization": f"JWT {token}"}
+    # First request refreshes the token denylist.
+    client.get("/user/", headers=headers)
+
+    statements = []
+    with app.app_context():
+        event.listen(
+            db.engine,
+            "before_cursor_execute",
+            lambda *args: statements.append(args[2]),
+        )
+    response = client.get("/user/", headers=headers)
+
+    assert response.json["data"] == expected
+    assert statements == []
+
+
+def test_user_list_demoted_admin(app, client):
+    """Test admin routes check the admin flag of the row, not the token."""
+    app.config["AUTH_CLAIMS_ONLY"] = True
+    with app.app_context():
+        db.create_all()
+        user = User(
+            username="testusername", email="test@test.com", password="x"
+        )
+        user.is_admin = True
+        db.session.add(user)
+        db.session.commit()
+        headers = {"Authorization": f"JWT {user.encode_auth_token()}"}
+    assert client.get("/user/list", headers=headers).status_code == 200
+
+    with app.app_context():
+        db.session.execute(db.update(User).values(is_admin=False))
+        db.session.commit()
+
+    for path in ("/user/list", "/user/export"):
+        response = client.get(path, headers=headers)
+        assert response.status_code == 403
+
+
+def test_user_list(app, client):
+    """Test admins page through users newest first without gaps."""
+    created_on = datetime.datetime(2024, 1, 1)
+    with app.app_context():
+        db.create_all()
+        db.session.execute(
+            User.__table__.insert(),
+            [
+                {
+                    "username": f"user{index}",
+                    "email": f"user{index}@test.com",
+                    "password": f"hash{index}",
+                    # Pairs of users share a timestamp, ties break on id.
+                    "created_on": created_on
+                    + datetime.timedelta(seconds=index // 2),
+                    "is_admin": index == 0,
+                }
+                for index in range(7)
+            ],
+        )
+        db.session.commit()
+        admin_token = db.session.get(User, 1).encode_auth_token()
+        user_token = db.session.get(User, 2).encode_auth_token()
+
+    ids, cursor = [], None
+    while True:
+        query = {"limit": 3, "count": "approximate"}
+        if cursor:
+            query["cursor"] = cursor
+        response = client.get(
+            "/user/list",
+            query_string=query,
+            headers={"Authorization": f"JWT {admin_token}"},
+        )
+        assert response.status_code == 200
+        data = response.json["data"]
+        assert data["approximate_total"] == 7
+        ids += [user["id"] for user in data["users"]]
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+
+    assert ids == [7, 6, 5, 4, 3, 2, 1]
+
+    response = client.get(
+        "/user/list", headers={"Authorization": f"JWT {user_token}"}
+    )
+    assert response.status_code == 403
+    assert client.get("/user/list").status_code == 401
+
+    for query, message in (
+        ({"cursor": "garbage"}, "Invalid cursor"),
+        ({"cursor": encode_cursor([1, [1, 2]])}, "Invalid cursor"),
+        ({"cursor": encode_cursor([{"a": 1}, 2])}, "Invalid cursor"),
+        ({"cursor": encode_cursor(["dt:nonsense", 2])}, "Invalid cursor"),
+        (
+            {"cursor": encode_cursor([datetime.datetime(2024, 1, 2), 10**20])},
+            "Invalid cursor",
+        ),
+        (
+            {"limit": 0},
+            "limit: Must be greater than or equal to 1 and less than or equal to 200.",
+        ),
+    ):
+        response = client.get(
+            "/user/list",
+            query_string=query,
+            headers={"Authorization": f"JWT {admin_token}"},
+        )
+        assert response.status_code == 400
+        assert response.json["message"] == [{"error": message}]
+
+
+@pytest.fixture
+def exported_users(app):
+    """Create three users, the first is an admin, and return their tokens."""
+    with app.app_context():
+        db.create_all()
+        db.session.execute(
+            User.__table__.insert(),
+            [
+                {
+                    "username": f"user{index}",
+                    "email": f"user{index}@test.com",
+                    "password": f"hash{index}",
+                    "created_on": datetime.datetime(2024, 1, 1, 0, 0, index),
+                    "is_admin": index == 0,
+                }
+                for index in range(3)
+            ],
+        )
+        db.session.commit()
+        return [
+            db.session.get(User, user_id).encode_auth_token()
+            for user_id in (1, 2)
+        ]
+
+
+def test_user_export_ndjson(app, client, exported_users):
+    """Test admins stream users as NDJSON without reading password hashes."""
+    statements = []
+
+    def record(conn, cursor, statement, *args):  # pylint: disable=W0613
+        statements.append(statement)
+
+    with app.app_context():
+        event.listen(db.engine, "before_cursor_execute", record)
+    response = client.get(
+        "/user/export",
+        headers={"Authorization": f"JWT {exported_users[0]}"},
+    )
+    lines = response.data.decode().splitlines()
+
+    assert response.status_code == 200
+    assert "Content-Length" not in response.headers
+    assert response.mimetype == "application/x-ndjson"
+    assert response.headers["Content-Disposition"] == (
+        "attachment; filename=users.ndjson"
+    )
+    assert json.loads(lines[0]) == {
+        "created_on": "2024-01-01 00:00:00",
+        "email": "user0@test.com",
+        "id": 1,
+        "is_admin": True,
+        "username": "user0",
+    }
+    assert len(lines) == 3
+    (export,) = [
+        statement
+        for statement in statements
+        if "ORDER BY users.id" in statement
+    ]
+    assert "password" not in export
+
+
+def test_user_export_csv(client, exported_users):
+    """Test CSV export starts with a header row."""
+    response = client.get(
+        "/user/export",
+        query_string={"format": "csv"},
+        headers={"Authorization": f"JWT {exported_users[0]}"},
+    )
+
+    assert response.mimetype == "text/csv"
+    assert response.data.decode().splitlines() == [
+        "id,username,email,created_on,is_admin",
+        "1,user0,user0@test.com,2024-01-01 00:00:00,True",
+        "2,user1,user1@test.com,2024-01-01 00:00:01,False",
+        "3,user2,user2@test.com,2024-01-01 00:00:02,False",
+    ]
+
+
+def test_user_export_errors(client, exported_users):
+    """Test export is limited to admins and known formats."""
+    assert client.get("/user/export").status_code == 401
+    response = client.get(
+        "/user/export", headers={"Authorization": f"JWT {exported_users[1]}"}
+    )
+    assert response.status_code == 403
+    response = client.get(
+        "/user/export",
+        query_string={"format": "xml"},
+        headers={"Authorization": f"JWT {exported_users[0]}"},
+    )
+    assert response.status_code == 400
+    assert response.json["message"] == [
+        {"error": "format: Must be one of: ndjson, csv."}
+    ]
+
+
+@pytest.mark.usefixtures("exported_users")
+def test_user_export_command(app, tmp_path):
+    """Test `flask user export` writes the same rows to a file."""
+    output = tmp_path / "users.csv"
+    result = app.test_cli_runner().invoke(
+        args=["user", "export", "--format", "csv", "--output", str(output)]
+    )
+
+    assert result.exit_code == 0, result.output
+    assert output.read_text().splitlines()[1:2] == [
+        "1,user0,user0@test.com,2024-01-01 00:00:00,True"
+    ]
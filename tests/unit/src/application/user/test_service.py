@@ -1,14 +1,26 @@
 """Module to test service module."""
+import datetime
 import json
 from unittest import mock
 
+import jwt
 import pytest
+from sqlalchemy.exc import IntegrityError
 
+from src.app import db, principal_cache
+from src.application.user.model import (
+    ClaimsPrincipal,
+    User,
+    invalidate_cached_user,
+)
 from src.application.user.service import (
     create_user,
+    export_rows,
     load_user_from_request,
     login_user,
+    revocation_for_claims,
 )
+from src.hashing import HashingBusyError
 
 
 def test_create_user_messing_data():
@@ -24,43 +36,54 @@ def test_create_user_messing_data():
     assert expected_result == result
 
 
-class MockQuery:
-    """Mock query class to perform query operation."""
-
-    def __init__(self, value):
-        """Constructor to set result value."""
-        self.result = value
+def integrity_error(message):
+    """Build IntegrityError raised by the database driver."""
+    return IntegrityError("INSERT INTO users", {}, Exception(message))
 
-    def first(self):
-        """Mock query class first method."""
-        return self.result
 
-
-def test_create_user_email_exist(app):
-    """Test case to check user creation with duplicate email."""
+@pytest.mark.parametrize(
+    ("driver_message", "expected_message"),
+    [
+        (
+            "UNIQUE constraint failed: users.email",
+            "Email  already taken",
+        ),
+        (
+            "UNIQUE constraint failed: users.username",
+            "Username already exist",
+        ),
+        (
+            'duplicate key value violates unique constraint "users_email_key"\n'
+            "DETAIL:  Key (email)=(username@test.com) already exists.",
+            "Email  already taken",
+        ),
+        (
+            "(1062, \"Duplicate entry 'testusername' for key 'users.username'\")",
+            "Username already exist",
+        ),
+    ],
+)
+def test_create_user_duplicate(app, driver_message, expected_message):
+    """Test case to check user creation with duplicate username or email."""
     user_data = {
         "username": "testusername",
         "email": "test@test.com",
         "password": "abcd1234",
     }
 
-    def mock_filter_by(*args, **kwargs):
-        if kwargs == {"username": "testusername"}:
-            return MockQuery(None)
-        else:
-            return MockQuery(True)
-
     with app.app_context():
-        with mock.patch(
-            "flask_sqlalchemy.model._QueryProperty.__get__"
-        ) as queryMOCK:  # setup
-            queryMOCK.return_value.filter_by.side_effect = mock_filter_by
+        with mock.patch("src.application.user.service.db") as mocked_db:
+            mocked_db.session.commit.side_effect = integrity_error(
+                driver_message
+            )
             result = create_user(user_data)
 
+        mocked_db.session.rollback.assert_called_once()
+
     expected_result = (
         {
             "data": None,
-            "message": [{"error": "Email  already taken"}],
+            "message": [{"error": expected_message}],
             "status": False,
         },
         400,
@@ -69,8 +92,8 @@ def test_create_user_email_exist(app):
     assert expected_result == result
 
 
-def test_create_user_username_exist(app):
-    """Test case to check user creation with duplicate username."""
+def test_create_user_other_integrity_error(app):
+    """Test case to check unrelated integrity errors are not masked."""
     user_data = {
         "username": "testusername",
         "email": "test@test.com",
@@ -78,28 +101,16 @@ def test_create_user_username_exist(app):
     }
 
     with app.app_context():
-        with mock.patch(
-            "flask_sqlalchemy.model._QueryProperty.__get__"
-        ) as queryMOCK:  # setup
-            queryMOCK.return_value.filter_by.return_value.first.return_value = (
-                True
+        with mock.patch("src.application.user.service.db") as mocked_db:
+            mocked_db.session.commit.side_effect = integrity_error(
+                "NOT NULL constraint failed: users.created_on"
             )
-            result = create_user(user_data)
-
-    expected_result = (
-        {
-            "data": None,
-            "message": [{"error": "Username already exist"}],
-            "status": False,
-        },
-        400,
-    )
-
-    assert expected_result == result
+            with pytest.raises(IntegrityError, match="NOT NULL"):
+                create_user(user_data)
 
 
 def test_create_user_valid_data(app):
-    """Test case to check user creation with duplicate username."""
+    """Test case to check user creation with valid data."""
     user_data = {
         "username": "testusername",
         "email": "test@test.com",
@@ -107,12 +118,11 @@ def test_create_user_valid_data(app):
     }
 
     with app.app_context():
-        with mock.patch(
-            "flask_sqlalchemy.model._QueryProperty.__get__"
-        ) as queryMOCK:  # setup
-            with mock.patch("src.application.user.service.db"):
-                queryMOCK.return_value.filter_by.return_value.first.return_value = None
-                result = create_user(user_data)
+        with mock.patch("src.application.user.service.db") as mocked_db:
+            result = create_user(user_data)
+
+        mocked_db.session.add.assert_called_once()
+        mocked_db.session.commit.assert_called_once()
 
     expected_result = (
         {
@@ -126,6 +136,27 @@ def test_create_user_valid_data(app):
     assert expected_result == result
 
 
+def test_users_hash_columns_not_unique(app):
+    """Test only username and email have unique indexes."""
+    with app.app_context():
+        db.create_all()
+        for index in range(2):
+            db.session.add(
+                User(
+                    username=f"hashuser{index}",
+                    email=f"hashuser{index}@test.com",
+                    password="$2b$04$" + "a" * 53,
+                )
+            )
+        db.session.commit()
+
+        assert User.query.count() == 2
+        assert {
+            column.name for column in User.__table__.columns if column.unique
+        } == {"username", "email"}
+        assert User.__table__.c.password.type.length == 60
+
+
 @pytest.mark.parametrize("user_response", [(True), (None)])
 def test_load_user_from_request(app, user_detail, user_response):
     """Test case to check user details wit flask request."""
@@ -213,3 +244,195 @@ def test_user_login(
 
     assert response[0] == expected_data
     assert response[1] == expected_status
+
+
+def test_load_user_from_request_cached(app, user_detail):
+    """Test cached user is served without querying database."""
+    user_detail.id = 1
+    mock_request = mock.Mock()
+    with app.app_context():
+        token = user_detail.encode_auth_token()
+        mock_request.headers.get.return_value = "JWT " + token
+        with mock.patch(
+            "flask_sqlalchemy.model._QueryProperty.__get__"
+        ) as queryMOCK:  # setup
+            queryMOCK.return_value.filter_by.return_value.first.return_value = (
+                user_detail
+            )
+            first = load_user_from_request(mock_request)
+            second = load_user_from_request(mock_request)
+
+        assert first == user_detail
+        assert second.email == user_detail.email
+        assert second.id == 1
+        assert queryMOCK.return_value.filter_by.call_count == 1
+        assert principal_cache.stats()["hits"] == 1
+
+        invalidate_cached_user(None, None, user_detail)
+        assert principal_cache.get(1) is None
+
+
+def test_user_login_rehash(app, user_detail):
+    """Test outdated password hash is upgraded on login."""
+    app.config["BCRYPT_LOG_ROUNDS"] = 4
+    with app.app_context():
+        with mock.patch(
+            "flask_sqlalchemy.model._QueryProperty.__get__"
+        ) as queryMOCK:  # setup
+            with mock.patch("src.application.user.service.db") as mocked_db:
+                queryMOCK.return_value.filter_by.return_value.first.return_value = user_detail
+                response = login_user(
+                    {"email": "test@test.com", "password": "abcd1234"}
+                )
+
+        assert response[1] == 201
+        assert user_detail.password.startswith("$2b$04$")
+        assert user_detail.check_password("abcd1234") is True
+        mocked_db.session.commit.assert_called_once()
+
+
+def test_user_login_hashing_busy(app, user_detail):
+    """Test login is shed when hashing queue is full."""
+    with app.app_context():
+        with mock.patch(
+            "flask_sqlalchemy.model._QueryProperty.__get__"
+        ) as queryMOCK:  # setup
+            queryMOCK.return_value.filter_by.return_value.first.return_value = (
+                user_detail
+            )
+            with mock.patch.object(
+                user_detail, "check_password", side_effect=HashingBusyError
+            ):
+                response = login_user(
+                    {"email": "test@test.com", "password": "abcd1234"}
+                )
+
+    assert response == (
+        {
+            "data": None,
+            "message": [{"error": "Server is busy, please try again"}],
+            "status": False,
+        },
+        503,
+    )
+
+
+def test_user_login_rehash_busy(app, user_detail):
+    """Test a busy hasher leaves the stored hash untouched on rehash."""
+    app.config["BCRYPT_LOG_ROUNDS"] = 4
+    stored = user_detail.password
+    with app.app_context():
+        with mock.patch(
+            "flask_sqlalchemy.model._QueryProperty.__get__"
+        ) as queryMOCK, mock.patch(
+            "src.application.user.service.db"
+        ) as mocked_db, mock.patch(
+            "src.app.hasher.hash", side_effect=HashingBusyError
+        ):
+            queryMOCK.return_value.filter_by.return_value.first.return_value = (
+                user_detail
+            )
+            response = login_user(
+                {"email": "test@test.com", "password": "abcd1234"}
+            )
+
+    assert response[1] == 503
+    assert user_detail.password == stored
+    mocked_db.session.commit.assert_not_called()
+
+
+def test_revocation_for_claims():
+    """Test tokens without `jti` are revoked through a user cutoff."""
+    claims = {"id": 1, "exp": 1700000000}
+
+    revoked = revocation_for_claims(dict(claims, jti="abc"))
+    assert (revoked.jti, revoked.user_id) == ("abc", None)
+    assert revoked.expires_at == datetime.datetime(2023, 11, 14, 22, 13, 20)
+
+    revoked = revocation_for_claims(claims)
+    assert (revoked.jti, revoked.user_id) == (None, 1)
+    assert revoked.revoked_before.microsecond == 0
+
+
+def test_load_user_from_request_revoked(app, user_detail):
+    """Test revoked tokens are rejected before the principal cache."""
+    mock_request = mock.Mock()
+    with app.app_context():
+        token = user_detail.encode_auth_token()
+        mock_request.headers.get.return_value = "JWT " + token
+        with mock.patch(
+            "src.app.token_denylist.is_revoked", return_value=True
+        ), mock.patch(
+            "flask_sqlalchemy.model._QueryProperty.__get__"
+        ) as queryMOCK:
+            assert load_user_from_request(mock_request) is None
+
+    queryMOCK.return_value.filter_by.assert_not_called()
+
+
+def test_claims_principal(app):
+    """Test principal loads the user row only for missing attributes."""
+    with app.app_context():
+        db.create_all()
+        user = User(
+            username="testusername", email="test@test.com", password="x"
+        )
+        db.session.add(user)
+        db.session.commit()
+        claims = jwt.decode(
+            user.encode_auth_token(), app.config["SECRET_KEY"], ["HS256"]
+        )
+        principal = ClaimsPrincipal(claims)
+
+        assert ClaimsPrincipal.has_claims(claims)
+        assert not ClaimsPrincipal.has_claims({"id": 1, "email": "x"})
+        assert principal.serialize == user.serialize
+        assert principal.get_id() == str(user.id)
+        assert repr(principal) == "<ClaimsPrincipal testusername>"
+        assert principal.password == "x"
+        with pytest.raises(AttributeError, match="unknown"):
+            principal.unknown  # pylint: disable=W0104
+
+        principal = ClaimsPrincipal(dict(claims, id=999, created_on=None))
+        assert principal.serialize["modified_at"] is None
+        with pytest.raises(AttributeError, match="password"):
+            principal.password  # pylint: disable=W0104
+
+
+def test_load_user_from_request_claims_only(app, user_detail):
+    """Test claims-only mode skips the user lookup."""
+    app.config["AUTH_CLAIMS_ONLY"] = True
+    user_detail.id = 1
+    mock_request = mock.Mock()
+    with app.app_context():
+        mock_request.headers.get.return_value = (
+            "JWT " + user_detail.encode_auth_token()
+        )
+        with mock.patch(
+            "flask_sqlalchemy.model._QueryProperty.__get__"
+        ) as queryMOCK:
+            result = load_user_from_request(mock_request)
+
+    assert isinstance(result, ClaimsPrincipal)
+    assert result.email == user_detail.email
+    queryMOCK.return_value.filter_by.assert_not_called()
+
+
+def test_export_rows_batches(app):
+    """Test exported rows are yielded one chunk per fetched batch."""
+    with app.app_context():
+        db.create_all()
+        db.session.execute(
+            User.__table__.insert(),
+            [
+                {
+                    "username": f"user{index}",
+                    "email": f"user{index}@test.com",
+                    "password": f"hash{index}",
+                }
+                for index in range(5)
+            ],
+        )
+        chunks = list(export_rows("ndjson", batch_size=2))
+
+    assert [chunk.count(b"\n") for chunk in chunks] == [2, 2, 1]
@@ -1 +1,48 @@
 """test app module."""
+import click
+from flask_migrate import check, upgrade
+
+import src.app
+from src.app import create_app, init_migrations
+
+
+def test_import_has_no_app():
+    """Test importing the module does not build an application."""
+    assert not hasattr(src.app, "app")
+
+
+def test_health(client):
+    """Test health route."""
+    response = client.get("/")
+
+    assert response.status_code == 200
+    assert response.json == {"status": "ok"}
+
+
+def test_create_app_config_override(app):
+    """Test settings passed to the factory override defaults."""
+    assert app.config["SQLALCHEMY_DATABASE_URI"] == "sqlite://"
+    assert "migrate" not in app.extensions
+
+
+def test_create_app_from_cli():
+    """Test migrations are registered when loaded by the flask CLI."""
+    with click.Context(click.Command("run")):
+        flask_app = create_app({"SQLALCHEMY_DATABASE_URI": "sqlite://"})
+
+    assert "migrate" in flask_app.extensions
+
+
+def test_migrations_match_models(tmp_path):
+    """Test `flask db check` finds nothing to migrate at head.
+
+    Search tables created by raw SQL must not show up as tables to drop.
+    """
+    flask_app = create_app(
+        {"SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'head.db'}"}
+    )
+    init_migrations(flask_app)
+    with flask_app.app_context():
+        upgrade()
+        # Exits with status 1 when the models differ from the database.
+        check()
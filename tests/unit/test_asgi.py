@@ -0,0 +1,353 @@
+"""Test ASGI serving mode."""
+import asyncio
+import json
+import logging
+from unittest import mock
+
+import jwt
+import pytest
+
+from src.app import db, principal_cache, rate_limiter, token_denylist
+from src.application.user.service import revocation_for_claims
+from src.asgi import create_asgi_app
+from src.hashing import HashingBusyError
+
+SIGNUP = {
+    "username": "testusername",
+    "email": "username@test.com",
+    "password": "abcd1234",
+}
+
+
+@pytest.fixture
+def asgi_app():
+    """Create ASGI app with an empty in-memory database."""
+    asgi_app = create_asgi_app(
+        {
+            "TESTING": True,
+            "SQLALCHEMY_DATABASE_URI": "sqlite://",
+            "BCRYPT_LOG_ROUNDS": 4,
+        }
+    )
+
+    async def create_all():
+        async with asgi_app.engine.begin() as connection:
+            await connection.run_sync(db.metadata.create_all)
+
+    asyncio.run(create_all())
+    yield asgi_app
+    asyncio.run(asgi_app.engine.dispose())
+
+
+def request(asgi_app, method, path, body=b"", headers=None, chunks=None):
+    """Send one HTTP request to the ASGI app.
+
+    Returns:
+        tuple: Status code, headers and decoded JSON body.
+    """
+    if isinstance(body, dict):
+        body = json.dumps(body).encode()
+        headers = {"Content-Type": "application/json", **(headers or {})}
+    messages = [
+        {"type": "http.request", "body": chunk, "more_body": True}
+        for chunk in chunks or []
+    ] + [{"type": "http.request", "body": body, "more_body": False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "headers": [
+            (name.lower().encode(), value.encode())
+            for name, value in (headers or {}).items()
+        ],
+        "client": ("127.0.0.1", 50000),
+    }
+    asyncio.run(asgi_app(scope, receive, send))
+    start, response = sent
+    return (
+        start["status"],
+        dict(start["headers"]),
+        json.loads(response["body"]),
+    )
+
+
+def test_health(asgi_app):
+    """Test health check."""
+    status, headers, body = request(asgi_app, "GET", "/")
+
+    assert (status, body) == (200, {"status": "ok"})
+    assert headers[b"content-type"] == b"application/json"
+
+
+def test_signup_login_and_current_user(asgi_app):
+    """Test user flow served by async handlers."""
+    status, _, body = request(asgi_app, "POST", "/user/", SIGNUP)
+    assert status == 201
+    assert body["data"] == {
+        "username": "testusername",
+        "email": "username@test.com",
+    }
+
+    status, _, body = request(asgi_app, "POST", "/user/", SIGNUP)
+    assert (status, body["message"]) == (
+        400,
+        [{"error": "Email  already taken"}],
+    )
+
+    status, _, body = request(
+        asgi_app,
+        "POST",
+        "/user/login",
+        {"email": "username@test.com", "password": "abcd1234"},
+    )
+    assert status == 201
+    token = body["data"]["access_token"]
+
+    for _ in range(2):
+        status, _, body = request(
+            asgi_app, "GET", "/user/", headers={"Authorization": f"JWT {token}"}
+        )
+        assert status == 200
+        assert body["data"]["email"] == "username@test.com"
+    with asgi_app.flask_app.app_context():
+        assert principal_cache.stats()["hits"] == 1
+
+
+def test_login_invalid_password(asgi_app):
+    """Test wrong password is rejected."""
+    request(asgi_app, "POST", "/user/", SIGNUP)
+    status, _, body = request(
+        asgi_app,
+        "POST",
+        "/user/login",
+        {"email": "username@test.com", "password": "wrong-pass"},
+    )
+
+    assert (status, body["message"]) == (
+        400,
+        [{"error": "Invalid username or password"}],
+    )
+
+
+def test_login_rehash(asgi_app):
+    """Test outdated hashes are replaced on login."""
+    request(asgi_app, "POST", "/user/", SIGNUP)
+    asgi_app.flask_app.config["BCRYPT_LOG_ROUNDS"] = 5
+    login = {"email": "username@test.com", "password": "abcd1234"}
+
+    assert request(asgi_app, "POST", "/user/login", login)[0] == 201
+
+    async def stored_hash():
+        async with asgi_app.engine.connect() as connection:
+            result = await connection.exec_driver_sql(
+                "SELECT password FROM users"
+            )
+            return result.scalar()
+
+    assert asyncio.run(stored_hash()).startswith("$2b$05$")
+
+
+@pytest.mark.parametrize("path", ["/user/", "/user/login"])
+def test_hashing_busy(asgi_app, path):
+    """Test full hashing queue is reported as 503."""
+    payload = SIGNUP
+    if path == "/user/login":
+        request(asgi_app, "POST", "/user/", SIGNUP)
+        payload = {"email": "username@test.com", "password": "abcd1234"}
+    with mock.patch(
+        "src.hashing.HashingPool.run_async", side_effect=HashingBusyError
+    ):
+        status, _, body = request(asgi_app, "POST", path, payload)
+
+    assert (status, body["message"]) == (
+        503,
+        [{"error": "Server is busy, please try again"}],
+    )
+
+
+def test_anonymous_user(asgi_app):
+    """Test invalid tokens give the anonymous user."""
+    for headers in ({}, {"Authorization": "JWT invalid"}):
+        status, _, body = request(asgi_app, "GET", "/user/", headers=headers)
+        assert (status, body["data"]["id"]) == (200, None)
+
+
+def test_validation_error(asgi_app):
+    """Test schema errors use the shared envelope."""
+    status, _, body = request(
+        asgi_app,
+        "POST",
+        "/user/",
+        {"email": "x@test.com", "password": "abcd1234"},
+    )
+
+    assert status == 400
+    assert body["message"] == [
+        {"error": "username: Missing data for required field."}
+    ]
+
+
+@pytest.mark.parametrize(
+    ("kwargs", "expected"),
+    [
+        ({"body": b"{}"}, (415, "Content-Type must be application/json")),
+        (
+            {"body": b"[1]", "headers": {"Content-Type": "application/json"}},
+            (400, "Invalid JSON body"),
+        ),
+        (
+            {"body": b"{", "headers": {"Content-Type": "application/json"}},
+            (400, "Invalid JSON body"),
+        ),
+        (
+            {"body": b"{}", "headers": {"Content-Length": "999999"}},
+            (413, "Request body too large"),
+        ),
+        (
+            {"body": b"}", "chunks": [b"{" * 16 * 1024]},
+            (413, "Request body too large"),
+        ),
+    ],
+)
+def test_invalid_body(asgi_app, kwargs, expected):
+    """Test bodies are rejected like in WSGI mode."""
+    status, _, body = request(asgi_app, "POST", "/user/login", **kwargs)
+
+    assert (status, body["message"]) == (expected[0], [{"error": expected[1]}])
+
+
+def test_unknown_route(asgi_app):
+    """Test unknown paths and methods."""
+    assert request(asgi_app, "GET", "/missing")[0] == 404
+    assert request(asgi_app, "DELETE", "/user/")[0] == 405
+
+
+def test_lifespan(asgi_app):
+    """Test startup and shutdown messages."""
+    messages = [{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message["type"])
+
+    asyncio.run(asgi_app({"type": "lifespan"}, receive, send))
+    asyncio.run(asgi_app({"type": "websocket"}, receive, send))
+
+    assert sent == ["lifespan.startup.complete", "lifespan.shutdown.complete"]
+
+
+def test_login_rate_limited(asgi_app):
+    """Test login limits apply in ASGI mode."""
+    asgi_app.flask_app.config["RATELIMIT_LOGIN_PER_IP"] = "1/60"
+    rate_limiter.init_app(asgi_app.flask_app)
+    login = {"email": "username@test.com", "password": "abcd1234"}
+
+    assert request(asgi_app, "POST", "/user/login", login)[0] == 400
+    status, headers, _ = request(asgi_app, "POST", "/user/login", login)
+
+    assert status == 429
+    assert headers[b"retry-after"] == b"60"
+
+
+def test_login_rate_limited_behind_proxy(asgi_app):
+    """Test the per IP limit reads X-Forwarded-For from trusted proxies."""
+    asgi_app.flask_app.config["RATELIMIT_LOGIN_PER_IP"] = "1/60"
+    asgi_app.flask_app.config["RATELIMIT_TRUSTED_PROXIES"] = 1
+    rate_limiter.init_app(asgi_app.flask_app)
+    login = {"email": "username@test.com", "password": "abcd1234"}
+    statuses = [
+        request(
+            asgi_app,
+            "POST",
+            "/user/login",
+            login,
+            headers={"X-Forwarded-For": forwarded_for},
+        )[0]
+        for forwarded_for in ("1.1.1.1", "2.2.2.2", "1.1.1.1")
+    ]
+
+    assert statuses == [400, 400, 429]
+
+
+def test_revoked_token(asgi_app):
+    """Test revocations written by other workers are picked up."""
+    request(asgi_app, "POST", "/user/", SIGNUP)
+    login = {"email": "username@test.com", "password": "abcd1234"}
+    token = request(asgi_app, "POST", "/user/login", login)[2]["data"][
+        "access_token"
+    ]
+    headers = {"Authorization": f"JWT {token}"}
+    assert request(asgi_app, "GET", "/user/", headers=headers)[2]["data"]["id"]
+    with asgi_app.flask_app.app_context():
+        claims = jwt.decode(
+            token, asgi_app.flask_app.config["SECRET_KEY"], ["HS256"]
+        )
+
+    async def revoke():
+        async with asgi_app.sessionmaker() as session:
+            session.add(revocation_for_claims(claims))
+            await session.commit()
+
+    asyncio.run(revoke())
+    assert request(asgi_app, "GET", "/user/", headers=headers)[2]["data"]["id"]
+
+    with asgi_app.flask_app.app_context():
+        token_denylist.store.refreshed_at = float("-inf")
+    assert (
+        request(asgi_app, "GET", "/user/", headers=headers)[2]["data"]["id"]
+        is None
+    )
+
+
+def test_claims_only(asgi_app):
+    """Test claims-only mode in ASGI mode."""
+    asgi_app.flask_app.config["AUTH_CLAIMS_ONLY"] = True
+    request(asgi_app, "POST", "/user/", SIGNUP)
+    login = {"email": "username@test.com", "password": "abcd1234"}
+    token = request(asgi_app, "POST", "/user/login", login)[2]["data"][
+        "access_token"
+    ]
+    headers = {"Authorization": f"JWT {token}"}
+    request(asgi_app, "GET", "/user/", headers=headers)
+
+    with mock.patch(
+        "src.application.user.async_service.find_user_by_email"
+    ) as find_user:
+        body = request(asgi_app, "GET", "/user/", headers=headers)[2]
+
+    find_user.assert_not_called()
+    assert body["data"]["username"] == "testusername"
+    assert body["data"]["modified_at"] is not None
+
+
+def test_slow_query_log(asgi_app, caplog):
+    """Test statements of the async engine are logged with their plan."""
+    request(asgi_app, "POST", "/user/", SIGNUP)
+    asgi_app.flask_app.extensions["slow_query_log"].threshold = 0
+    caplog.set_level(logging.WARNING, logger="src.slowquery")
+    status, _, _ = request(
+        asgi_app,
+        "POST",
+        "/user/login",
+        {"email": SIGNUP["email"], "password": SIGNUP["password"]},
+    )
+    messages = [
+        record.getMessage()
+        for record in caplog.records
+        if "WHERE users.email = ?" in record.getMessage()
+    ]
+
+    assert status == 201
+    assert len(messages) == 1
+    assert "SEARCH users USING INDEX" in messages[0]
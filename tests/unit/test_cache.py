@@ -0,0 +1,63 @@
+"""Test cache module."""
+from unittest import mock
+
+from src.cache import TTLCache
+
+
+def test_ttl_cache_hit_and_miss():
+    """Test cache counters on hit and miss."""
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.stats() == {
+        "size": 1,
+        "maxsize": 2,
+        "ttl": 60,
+        "hits": 1,
+        "misses": 1,
+        "evictions": 0,
+    }
+
+
+def test_ttl_cache_lru_eviction():
+    """Test least recently used entry is evicted first."""
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.evictions == 1
+
+
+def test_ttl_cache_expiry():
+    """Test entries expire after ttl."""
+    cache = TTLCache(maxsize=2, ttl=10)
+    with mock.patch("src.cache.time.monotonic", return_value=100):
+        cache.set("a", 1)
+    with mock.patch("src.cache.time.monotonic", return_value=111):
+        assert cache.get("a") is None
+
+    assert len(cache) == 0
+
+
+def test_ttl_cache_disabled_and_invalidate():
+    """Test zero sized cache and explicit invalidation."""
+    disabled = TTLCache(maxsize=0)
+    disabled.set("a", 1)
+    assert disabled.get("a") is None
+
+    cache = TTLCache()
+    cache.set("a", 1)
+    cache.invalidate("a")
+    assert cache.get("a") is None
+
+    cache.set("a", 1)
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.misses == 0
@@ -0,0 +1,131 @@
+"""Test compression module."""
+import gzip
+import zlib
+from unittest import mock
+
+import pytest
+from flask import Response, stream_with_context
+
+from src.app import create_app
+from src.compression import GzipEncoder, available_encoders, compress_stream
+from src.util import conditional
+
+LARGE = {"items": [{"id": index, "name": "x" * 20} for index in range(100)]}
+
+
+@pytest.fixture
+def compressed_app():
+    """Create an app with small and large JSON routes."""
+    app = create_app({"TESTING": True, "SQLALCHEMY_DATABASE_URI": "sqlite://"})
+
+    @app.get("/large")
+    def large():
+        return LARGE
+
+    @app.get("/stream")
+    def stream():
+        def rows():
+            for index in range(3):
+                yield f'{{"id": {index}}}\n'
+
+        return Response(
+            stream_with_context(rows()), mimetype="application/x-ndjson"
+        )
+
+    @app.get("/png")
+    def png():
+        return Response(b"\x89PNG" * 500, mimetype="image/png")
+
+    return app
+
+
+def test_compress_large_json(compressed_app):
+    """Test large bodies are compressed with the negotiated coding."""
+    client = compressed_app.test_client()
+    response = client.get("/large", headers={"Accept-Encoding": "gzip, br"})
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.vary
+    assert int(response.headers["Content-Length"]) == len(response.data)
+    assert compressed_app.json.loads(gzip.decompress(response.data)) == LARGE
+
+
+@pytest.mark.parametrize(
+    ("path", "accept"),
+    [
+        ("/", "gzip"),
+        ("/large", None),
+        ("/large", "gzip;q=0"),
+        ("/png", "gzip"),
+    ],
+)
+def test_skip_compression(compressed_app, path, accept):
+    """Test small, unaccepted and binary bodies are sent as is."""
+    client = compressed_app.test_client()
+    headers = {"Accept-Encoding": accept} if accept else {}
+    response = client.get(path, headers=headers)
+
+    assert response.status_code == 200
+    assert "Content-Encoding" not in response.headers
+
+
+def test_compress_stream(compressed_app):
+    """Test streamed bodies are compressed chunk by chunk."""
+    client = compressed_app.test_client()
+    response = client.get(
+        "/stream", headers={"Accept-Encoding": "gzip"}, buffered=False
+    )
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Content-Length" not in response.headers
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    chunks = [decompressor.decompress(chunk) for chunk in response.response]
+    response.close()
+
+    assert chunks[:3] == [b'{"id": 0}\n', b'{"id": 1}\n', b'{"id": 2}\n']
+
+
+def test_compress_weakens_etag(compressed_app):
+    """Test encoded responses carry a weak ETag that still revalidates."""
+
+    @compressed_app.get("/tagged")
+    @conditional()
+    def tagged():
+        return LARGE
+
+    client = compressed_app.test_client()
+    response = client.get("/tagged", headers={"Accept-Encoding": "gzip"})
+    etag = response.headers["ETag"]
+
+    assert etag.startswith('W/"')
+    response = client.get(
+        "/tagged", headers={"Accept-Encoding": "gzip", "If-None-Match": etag}
+    )
+    assert response.status_code == 304
+
+
+def test_compress_stream_closes_source():
+    """Test the source iterable is closed when the stream ends."""
+    source = mock.MagicMock()
+    source.__iter__.return_value = iter([b"a" * 10])
+    output = b"".join(compress_stream(GzipEncoder(6), source))
+
+    assert gzip.decompress(output) == b"a" * 10
+    source.close.assert_called_once_with()
+
+
+def test_disabled_and_configured_algorithms():
+    """Test the hook can be disabled and codings restricted."""
+    app = create_app(
+        {"COMPRESSION_ENABLED": False, "SQLALCHEMY_DATABASE_URI": "sqlite://"}
+    )
+    assert "compression" not in app.extensions
+
+    app = create_app(
+        {
+            "COMPRESSION_ALGORITHMS": "deflate, gzip",
+            "SQLALCHEMY_DATABASE_URI": "sqlite://",
+        }
+    )
+    assert list(app.extensions["compression"]) == ["gzip"]
+    assert "gzip" in available_encoders()
@@ -0,0 +1,46 @@
+"""Test gunicorn settings module."""
+import importlib.util
+import pathlib
+from unittest import mock
+
+from src.app import db
+
+CONFIG_PATH = pathlib.Path(__file__).parents[2] / "gunicorn.conf.py"
+
+
+def load_config():
+    """Import `gunicorn.conf.py`, its name is not a valid module name."""
+    spec = importlib.util.spec_from_file_location("gunicorn_conf", CONFIG_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_settings(monkeypatch):
+    """Test worker count follows the worker class and CPU count."""
+    monkeypatch.setenv("GUNICORN_WORKER_CLASS", "sync")
+    monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+    config = load_config()
+
+    assert config.workers == 2 * config.CPUS + 1
+    assert config.preload_app is True
+    assert config.wsgi_app == "src.app:create_app()"
+
+    monkeypatch.setenv("WEB_CONCURRENCY", "3")
+    assert load_config().workers == 3
+
+
+def test_post_fork(app):
+    """Test workers drop inherited connections and hashing executors."""
+    server = mock.Mock()
+    server.app.wsgi.return_value = app
+    with app.app_context():
+        engine = db.engine
+
+    with mock.patch.object(engine, "dispose") as dispose, mock.patch.object(
+        app.extensions["password_hasher"], "after_fork"
+    ) as after_fork:
+        load_config().post_fork(server, mock.Mock())
+
+    dispose.assert_called_once_with(close=False)
+    after_fork.assert_called_once_with()
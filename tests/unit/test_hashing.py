@@ -0,0 +1,105 @@
+"""Test hashing module."""
+import asyncio
+import threading
+
+import pytest
+
+from src.hashing import (
+    HashingBusyError,
+    HashingPool,
+    check_password_value,
+    hash_password_value,
+    hash_rounds,
+)
+
+
+@pytest.mark.parametrize("mode", ["inline", "thread", "process"])
+def test_hashing_pool_modes(mode):
+    """Test hash and check on every executor mode."""
+    pool = HashingPool(mode=mode, workers=1, queue_size=1)
+    password_hash = pool.run(hash_password_value, "abcd1234", 4)
+
+    assert hash_rounds(password_hash) == 4
+    assert pool.run(check_password_value, password_hash, "abcd1234") is True
+    assert pool.run(check_password_value, password_hash, "wrong") is False
+    pool.shutdown()
+
+
+def test_hashing_pool_busy():
+    """Test callers are rejected once the queue is full."""
+    pool = HashingPool(mode="thread", workers=1, queue_size=0, timeout=0)
+    started = threading.Event()
+    release = threading.Event()
+
+    def blocking_job():
+        started.set()
+        release.wait()
+
+    worker = threading.Thread(target=pool.run, args=(blocking_job,))
+    worker.start()
+    started.wait()
+    with pytest.raises(HashingBusyError, match="queue is full"):
+        pool.run(hash_password_value, "abcd1234", 4)
+    release.set()
+    worker.join()
+    pool.shutdown()
+
+
+def test_hashing_pool_after_fork():
+    """Test a forked child gets a new executor and free queue slots."""
+    pool = HashingPool(mode="thread", workers=1, queue_size=0, timeout=0)
+    inherited = pool.executor
+    # The parent holds the only slot while forking.
+    pool._slots.acquire()  # pylint: disable=W0212
+
+    pool.after_fork()
+
+    assert pool.run(hash_password_value, "abcd1234", 4)
+    assert pool.executor is not inherited
+    pool.shutdown()
+    inherited.shutdown()
+
+
+def test_hashing_pool_unknown_mode():
+    """Test invalid executor name."""
+    with pytest.raises(ValueError, match="Unknown hashing executor"):
+        HashingPool(mode="fiber")
+
+
+def test_hash_long_password():
+    """Test passwords longer than bcrypt limit are truncated."""
+    password_hash = hash_password_value("a" * 100, 4)
+
+    assert check_password_value(password_hash, "a" * 72) is True
+
+
+@pytest.mark.parametrize("mode", ["inline", "thread"])
+def test_hashing_pool_run_async(mode):
+    """Test hashing from a coroutine."""
+    pool = HashingPool(mode=mode, workers=1, queue_size=1)
+
+    async def hash_and_check():
+        password_hash = await pool.run_async(hash_password_value, "abcd", 4)
+        return await pool.run_async(check_password_value, password_hash, "abcd")
+
+    assert asyncio.run(hash_and_check()) is True
+    pool.shutdown()
+
+
+def test_hashing_pool_run_async_busy():
+    """Test coroutines are rejected once the queue is full."""
+    pool = HashingPool(mode="thread", workers=1, queue_size=0, timeout=0.05)
+    release = threading.Event()
+
+    async def saturate():
+        blocked = asyncio.ensure_future(pool.run_async(release.wait))
+        await asyncio.sleep(0.01)
+        try:
+            with pytest.raises(HashingBusyError, match="queue is full"):
+                await pool.run_async(hash_password_value, "abcd1234", 4)
+        finally:
+            release.set()
+        await blocked
+
+    asyncio.run(saturate())
+    pool.shutdown()
@@ -0,0 +1,102 @@
+"""Test JSON provider module."""
+import collections
+import dataclasses
+import datetime
+import decimal
+import uuid
+
+import orjson
+import pytest
+from flask.json.provider import DefaultJSONProvider
+
+from src.json_provider import FastJSONProvider, differs_from_stdlib
+from src.util import generate_response
+
+
+@dataclasses.dataclass
+class Point:
+    """Dataclass serialized through Flask default handler."""
+
+    y: int
+    x: int
+
+
+PAYLOADS = [
+    generate_response(data={"username": "test", "id": 1}, status=201)[0],
+    generate_response(message={"email": ["Not a valid email address."]})[0],
+    generate_response(data=None, message="Invalid username or password")[0],
+    {"name": "Zoë", "emoji": "\U0001f600", "quote": 'a"b\\c\n\x01'},
+    {"created": datetime.datetime(2024, 1, 2, 3, 4, 5)},
+    {"day": datetime.date(2024, 1, 2), "id": uuid.UUID(int=1)},
+    {"price": decimal.Decimal("1.10"), "point": Point(y=2, x=1)},
+    {2: "int key", 1: [1, 2, {"z": None, "a": True}]},
+    {"big": 2**70, "nested": [[], {}]},
+    [1, "two", None],
+    {"floats": [0.0, -0.0, 0.1, 1.5, 1e15, 123456.789, 1e-4]},
+    {"large": 1e16, "small": 1.5e-7, "negative": -2.5e22},
+    {"nan": float("nan"), "inf": [float("inf"), -float("inf")]},
+    {"point": Point(y=1e16, x=1)},
+]
+
+
+@pytest.mark.parametrize("payload", PAYLOADS)
+def test_fast_provider_matches_default(app, payload):
+    """Test responses are byte compatible with Flask default provider."""
+    expected = DefaultJSONProvider(app).response(payload).get_data()
+    actual = FastJSONProvider(app).response(payload).get_data()
+
+    assert actual == expected
+
+
+@pytest.mark.parametrize("payload", PAYLOADS[:3])
+def test_fast_provider_without_orjson(app, payload):
+    """Test provider falls back to the standard library."""
+    expected = DefaultJSONProvider(app).response(payload).get_data()
+    app.config["JSON_FAST_ENCODER"] = False
+    provider = FastJSONProvider(app)
+
+    assert provider.use_orjson is False
+    assert provider.response(payload).get_data() == expected
+
+
+def test_differs_from_stdlib():
+    """Test only floats outside the shared range are detected."""
+    assert not differs_from_stdlib({"a": [0.0, 1.5, 1e15], "b": (1e-4,)})
+    assert not differs_from_stdlib({"text": "1e16", "point": Point})
+    assert differs_from_stdlib([{"a": (1, 1e16)}])
+    assert differs_from_stdlib({"a": float("nan")})
+    assert differs_from_stdlib(Point(y=1, x=-1e-5))
+    assert differs_from_stdlib(collections.OrderedDict(a=[float("inf")]))
+
+
+@pytest.mark.parametrize(
+    ("payload", "expected"),
+    [
+        ({"message": "user created", "id": 12, "day": "2024-01-02"}, False),
+        ({"cursor": "WyJkdDoyMDI0"}, False),
+        ({"value": 1e16}, True),
+        ({"value": -1.5e-7}, True),
+        ({"value": [float("-inf")]}, True),
+        ({"value": None}, True),
+        ({"text": "1e5"}, True),
+    ],
+)
+def test_may_differ(payload, expected):
+    """Test only bodies with exponents or nulls need the walk."""
+    assert FastJSONProvider.may_differ(orjson.dumps(payload)) is expected
+
+
+def test_fast_provider_debug(app):
+    """Test debug mode keeps indented output."""
+    app.debug = True
+    body = FastJSONProvider(app).response({"b": 1, "a": 2}).get_data()
+
+    assert body == b'{\n  "a": 2,\n  "b": 1\n}\n'
+
+
+def test_app_uses_fast_provider(app, client):
+    """Test application serializes responses with the fast provider."""
+    response = client.get("/")
+
+    assert isinstance(app.json, FastJSONProvider)
+    assert response.data == b'{"status":"ok"}\n'
@@ -0,0 +1,104 @@
+"""Test metrics module."""
+import threading
+from unittest import mock
+
+from flask import Flask, g
+
+from src.app import hasher, metrics
+from src.metrics import Metrics, format_labels
+
+
+def test_metrics_endpoint(client):
+    """Test request metrics are exposed in Prometheus format."""
+    metrics.reset()
+    client.get("/user/")
+    client.get("/missing")
+    response = client.get("/metrics")
+    body = response.data.decode()
+
+    assert response.status_code == 200
+    assert response.content_type.startswith("text/plain; version=0.0.4")
+    assert (
+        'http_request_duration_seconds_count{endpoint="user.index",'
+        'method="GET"} 1' in body
+    )
+    assert (
+        'http_request_db_queries_bucket{endpoint="user.index",'
+        'method="GET",le="0.0"} 1' in body
+    )
+    assert 'http_responses_total{endpoint="user.index",status="200"} 1' in body
+    assert 'http_responses_total{endpoint="unmatched",status="404"} 1' in body
+    assert "# TYPE auth_cache_hits_total counter" in body
+    assert "auth_cache_size 0" in body
+
+
+def test_metrics_histogram_merge():
+    """Test histograms recorded by different threads are merged."""
+    registry = Metrics()
+    name = "http_request_duration_seconds"
+    labels = (("endpoint", "user.index"), ("method", "GET"))
+    registry.observe(name, 0.002, labels)
+    worker = threading.Thread(
+        target=registry.observe, args=(name, 0.002, labels)
+    )
+    worker.start()
+    worker.join()
+    registry.observe(name, 20, labels)
+    body = registry.render()
+
+    prefix = f'{name}_bucket{{endpoint="user.index",method="GET",'
+    assert len(registry._shards) == 1  # pylint: disable=W0212
+    assert f'{prefix}le="0.001"}} 0' in body
+    assert f'{prefix}le="0.0025"}} 2' in body
+    assert f'{prefix}le="+Inf"}} 3' in body
+
+
+def test_metrics_exited_threads_retired():
+    """Test shards of short lived threads are folded and dropped."""
+    registry = Metrics()
+    registry.increment("http_responses_total", (("status", "200"),))
+    for _ in range(50):
+        worker = threading.Thread(
+            target=registry.increment,
+            args=("http_responses_total", (("status", "200"),)),
+        )
+        worker.start()
+        worker.join()
+        assert len(registry._shards) <= 2  # pylint: disable=W0212
+
+    assert 'http_responses_total{status="200"} 51' in registry.render()
+    assert len(registry._shards) == 1  # pylint: disable=W0212
+
+    registry.reset()
+    assert 'http_responses_total{status="200"}' not in registry.render()
+
+
+def test_metrics_sql_and_bcrypt_time(app):
+    """Test SQL statements and hashing time are added to the request."""
+    app.config["BCRYPT_LOG_ROUNDS"] = 4
+    with app.test_request_context("/user/"):
+        Metrics._start_request()  # pylint: disable=W0212
+        context = mock.Mock()
+        Metrics._start_query(None, None, "SELECT 1", (), context, False)  # pylint: disable=W0212
+        Metrics._end_query(None, None, "SELECT 1", (), context, False)  # pylint: disable=W0212
+        hasher.hash("abcd1234")
+
+        assert g.sql_queries == 1
+        assert g.sql_seconds > 0
+        assert g.bcrypt_seconds > 0
+
+
+def test_metrics_disabled():
+    """Test nothing is registered when metrics are disabled."""
+    flask_app = Flask(__name__)
+    flask_app.config["METRICS_ENABLED"] = False
+    Metrics().init_app(flask_app)
+
+    assert "metrics" not in flask_app.extensions
+    assert not flask_app.before_request_funcs
+
+
+def test_format_labels():
+    """Test label values are escaped."""
+    assert format_labels(()) == ""
+    assert format_labels((("path", 'a"b\\c\n'),)) == '{path="a\\"b\\\\c\\n"}'
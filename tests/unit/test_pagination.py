@@ -0,0 +1,61 @@
+"""Test keyset pagination helpers."""
+import datetime
+
+import pytest
+from sqlalchemy import Column, Integer, MetaData, Table, select
+
+from src.pagination import decode_cursor, encode_cursor, seek
+
+items = Table("items", MetaData(), Column("a", Integer), Column("b", Integer))
+
+
+def test_cursor_round_trip():
+    """Test cursor keeps datetimes and plain values."""
+    values = (datetime.datetime(2024, 1, 2, 3, 4, 5, 6), 7, "dt")
+    cursor = encode_cursor(values)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor, (datetime.datetime, int, str)) == values
+    assert decode_cursor(encode_cursor((2**63 - 1, -(2**63))), (int, int)) == (
+        2**63 - 1,
+        -(2**63),
+    )
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "%%%",
+        "bm90IGpzb24",
+        encode_cursor((1,)),
+        encode_cursor(()),
+        encode_cursor((1, 2)),
+        encode_cursor((datetime.datetime(2024, 1, 2), True)),
+        encode_cursor((datetime.datetime(2024, 1, 2), "2")),
+        encode_cursor(("dt:nonsense", 2)),
+        encode_cursor(([1], {"a": 1})),
+        encode_cursor((datetime.datetime(2024, 1, 2), 2**63)),
+        encode_cursor((datetime.datetime(2024, 1, 2), -(2**63) - 1)),
+    ],
+)
+def test_decode_cursor_invalid(cursor):
+    """Test malformed cursors and values of other types are rejected."""
+    with pytest.raises(ValueError, match="^Invalid cursor$"):
+        decode_cursor(cursor, (datetime.datetime, int))
+
+
+@pytest.mark.parametrize(
+    ("after", "descending", "expected"),
+    [
+        ((), False, "ORDER BY items.a, items.b"),
+        ((1, 2), False, "WHERE (items.a, items.b) > (:param_1, :param_2)"),
+        ((1, 2), True, "ORDER BY items.a DESC, items.b DESC"),
+        ((1, 2), True, "WHERE (items.a, items.b) < (:param_1, :param_2)"),
+    ],
+)
+def test_seek(after, descending, expected):
+    """Test rows are skipped by key comparison instead of OFFSET."""
+    query = seek(select(items), (items.c.a, items.c.b), after, descending)
+
+    assert expected in str(query)
+    assert "OFFSET" not in str(query)
@@ -0,0 +1,144 @@
+"""Test profiling module."""
+import os
+import pstats
+import sys
+import time
+from unittest import mock
+
+import pytest
+
+from src.app import create_app
+from src.profiling import (
+    profile_filename,
+    profile_token_command,
+    rotate,
+    sign_trigger,
+    verify_trigger,
+)
+
+SECRET = "profiling-secret"
+
+
+@pytest.fixture
+def profiled_app(tmp_path):
+    """Create app with profiling enabled and no sampling."""
+    return create_app(
+        {
+            "TESTING": True,
+            "SQLALCHEMY_DATABASE_URI": "sqlite://",
+            "PROFILING_ENABLED": True,
+            "PROFILING_SECRET": SECRET,
+            "PROFILING_DIR": str(tmp_path),
+            "PROFILING_MAX_FILES": 2,
+        }
+    )
+
+
+def test_profiler_disabled(app):
+    """Test no hook is registered when profiling is disabled."""
+    hooks = [func.__qualname__ for func in app.before_request_funcs[None]]
+
+    assert "profiler" not in app.extensions
+    assert not any(name.startswith("Profiler.") for name in hooks)
+
+
+def test_profiler_sampled(profiled_app, tmp_path):
+    """Test sampled requests write a profile tagged with the endpoint."""
+    profiled_app.extensions["profiler"]["sample_rate"] = 1.0
+    response = profiled_app.test_client().get("/")
+    (path,) = tmp_path.iterdir()
+
+    assert response.status_code == 200
+    assert "X-Profile-File" not in response.headers
+    assert "-health-" in path.name
+    assert path.name.endswith(".prof")
+    assert pstats.Stats(str(path)).total_calls > 0
+
+
+def test_profiler_signed_header(profiled_app, tmp_path):
+    """Test a signed header triggers profiling and names the file."""
+    client = profiled_app.test_client()
+    expired = sign_trigger(SECRET, int(time.time()) - 1)
+    forged = sign_trigger("other", int(time.time()) + 60)
+    for value in ("", expired, forged, "soon:abc"):
+        client.get("/", headers={"X-Profile": value})
+
+    assert not list(tmp_path.iterdir())
+
+    value = sign_trigger(SECRET, int(time.time()) + 60)
+    response = client.get("/", headers={"X-Profile": value})
+
+    assert os.listdir(tmp_path) == [response.headers["X-Profile-File"]]
+
+
+def test_profiler_other_profiler_active(profiled_app, tmp_path):
+    """Test requests are served when another profiler is running."""
+    profiled_app.extensions["profiler"]["sample_rate"] = 1.0
+    with mock.patch(
+        "src.profiling.cProfile.Profile.enable", side_effect=ValueError
+    ):
+        response = profiled_app.test_client().get("/")
+
+    assert response.status_code == 200
+    assert not list(tmp_path.iterdir())
+
+
+def test_profiler_discarded_on_error(profiled_app, tmp_path):
+    """Test the profiler is stopped when the view raises."""
+    profiled_app.extensions["profiler"]["sample_rate"] = 1.0
+
+    @profiled_app.route("/boom")
+    def boom():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError, match="boom"):
+        profiled_app.test_client().get("/boom")
+
+    assert sys.getprofile() is None
+    assert not list(tmp_path.iterdir())
+
+
+def test_rotate(tmp_path):
+    """Test only the newest profiles are kept."""
+    for index in range(4):
+        path = tmp_path / f"{index}.prof"
+        path.write_bytes(b"")
+        os.utime(path, (index, index))
+    (tmp_path / "notes.txt").write_text("kept")
+    rotate(str(tmp_path), 2)
+
+    assert sorted(os.listdir(tmp_path)) == ["2.prof", "3.prof", "notes.txt"]
+
+
+def test_profile_filename():
+    """Test endpoint and duration are part of the file name."""
+    name = profile_filename("user.index", 0.2504)
+
+    assert name.endswith(f"-user.index-250ms-{os.getpid()}.prof")
+    assert "-unmatched-" in profile_filename(None, 0)
+    assert "/" not in profile_filename("../etc", 0)
+
+
+def test_verify_trigger():
+    """Test trigger values are checked against expiry and signature."""
+    value = sign_trigger(SECRET, 100)
+
+    assert verify_trigger(SECRET, value, 100)
+    assert not verify_trigger(SECRET, value, 101)
+    assert not verify_trigger("other", value, 100)
+    assert not verify_trigger(SECRET, value + "0", 100)
+
+
+def test_profile_token_command(profiled_app, app):
+    """Test the CLI prints a header value accepted by the profiler."""
+    result = profiled_app.test_cli_runner().invoke(args=["profile-token"])
+    header, value = result.output.strip().split(": ")
+
+    assert result.exit_code == 0
+    assert header == "X-Profile"
+    assert verify_trigger(SECRET, value, time.time())
+
+    result = app.test_cli_runner().invoke(profile_token_command)
+
+    assert result.exit_code == 1
+    assert "PROFILING_SECRET is not set" in result.output
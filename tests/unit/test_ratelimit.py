@@ -0,0 +1,199 @@
+"""Test rate limit module."""
+import logging
+import sqlite3
+from unittest import mock
+
+import pytest
+
+from src.ratelimit import (
+    Limiter,
+    MemoryBackend,
+    RateLimiter,
+    SQLiteBackend,
+    client_address,
+    parse_rate,
+    take_token,
+)
+
+
+def test_parse_rate():
+    """Test limits are parsed into capacity and refill rate."""
+    assert parse_rate("10/60") == (10, 10 / 60)
+    assert parse_rate("5/1") == (5, 5)
+
+
+@pytest.mark.parametrize("rate", ["10", "10/0", "a/60", "-1/60", "1/2/3"])
+def test_parse_rate_invalid(rate):
+    """Test malformed limits are rejected."""
+    with pytest.raises(ValueError, match="Invalid rate limit"):
+        parse_rate(rate)
+
+
+@pytest.mark.parametrize(
+    ("forwarded_for", "trusted_proxies", "expected"),
+    [
+        ("1.1.1.1", 0, "10.0.0.1"),
+        (None, 1, "10.0.0.1"),
+        ("1.1.1.1", 1, "1.1.1.1"),
+        ("6.6.6.6, 1.1.1.1", 1, "1.1.1.1"),
+        ("6.6.6.6, 1.1.1.1, 10.0.0.2", 2, "1.1.1.1"),
+        ("1.1.1.1", 2, "10.0.0.1"),
+        ("1.1.1.1, ", 1, "10.0.0.1"),
+    ],
+)
+def test_client_address(forwarded_for, trusted_proxies, expected):
+    """Test only addresses appended by trusted proxies are used."""
+    assert client_address("10.0.0.1", forwarded_for, trusted_proxies) == (
+        expected
+    )
+
+
+def test_take_token():
+    """Test bucket refills over time up to its capacity."""
+    assert take_token(2, 0, 0, 2, 1) == (1, 0)
+    assert take_token(0.5, 0, 0, 2, 0.5) == (0.5, 1)
+    assert take_token(0, 0, 1.5, 2, 1) == (0.5, 0)
+    assert take_token(0, 0, 100, 2, 1) == (1, 0)
+
+
+@pytest.mark.parametrize("backend_name", ["memory", "sqlite"])
+def test_backend_hit(backend_name, tmp_path):
+    """Test burst is allowed up to capacity, then refused until refilled."""
+    if backend_name == "memory":
+        backend = MemoryBackend()
+        clock = "src.ratelimit.time.monotonic"
+    else:
+        backend = SQLiteBackend(str(tmp_path / "ratelimit.db"))
+        clock = "src.ratelimit.time.time"
+
+    with mock.patch(clock, return_value=1000.0) as now:
+        assert [backend.hit("ip:a", 3, 0.5) for _ in range(4)] == [0, 0, 0, 2]
+        assert backend.hit("ip:b", 3, 0.5) == 0
+        now.return_value = 1002.0
+        assert backend.hit("ip:a", 3, 0.5) == 0
+        assert backend.hit("ip:a", 3, 0.5) == 2
+
+
+def test_memory_backend_maxsize():
+    """Test least recently used buckets are dropped."""
+    backend = MemoryBackend(maxsize=2)
+    for key in ("a", "b", "c"):
+        backend.hit(key, 1, 1)
+
+    assert list(backend._buckets) == ["b", "c"]  # pylint: disable=W0212
+
+
+def test_sqlite_backend_shared(tmp_path):
+    """Test buckets are shared between backends using the same file."""
+    path = str(tmp_path / "ratelimit.db")
+    first, second = SQLiteBackend(path), SQLiteBackend(path)
+
+    assert first.hit("email:a", 1, 0.01) == 0
+    assert second.hit("email:a", 1, 0.01) > 0
+
+
+def test_sqlite_backend_prune(tmp_path):
+    """Test full buckets are removed periodically."""
+    backend = SQLiteBackend(str(tmp_path / "ratelimit.db"))
+    with mock.patch("src.ratelimit.SQLITE_PRUNE_INTERVAL", 2):
+        with mock.patch("src.ratelimit.time.time", return_value=0.0) as now:
+            backend.hit("a", 1, 1)
+            now.return_value = 10.0
+            backend.hit("b", 1, 1)
+
+    rows = backend.connection.execute("SELECT key FROM buckets").fetchall()
+    assert rows == [("b",)]
+
+
+def test_sqlite_backend_locked(tmp_path, caplog):
+    """Test requests are let through while another process holds the lock."""
+    path = str(tmp_path / "ratelimit.db")
+    backend = SQLiteBackend(path)
+    assert backend.hit("a", 1, 0.01) == 0
+    backend.connection.execute("PRAGMA busy_timeout = 0")
+    other = sqlite3.connect(path, isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")
+
+    with caplog.at_level(logging.WARNING, logger="src.ratelimit"):
+        assert backend.hit("a", 1, 0.01) == 0
+
+    assert "database is locked" in caplog.text
+    assert not backend.connection.in_transaction
+    other.execute("ROLLBACK")
+    assert backend.hit("a", 1, 0.01) > 0
+
+
+def test_sqlite_backend_rollback(tmp_path):
+    """Test other errors roll back the hit and are raised."""
+    backend = SQLiteBackend(str(tmp_path / "ratelimit.db"))
+    error = RuntimeError("boom")
+    with mock.patch("src.ratelimit.take_token", side_effect=error):
+        with pytest.raises(RuntimeError, match="boom"):
+            backend.hit("a", 1, 0)
+
+    assert not backend.connection.in_transaction
+
+
+def test_limiter_stops_at_first_rejection():
+    """Test later scopes are not charged once a scope rejects."""
+    backend = mock.Mock()
+    backend.hit.return_value = 5.0
+    limiter = Limiter(backend, {"ip": (1, 1), "email": (1, 1)})
+
+    assert limiter.check([("ip", "1.2.3.4"), ("email", "a@b.c")]) == 5.0
+    backend.hit.assert_called_once_with("ip:1.2.3.4", 1, 1)
+    assert limiter.stats() == {"rejected_ip": 1, "rejected_email": 0}
+
+
+def test_limiter_disabled():
+    """Test disabled limiter lets every request through."""
+    backend = mock.Mock()
+    limiter = Limiter(backend, {"ip": (1, 1)}, enabled=False)
+
+    assert limiter.check([("ip", "1.2.3.4")]) == 0
+    backend.hit.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    ("config", "backend_class"),
+    [
+        ({"RATELIMIT_BACKEND": "memory"}, MemoryBackend),
+        ({"RATELIMIT_BACKEND": "sqlite"}, SQLiteBackend),
+    ],
+)
+def test_rate_limiter_init_app(app, config, backend_class):
+    """Test backend is chosen from config."""
+    app.config.update(config)
+    rate_limiter = RateLimiter()
+    rate_limiter.init_app(app)
+
+    with app.app_context():
+        assert isinstance(rate_limiter.limiter.backend, backend_class)
+
+
+def test_rate_limiter_unknown_backend(app):
+    """Test invalid backend name."""
+    app.config["RATELIMIT_BACKEND"] = "redis"
+    with pytest.raises(ValueError, match="Unknown rate limit backend"):
+        RateLimiter().init_app(app)
+
+
+def test_rate_limiter_check_login(app):
+    """Test emails are normalized and missing keys skipped."""
+    rate_limiter = RateLimiter()
+    rate_limiter.init_app(app)
+
+    with app.app_context():
+        with mock.patch.object(rate_limiter.limiter, "check") as check:
+            rate_limiter.check_login("1.2.3.4", " A@B.c")
+            rate_limiter.check_login(None, ["a@b.c"])
+            rate_limiter.check_login("10.0.0.1", None, "5.6.7.8")
+            app.config["RATELIMIT_TRUSTED_PROXIES"] = 1
+            rate_limiter.check_login("10.0.0.1", None, "6.6.6.6, 5.6.7.8")
+
+    assert check.call_args_list == [
+        mock.call((("ip", "1.2.3.4"), ("email", "a@b.c"))),
+        mock.call((("ip", None), ("email", None))),
+        mock.call((("ip", "10.0.0.1"), ("email", None))),
+        mock.call((("ip", "5.6.7.8"), ("email", None))),
+    ]
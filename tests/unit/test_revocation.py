@@ -0,0 +1,77 @@
+"""Test token revocation module."""
+from unittest import mock
+
+from src.revocation import RevocationList, TokenDenylist
+
+
+def test_revocation_list_jti():
+    """Test revoked token ids are matched exactly."""
+    revocations = RevocationList()
+    revocations.add([(1, "abc", None, None, 2000.0)])
+
+    assert revocations.is_revoked({"id": 1, "jti": "abc", "iat": 100})
+    assert not revocations.is_revoked({"id": 1, "jti": "abd", "iat": 100})
+    assert len(revocations) == 1
+
+
+def test_revocation_list_user_cutoff():
+    """Test tokens issued before the second of a revoke all are rejected."""
+    revocations = RevocationList()
+    revocations.add([(1, None, 7, 101.0, 2000.0), (2, None, 7, 90.0, 1500.0)])
+
+    assert revocations.is_revoked({"id": 7, "jti": "abc", "iat": 100})
+    assert revocations.is_revoked({"id": 7})
+    assert not revocations.is_revoked({"id": 7, "iat": 101})
+    assert not revocations.is_revoked({"id": 8, "iat": 1})
+
+
+def test_revocation_list_prune():
+    """Test entries are dropped once the tokens they match expired."""
+    revocations = RevocationList()
+    revocations.add([(1, "abc", None, None, 100.0), (2, None, 7, 50.0, 100.0)])
+    revocations.add([(3, "abd", None, None, 300.0)])
+    revocations.prune(200.0)
+
+    assert len(revocations) == 1
+    assert revocations.is_revoked({"id": 7, "jti": "abd", "iat": 1})
+
+
+def test_revocation_list_refresh():
+    """Test refresh reads new rows only when the copy is stale."""
+    revocations = RevocationList(refresh_interval=60)
+    loader = mock.Mock(return_value=[(150, "abc", None, None, 1e12)])
+    revocations.refresh(loader)
+    revocations.refresh(loader)
+
+    loader.assert_called_once_with(0)
+    assert revocations.last_id == 150
+    assert revocations.is_revoked({"id": 1, "jti": "abc"})
+
+    revocations.refreshed_at = float("-inf")
+    revocations.refresh(loader)
+    loader.assert_called_with(50)
+
+
+def test_revocation_list_local_rows_keep_position():
+    """Test own revocations do not skip rows written by other workers."""
+    revocations = RevocationList()
+    revocations.add([(500, "abc", None, None, 1e12)], fetched=False)
+
+    assert revocations.last_id == 0
+    assert revocations.is_revoked({"id": 1, "jti": "abc"})
+
+
+def test_token_denylist(app):
+    """Test extension refreshes through the registered loader."""
+    denylist = TokenDenylist()
+    denylist.init_app(app)
+    loader = denylist.revocation_loader(
+        mock.Mock(return_value=[(1, "abc", None, None, 1e12)])
+    )
+
+    with app.app_context():
+        assert denylist.is_revoked({"id": 1, "jti": "abc"})
+        denylist.add([(2, "abd", None, None, 1e12)])
+        assert denylist.is_revoked({"id": 1, "jti": "abd"})
+        assert denylist.stats() == {"size": 2}
+    loader.assert_called_once_with(0)
@@ -0,0 +1,233 @@
+"""Test slowquery module."""
+import logging
+import sqlite3
+from unittest import mock
+
+import pytest
+from sqlalchemy import event, insert, text
+
+from src.app import create_app, db
+from src.application.user.model import User
+from src.slowquery import (
+    REDACTED,
+    SlowQueryRecorder,
+    explain,
+    normalize,
+    redact,
+)
+
+LOGIN = {"email": "slow@test.com", "password": "abcd1234"}
+
+
+@pytest.fixture
+def slow_app():
+    """Create app logging every statement as slow."""
+    app = create_app(
+        {
+            "TESTING": True,
+            "SQLALCHEMY_DATABASE_URI": "sqlite://",
+            "BCRYPT_LOG_ROUNDS": 4,
+            "SLOW_QUERY_THRESHOLD_MS": 0,
+            "SLOW_QUERY_LOG_INTERVAL": 60,
+        }
+    )
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def slow_records(caplog, fragment):
+    """Return slow query log messages containing the fragment."""
+    return [
+        record.getMessage()
+        for record in caplog.records
+        if record.name == "src.slowquery" and fragment in record.getMessage()
+    ]
+
+
+def test_normalize():
+    """Test statements differing in literals and list sizes share a key."""
+    first = normalize("SELECT * FROM users\nWHERE id IN (?, ?) AND name = 'a'")
+    second = normalize(
+        "SELECT * FROM users WHERE id IN (?, ?, ?) AND name = 'b'"
+    )
+
+    assert first == second == "SELECT * FROM users WHERE id IN (?) AND name = ?"
+    assert normalize("SELECT :id_1, %(name)s, $1 LIMIT 20") == (
+        "SELECT ?, ?, ? LIMIT ?"
+    )
+
+
+def test_redact():
+    """Test redacted columns are hidden in every parameter style."""
+    secrets = {"hash"}
+
+    assert redact({"password_1": "x", "id": 1}, secrets) == {
+        "password_1": REDACTED,
+        "id": 1,
+    }
+    assert redact({"anon": "hash", "ids": [1]}, secrets) == {
+        "anon": REDACTED,
+        "ids": [1],
+    }
+    assert redact([("bob", "hash"), ("eve", "hash")], secrets) == [
+        ("bob", REDACTED),
+        ("eve", REDACTED),
+    ]
+    assert redact(("bob", 1), None) == (REDACTED, REDACTED)
+
+
+def test_slow_login_logged_once(slow_app, caplog):
+    """Test a repeated slow lookup is logged once with its plan."""
+    client = slow_app.test_client()
+    client.post("/user/", json={"username": "slowuser", **LOGIN})
+    caplog.set_level(logging.WARNING, logger="src.slowquery")
+    for _ in range(3):
+        assert client.post("/user/login", json=LOGIN).status_code == 201
+    (message,) = slow_records(caplog, "WHERE users.email = ?")
+    recorder = slow_app.extensions["slow_query_log"]
+
+    assert "on user.user_auth" in message
+    assert "'slow@test.com'" in message
+    assert "SEARCH users USING INDEX" in message
+    assert recorder.stats()["repeated"] == 0
+
+    recorder.interval = 0
+    client.post("/user/login", json=LOGIN)
+    (summary,) = slow_records(caplog, "repeated 3 times")
+
+    assert "last on user.user_auth" in summary
+    assert recorder.stats()["repeated"] == 1
+
+
+def test_slow_query_redacts_password(slow_app, caplog):
+    """Test password hashes are not written to the log."""
+    caplog.set_level(logging.WARNING, logger="src.slowquery")
+    with slow_app.app_context():
+        db.session.execute(
+            insert(User),
+            [
+                {
+                    "username": f"slow{index}",
+                    "email": f"{index}@test.com",
+                    "password": "$2b$04$secret",
+                }
+                for index in range(2)
+            ],
+        )
+        User.query.filter(
+            User.password == "$2b$04$secret", User.id.in_([1, 2])
+        ).all()
+
+    messages = slow_records(caplog, "users")
+
+    assert len(messages) == 2
+    assert not any("$2b$04$secret" in message for message in messages)
+    assert "(1, 2)" not in messages[1]
+    assert f"'{REDACTED}', 1, 2" in messages[1]
+
+
+def test_slow_query_without_request(slow_app, caplog):
+    """Test statements outside requests are logged without endpoint."""
+    caplog.set_level(logging.WARNING, logger="src.slowquery")
+    slow_app.extensions["slow_query_log"].capture_plan = False
+    with slow_app.app_context():
+        db.session.execute(text("SELECT 1 AS slow_probe"))
+    (message,) = slow_records(caplog, "slow_probe")
+
+    assert "ms on -: SELECT 1 AS slow_probe" in message
+    assert message.endswith("plan:\n")
+
+
+def test_slow_query_disabled():
+    """Test no listener is registered when the log is disabled."""
+    app = create_app(
+        {
+            "SQLALCHEMY_DATABASE_URI": "sqlite://",
+            "SLOW_QUERY_LOG_ENABLED": False,
+        }
+    )
+    recorder = app.extensions["slow_query_log"]
+    with app.app_context():
+        assert not event.contains(
+            db.engine, "after_cursor_execute", recorder.end_query
+        )
+
+
+def test_slow_query_fast_statement():
+    """Test statements under the threshold are ignored."""
+    recorder = SlowQueryRecorder(threshold=10, interval=60)
+    context = mock.Mock(slow_query_started=0)
+    with mock.patch("src.slowquery.time.perf_counter", return_value=1):
+        recorder.end_query(None, None, "SELECT 1", (), context, False)
+    recorder.end_query(None, None, "SELECT 1", (), None, False)
+
+    assert recorder.stats() == {"logged": 0, "repeated": 0, "statements": 0}
+
+
+def test_slow_query_maxsize(caplog):
+    """Test the least recently seen statements are forgotten."""
+    recorder = SlowQueryRecorder(
+        threshold=0, interval=60, maxsize=2, capture_plan=False
+    )
+    context = mock.Mock(slow_query_started=0, compiled=None)
+    for table in ("a", "b", "a", "c"):
+        recorder.end_query(
+            None, None, f"SELECT * FROM {table}", (), context, False
+        )
+
+    assert list(recorder._entries) == [  # pylint: disable=W0212
+        "SELECT * FROM a",
+        "SELECT * FROM c",
+    ]
+    assert recorder.stats()["logged"] == 3
+    assert len(caplog.records) == 3
+
+
+def test_explain():
+    """Test statements that cannot be explained return no plan."""
+    connection = mock.Mock()
+    connection.cursor.return_value.execute.side_effect = ValueError("bad")
+
+    assert explain(connection, "oracle", "SELECT 1", ()) == ""
+    assert explain(connection, "sqlite", "PRAGMA user_version", ()) == ""
+    assert explain(connection, "sqlite", "SELECT 1", [()]) == "unavailable: bad"
+    connection.cursor.return_value.close.assert_called_once()
+
+
+def test_explain_savepoint():
+    """Test a failing EXPLAIN is rolled back to its savepoint."""
+    connection = mock.Mock()
+    cursor = connection.cursor.return_value
+    cursor.execute.side_effect = [None, ValueError("bad"), None, None]
+    plan = explain(connection, "postgresql", "SELECT 1", ())
+
+    assert plan == "unavailable: bad"
+    assert [call.args[0] for call in cursor.execute.call_args_list] == [
+        "SAVEPOINT slow_query_explain",
+        "EXPLAIN SELECT 1",
+        "ROLLBACK TO SAVEPOINT slow_query_explain",
+        "RELEASE SAVEPOINT slow_query_explain",
+    ]
+
+    cursor.execute.side_effect = ValueError("no savepoint")
+    assert explain(connection, "mysql", "SELECT 1", ()) == (
+        "unavailable: no savepoint"
+    )
+
+
+def test_explain_failure_keeps_transaction():
+    """Test the transaction of the statement survives a failing EXPLAIN."""
+    connection = sqlite3.connect(":memory:")
+    connection.execute("CREATE TABLE items (id INTEGER PRIMARY KEY)")
+    connection.commit()
+    connection.execute("INSERT INTO items VALUES (1)")
+    # SQLite runs the savepoint statements of the PostgreSQL path.
+    plan = explain(connection, "postgresql", "SELECT * FROM missing", ())
+
+    assert plan.startswith("unavailable: ")
+    assert connection.in_transaction
+    connection.commit()
+    assert connection.execute("SELECT id FROM items").fetchall() == [(1,)]
+    assert explain(connection, "postgresql", "SELECT * FROM items", ()) != ""
+    assert not connection.in_transaction
@@ -0,0 +1,78 @@
+"""Test util module."""
+import pytest
+from flask import Flask
+
+from src.application.user.model import login_schema
+from src.util import (
+    body_etag,
+    conditional,
+    generate_response,
+    load_payload,
+    modify_error,
+)
+
+
+@pytest.mark.parametrize(
+    ("message", "status", "expected"),
+    [
+        (None, False, []),
+        ("", True, []),
+        ("User Created", True, "User Created"),
+        ("Invalid", False, [{"error": "Invalid"}]),
+        ([{"error": "a"}], False, [{"error": "a"}]),
+        (
+            {"email": ["Not a valid email address.", "Other"]},
+            False,
+            [{"error": "email: Not a valid email address."}],
+        ),
+    ],
+)
+def test_modify_error(message, status, expected):
+    """Test error list normalization."""
+    assert modify_error(message, status) == expected
+
+
+def test_generate_response():
+    """Test response envelope."""
+    assert generate_response(data={"id": 1}, status=200) == (
+        {"data": {"id": 1}, "message": [], "status": True},
+        200,
+    )
+    assert generate_response(message="Bad")[1] == 400
+
+
+def test_load_payload():
+    """Test payload is validated and loaded in one pass."""
+    payload = {"email": "test@test.com", "password": "abcd1234"}
+
+    assert load_payload(login_schema, payload) == (payload, None)
+    assert load_payload(login_schema, {"email": "test@test.com"}) == (
+        None,
+        {"password": ["Missing data for required field."]},
+    )
+
+
+def test_conditional():
+    """Test only successful reads get an ETag and can be revalidated."""
+    app = Flask(__name__)
+
+    @app.route("/<int:status>", methods=["GET", "POST"])
+    @conditional(cache_control="public, max-age=60")
+    def view(status):
+        return {"status": status}, status
+
+    client = app.test_client()
+    response = client.get("/200")
+    etag = body_etag(response.data)
+
+    assert response.headers["ETag"] == f'"{etag}"'
+    assert response.headers["Cache-Control"] == "public, max-age=60"
+    assert "Vary" not in response.headers
+    assert client.get("/200", headers={"If-None-Match": etag}).status_code == (
+        304
+    )
+    assert client.head("/200", headers={"If-None-Match": etag}).status_code == (
+        304
+    )
+    assert "ETag" not in client.get("/404").headers
+    assert "ETag" not in client.post("/200").headers